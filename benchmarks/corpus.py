@@ -0,0 +1,135 @@
+import argparse
+import json
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_KEYWORDS = ['machine learning', 'natural language processing', 'deep learning',
+                    'neural networks', 'artificial intelligence']
+DEFAULT_EXCLUSION_KEYWORDS = ['quantum', 'cryptography', 'game theory', 'data mining']
+DEFAULT_IMPORTANT_WORDS = ['novel', 'innovative', 'state-of-the-art']
+DEFAULT_START_DATE = date(2024, 10, 1)
+
+# Filler vocabulary with a rough academic register; no entry matches a default keyword
+_VOCABULARY = (
+    "we the of a and to in is for that on with by this are as be from an our model method "
+    "results show propose approach performance task data training learning evaluation "
+    "analysis benchmark baseline experiments dataset framework problem algorithm error "
+    "bound convergence theorem lemma proof optimization gradient loss objective sample "
+    "distribution estimator variance bias regularization representation feature layer "
+    "attention transformer sequence token context retrieval generation inference scaling "
+    "efficient robust accurate empirical theoretical significant improvement compared "
+    "prior work recent studies limited computational cost memory latency throughput "
+    "parameters architecture design setting settings across multiple standard large small "
+    "first second finally however moreover furthermore therefore thus while although"
+).split()
+_SECTION_NAMES = ['Introduction', 'Related Work', 'Background', 'Method', 'Analysis',
+                  'Experiments', 'Results', 'Discussion', 'Limitations', 'Conclusion']
+_TITLE_PATTERNS = [
+    "{A} {B} for {C}",
+    "Towards {A} {B} in {C}",
+    "On the {B} of {C}",
+    "{A} {B}: A Study of {C}",
+    "Scaling {B} with {A} {C}",
+]
+_TITLE_ADJECTIVES = ['Efficient', 'Robust', 'Scalable', 'Adaptive', 'Sparse', 'Calibrated', 'Unified']
+_TITLE_NOUNS = ['Attention', 'Retrieval', 'Optimization', 'Representations', 'Inference', 'Routing']
+_TITLE_TOPICS = ['Language Models', 'Graph Learning', 'Vision Transformers', 'Reinforcement Learning',
+                 'Speech Recognition', 'Code Generation', 'Time Series']
+
+
+def _insert_phrases(rng: random.Random, words: List[str], phrases: List[str], density: float) -> List[str]:
+    if phrases and density > 0:
+        for _ in range(int(len(words) * density)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(phrases))
+    return words
+
+def _words(rng: random.Random, count: int, phrases: List[str], density: float) -> List[str]:
+    return _insert_phrases(rng, rng.choices(_VOCABULARY, k=count), phrases, density)
+
+def _sentences(words: List[str], rng: random.Random) -> str:
+    sentences = []
+    i = 0
+    while i < len(words):
+        length = rng.randint(8, 24)
+        sentence = " ".join(words[i:i + length])
+        sentences.append(sentence[:1].upper() + sentence[1:] + ".")
+        i += length
+    return " ".join(sentences)
+
+def _latex_body(rng: random.Random, words: List[str]) -> str:
+    sections = rng.sample(_SECTION_NAMES, k=min(len(_SECTION_NAMES), max(2, len(words) // 400)))
+    per_section = max(1, len(words) // len(sections))
+    parts = ["\\documentclass{article}", "\\usepackage{amsmath}", "\\newcommand{\\R}{\\mathbb{R}}",
+             "\\begin{document}"]
+    for index, name in enumerate(sections):
+        chunk = words[index * per_section:(index + 1) * per_section if index < len(sections) - 1 else None]
+        parts.append(f"\\section{{{name}}}")
+        paragraph_size = 120
+        for start in range(0, len(chunk), paragraph_size):
+            parts.append(_sentences(chunk[start:start + paragraph_size], rng))
+            roll = rng.random()
+            if roll < 0.2:
+                parts.append(f"\\begin{{equation}} \\mathcal{{L}}_{{{index}}} = \\sum_i x_i^{rng.randint(2, 4)} "
+                             f"\\end{{equation}}")
+            elif roll < 0.3:
+                parts.append(f"As shown in prior work~\\cite{{ref{rng.randint(1, 60)}}}.")
+    parts.append("\\bibliography{refs}")
+    parts.append("\\end{document}")
+    return "\n\n".join(parts)
+
+def _title(rng: random.Random, keywords: List[str], density: float) -> str:
+    title = rng.choice(_TITLE_PATTERNS).format(
+        A=rng.choice(_TITLE_ADJECTIVES), B=rng.choice(_TITLE_NOUNS), C=rng.choice(_TITLE_TOPICS))
+    if keywords and rng.random() < min(1.0, density * 10):
+        title += f" via {rng.choice(keywords).title()}"
+    return title
+
+def iter_synthetic_papers(count: int, seed: int = 0, body_words: int = 2000, abstract_words: int = 150,
+                          keywords: Optional[List[str]] = None, keyword_density: float = 0.01,
+                          exclusion_keywords: Optional[List[str]] = None, exclusion_density: float = 0.002,
+                          important_words: Optional[List[str]] = None, important_density: float = 0.002,
+                          start_date: date = DEFAULT_START_DATE, days: int = 7) -> Iterator[Dict[str, Any]]:
+    # Densities are expected occurrences per generated word. Each paper scales
+    # them by its own random factor in [0, 2) so relevance scores spread out.
+    keywords = DEFAULT_KEYWORDS if keywords is None else keywords
+    exclusion_keywords = DEFAULT_EXCLUSION_KEYWORDS if exclusion_keywords is None else exclusion_keywords
+    important_words = DEFAULT_IMPORTANT_WORDS if important_words is None else important_words
+    rng = random.Random(seed)
+
+    for i in range(count):
+        relevance = rng.random() * 2
+        paper_id = f"{2400 + i // 100000}.{i % 100000:05d}v1"
+        body = _words(rng, body_words, keywords, keyword_density * relevance)
+        body = _insert_phrases(rng, body, exclusion_keywords, exclusion_density * (2 - relevance))
+        body = _insert_phrases(rng, body, important_words, important_density * relevance)
+        yield {
+            'id': paper_id,
+            'title': _title(rng, keywords, keyword_density * relevance),
+            'abstract': _sentences(_words(rng, abstract_words, keywords, keyword_density * relevance * 2), rng),
+            'content': _latex_body(rng, body),
+            'content_type': 'source',
+            'date': start_date + timedelta(days=rng.randrange(days)),
+            'link': f"http://arxiv.org/abs/{paper_id}",
+        }
+
+def generate_corpus(count: int, seed: int = 0, **options) -> List[Dict[str, Any]]:
+    return list(iter_synthetic_papers(count, seed=seed, **options))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a reproducible synthetic paper corpus as JSON lines")
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--body-words', type=int, default=2000)
+    parser.add_argument('--keyword-density', type=float, default=0.01)
+    parser.add_argument('--output', default='synthetic_corpus.jsonl')
+    args = parser.parse_args()
+
+    with open(args.output, 'w') as f:
+        for paper in iter_synthetic_papers(args.count, seed=args.seed, body_words=args.body_words,
+                                           keyword_density=args.keyword_density):
+            f.write(json.dumps({**paper, 'date': paper['date'].isoformat()}) + "\n")
+    print(f"Wrote {args.count} papers to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from benchmarks.corpus import generate_corpus
+from benchmarks.startup import measure_startup
+from benchmarks.stub_server import ArxivStub, load_fixture
+from paperweight.analyzer import get_abstracts
+from paperweight.engine import run_async_pipeline
+from paperweight.instrumentation import reset_metrics, run_metrics
+from paperweight.notifier import compose_notification
+from paperweight.processor import normalize_scores, process_papers
+from paperweight.scraper import (
+    extract_text_from_source,
+    fetch_arxiv_papers,
+    fetch_paper_contents,
+    get_recent_papers,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_SCORING_SIZES = [100, 1000, 10000]
+DEFAULT_LISTING_SIZES = [100, 1000]
+DEFAULT_DOWNLOAD_PAPERS = 8
+DEFAULT_PIPELINE_PAPERS = 8
+DEFAULT_REPEATS = 5
+
+
+def benchmark_config() -> Dict[str, Any]:
+    with open(os.path.join(REPO_ROOT, 'config-base.yaml')) as f:
+        config = yaml.safe_load(f)
+    config['arxiv'] = {'categories': ['cs.CL'], 'max_results': 0, 'dedup': False}
+    config['analyzer'] = {'type': 'abstract'}
+    config['notifier']['email']['sort_order'] = 'relevance'
+    return config
+
+def measure(func: Callable[[], Any], repeats: int, items: int = 1) -> Dict[str, Any]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    return {
+        'repeats': repeats,
+        'items': items,
+        'min_seconds': round(min(timings), 6),
+        'median_seconds': round(median, 6),
+        'mean_seconds': round(statistics.mean(timings), 6),
+        'max_seconds': round(max(timings), 6),
+        'items_per_second': round(items / median, 3) if median else 0.0,
+    }
+
+def bench_listing(sizes: List[int], repeats: int) -> Dict[str, Any]:
+    results = {}
+    start_date = date.today() - timedelta(days=1)
+    for size in sizes:
+        with ArxivStub(listing_size=size):
+            results[f'listing_parse[{size}]'] = measure(
+                lambda: fetch_arxiv_papers('cs.CL', start_date), repeats, size)
+    return results
+
+def bench_download(count: int, repeats: int) -> Dict[str, Any]:
+    # Includes the scraper's politeness delay between batches of requests
+    paper_ids = [f'2410.{10000 + i:05d}v1' for i in range(count)]
+    with ArxivStub():
+        return {f'download[{count}]': measure(lambda: fetch_paper_contents(paper_ids), repeats, count)}
+
+def bench_extraction(repeats: int) -> Dict[str, Any]:
+    eprint = load_fixture('eprint_sample.tar.gz')
+    pdf = load_fixture('test.pdf')
+    return {
+        'extract_source': measure(lambda: extract_text_from_source(eprint, 'source'), repeats * 20, 1),
+        'extract_pdf': measure(lambda: extract_text_from_source(pdf, 'pdf'), repeats * 4, 1),
+    }
+
+def bench_scoring(sizes: List[int], repeats: int, seed: int = 0) -> Dict[str, Any]:
+    config = benchmark_config()
+    results = {}
+    for size in sizes:
+        papers = generate_corpus(size, seed=seed)
+        results[f'scoring[{size}]'] = measure(
+            lambda: process_papers([dict(paper) for paper in papers], config['processor']), repeats, size)
+
+        scored = process_papers([dict(paper) for paper in papers], {**config['processor'], 'min_score': 0})
+        results[f'normalize[{size}]'] = measure(lambda: normalize_scores(scored), repeats, size)
+        for paper in scored:
+            paper['summary'] = paper['abstract']
+        results[f'notify[{size}]'] = measure(lambda: compose_notification(scored, config['notifier']), repeats, size)
+    return results
+
+def bench_pipeline(count: int, repeats: int) -> Dict[str, Any]:
+    config = benchmark_config()
+
+    def run_pipeline():
+        papers = get_recent_papers(force_refresh=True, config=config)
+        processed = process_papers(papers, config['processor'])
+        for paper, summary in zip(processed, get_abstracts(processed, config['analyzer'])):
+            paper['summary'] = summary
+        compose_notification(processed, config['notifier'])
+
+    def run_async():
+        for _, papers in run_async_pipeline(config, force_refresh=True):
+            compose_notification(papers, config['notifier'])
+
+    def run_metadata():
+        metadata_config = dict(config, arxiv=dict(config['arxiv'], fetch_depth='metadata'))
+        papers = get_recent_papers(force_refresh=True, config=metadata_config)
+        compose_notification(process_papers(papers, metadata_config['processor']), metadata_config['notifier'])
+
+    # get_recent_papers records the processed date in the working directory
+    original_cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir, ArxivStub(listing_size=count):
+        os.chdir(work_dir)
+        try:
+            for name, func in [(f'end_to_end[{count}]', run_pipeline), (f'end_to_end_async[{count}]', run_async),
+                               (f'end_to_end_metadata[{count}]', run_metadata)]:
+                reset_metrics()
+                results[name] = measure(func, repeats, count)
+                results[name]['stages'] = {
+                    stage: {key: summary[key] for key in ['count', 'total_seconds', 'p50_seconds']}
+                    for stage, summary in run_metrics.report()['stages'].items()
+                }
+        finally:
+            os.chdir(original_cwd)
+    return results
+
+def bench_startup(repeats: int) -> Dict[str, Any]:
+    startup = measure_startup(repeats)
+    return {
+        'startup_import': {'repeats': repeats, 'items': 1, **startup['import_main']},
+        'startup_noop_run': {'repeats': repeats, 'items': 1, **startup['noop_run'],
+                             'heavy_modules_loaded': startup['heavy_modules_loaded']},
+        'startup_check_run': {'repeats': repeats, 'items': 1, **startup['check_run']},
+    }
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+def run_benchmarks(scoring_sizes: Optional[List[int]] = None, listing_sizes: Optional[List[int]] = None,
+                   download_papers: int = DEFAULT_DOWNLOAD_PAPERS, pipeline_papers: int = DEFAULT_PIPELINE_PAPERS,
+                   repeats: int = DEFAULT_REPEATS, seed: int = 0) -> Dict[str, Any]:
+    results: Dict[str, Any] = bench_startup(repeats)
+    results.update(bench_listing(listing_sizes or DEFAULT_LISTING_SIZES, repeats))
+    results.update(bench_download(download_papers, max(1, repeats // 2)))
+    results.update(bench_extraction(repeats))
+    results.update(bench_scoring(scoring_sizes or DEFAULT_SCORING_SIZES, repeats, seed))
+    results.update(bench_pipeline(pipeline_papers, max(1, repeats // 2)))
+    return {'environment': {**environment(), 'seed': seed}, 'results': results}
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    lines = []
+    for name, result in current['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if previous is None or not previous['median_seconds']:
+            lines.append(f"{name:28s} {result['median_seconds']:10.4f}s  (new)")
+            continue
+        ratio = result['median_seconds'] / previous['median_seconds']
+        lines.append(f"{name:28s} {result['median_seconds']:10.4f}s  {ratio:6.2f}x vs baseline")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline paperweight benchmarks against recorded arXiv fixtures")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='Where to write the JSON results')
+    parser.add_argument('--compare', help='Previous results file to compare against')
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--scoring-sizes', type=int, nargs='+', default=DEFAULT_SCORING_SIZES)
+    parser.add_argument('--listing-sizes', type=int, nargs='+', default=DEFAULT_LISTING_SIZES)
+    parser.add_argument('--download-papers', type=int, default=DEFAULT_DOWNLOAD_PAPERS)
+    parser.add_argument('--pipeline-papers', type=int, default=DEFAULT_PIPELINE_PAPERS)
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the synthetic scoring corpus')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    report = run_benchmarks(args.scoring_sizes, args.listing_sizes, args.download_papers,
+                            args.pipeline_papers, args.repeats, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            lines = compare(report, json.load(f))
+    else:
+        lines = [f"{name:28s} {result['median_seconds']:10.4f}s  {result.get('items_per_second', 0):12.1f} items/s"
+                 for name, result in report['results'].items()]
+    print("\n".join(lines))
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
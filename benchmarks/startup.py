@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+from typing import Any, Dict, List
+
+import yaml
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# A cron invocation that finds nothing to do should stay well under this
+DEFAULT_TARGET_SECONDS = 0.5
+DEFAULT_REPEATS = 5
+# Modules that must not be imported until a code path actually needs them
+HEAVY_MODULES = ['SimplerLLM', 'openai', 'google.generativeai', 'pypdf', 'tiktoken', 'smtplib', 'http.server', 'pyarrow']
+# `paperweight check` additionally stays clear of the pipeline and its HTTP stack
+CHECK_EXCLUDED_MODULES = HEAVY_MODULES + ['requests', 'paperweight.scraper', 'paperweight.analyzer']
+
+
+def _environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    src = os.path.join(REPO_ROOT, 'src')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [src, env.get('PYTHONPATH')]))
+    return env
+
+def _time_command(command: List[str], cwd: str, repeats: int) -> List[float]:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=_environment(), check=True, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def heavy_modules_loaded(module: str = 'paperweight.main', modules: List[str] = HEAVY_MODULES) -> List[str]:
+    code = (f"import sys, json, {module}; "
+            f"print(json.dumps([m for m in {modules!r} if m in sys.modules]))")
+    output = subprocess.run([sys.executable, '-c', code], env=_environment(), check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output)
+
+def prepare_noop_directory(work_dir: str):
+    # A config plus today's processed date: main() exits after loading config
+    with open(os.path.join(REPO_ROOT, 'config-base.yaml')) as f:
+        config = yaml.safe_load(f)
+    config['logging']['file'] = 'paperweight.log'
+    with open(os.path.join(work_dir, 'config.yaml'), 'w') as f:
+        yaml.safe_dump(config, f)
+    with open(os.path.join(work_dir, 'last_processed_date.txt'), 'w') as f:
+        f.write(date.today().strftime("%Y-%m-%d"))
+
+def _summary(timings: List[float]) -> Dict[str, float]:
+    return {
+        'min_seconds': round(min(timings), 6),
+        'median_seconds': round(statistics.median(timings), 6),
+        'max_seconds': round(max(timings), 6),
+    }
+
+def measure_startup(repeats: int = DEFAULT_REPEATS) -> Dict[str, Any]:
+    work_dir = tempfile.mkdtemp()
+    try:
+        prepare_noop_directory(work_dir)
+        interpreter = _time_command([sys.executable, '-c', 'pass'], work_dir, repeats)
+        import_main = _time_command([sys.executable, '-c', 'import paperweight.main'], work_dir, repeats)
+        noop_run = _time_command([sys.executable, '-m', 'paperweight.main'], work_dir, repeats)
+        check_run = _time_command([sys.executable, '-m', 'paperweight.cli', 'check'], work_dir, repeats)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        'interpreter': _summary(interpreter),
+        'import_main': _summary(import_main),
+        'noop_run': _summary(noop_run),
+        'check_run': _summary(check_run),
+        'heavy_modules_loaded': heavy_modules_loaded() + heavy_modules_loaded('paperweight.cli', CHECK_EXCLUDED_MODULES),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure paperweight start-up and no-op invocation time")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    parser.add_argument('--target', type=float, default=DEFAULT_TARGET_SECONDS,
+                        help='Fail if the median no-op run takes longer than this many seconds')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    args = parser.parse_args()
+
+    results = measure_startup(args.repeats)
+    results['target_seconds'] = args.target
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+    if results['heavy_modules_loaded']:
+        print(f"Heavy modules imported at start-up: {', '.join(results['heavy_modules_loaded'])}")
+        sys.exit(1)
+    for name in ['noop_run', 'check_run']:
+        if results[name]['median_seconds'] > args.target:
+            print(f"{name} took {results[name]['median_seconds']:.3f}s, above the {args.target:.3f}s target")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import copy
+import os
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from paperweight import scraper
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'test_data')
+ATOM_NAMESPACE = 'http://www.w3.org/2005/Atom'
+
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), 'rb') as f:
+        return f.read()
+
+def build_listing(size, published=None):
+    # Expands the recorded feed to `size` entries with distinct ids, all
+    # published "now" so they fall inside the scraper's date window.
+    ET.register_namespace('', ATOM_NAMESPACE)
+    root = ET.fromstring(load_fixture('arxiv_listing.xml'))
+    templates = root.findall(f'{{{ATOM_NAMESPACE}}}entry')
+    for entry in templates:
+        root.remove(entry)
+
+    published = published or datetime.now().strftime('%Y-%m-%dT%H:%M:%SZ')
+    for i in range(size):
+        entry = copy.deepcopy(templates[i % len(templates)])
+        entry.find(f'{{{ATOM_NAMESPACE}}}id').text = f'http://arxiv.org/abs/2410.{10000 + i:05d}v1'
+        entry.find(f'{{{ATOM_NAMESPACE}}}published').text = published
+        title = entry.find(f'{{{ATOM_NAMESPACE}}}title')
+        title.text = f"{' '.join(title.text.split())} {i}"
+        root.append(entry)
+    return ET.tostring(root, encoding='utf-8', xml_declaration=True)
+
+
+class ArxivStubHandler(BaseHTTPRequestHandler):
+    listing_size = 100
+    # Every Nth paper has no e-print, exercising the PDF fallback (0 disables)
+    pdf_only_every = 4
+    latency = 0.0
+    listings: dict = {}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, content_type, status=200):
+        if self.latency:
+            time.sleep(self.latency)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/api/query':
+            size = self.listing_size
+            max_results = parse_qs(url.query).get('max_results')
+            if max_results:
+                size = min(size, int(max_results[0]))
+            if size not in self.listings:
+                self.listings[size] = build_listing(size)
+            self._send(self.listings[size], 'application/atom+xml')
+        elif url.path.startswith('/e-print/'):
+            index = int(url.path.rsplit('.', 1)[-1].split('v')[0]) - 10000
+            if self.pdf_only_every and index % self.pdf_only_every == self.pdf_only_every - 1:
+                self._send(b'Not found', 'text/plain', status=404)
+            else:
+                self._send(load_fixture('eprint_sample.tar.gz'), 'application/gzip')
+        elif url.path.startswith('/pdf/'):
+            self._send(load_fixture('test.pdf'), 'application/pdf')
+        else:
+            self._send(b'Not found', 'text/plain', status=404)
+
+    do_HEAD = do_GET
+
+
+class ArxivStub:
+    # Serves recorded fixtures on localhost and points the scraper at them
+    # for the duration of the `with` block.
+    def __init__(self, listing_size=100, pdf_only_every=4, latency=0.0):
+        self.handler = type('Handler', (ArxivStubHandler,), {
+            'listing_size': listing_size,
+            'pdf_only_every': pdf_only_every,
+            'latency': latency,
+            'listings': {},
+        })
+        self.server = None
+        self._original_urls = None
+
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler)
+        threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._original_urls = (scraper.ARXIV_API_URL, scraper.ARXIV_EPRINT_URL, scraper.ARXIV_PDF_URL)
+        scraper.ARXIV_API_URL = f"{base_url}/api/query"
+        scraper.ARXIV_EPRINT_URL = f"{base_url}/e-print"
+        scraper.ARXIV_PDF_URL = f"{base_url}/pdf"
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        scraper.ARXIV_API_URL, scraper.ARXIV_EPRINT_URL, scraper.ARXIV_PDF_URL = self._original_urls
+        self.server.shutdown()
+        self.server.server_close()
@@ -13,11 +13,14 @@ setup(
         "requests",
         "simplerllm",
         "tiktoken",
-        "tenacity",
     ],
+    extras_require={
+        # Columnar (Parquet) export of scored papers; see docs/CONFIGURATION.md
+        "analytics": ["pyarrow"],
+    },
     entry_points={
         "console_scripts": [
-            "paperweight=paperweight.main:main",
+            "paperweight=paperweight.cli:main",
         ],
     },
     author="Sean Brar",
@@ -0,0 +1,249 @@
+import glob
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATASET_DIR = "analytics"
+DEFAULT_EXPORT_BATCH_ROWS = 10000
+PAPERS_TABLE = "papers"
+STAGES_TABLE = "stages"
+PYARROW_MISSING = "The columnar export needs pyarrow; install it with: pip install 'paperweight[analytics]'"
+
+# Score breakdown components, flattened into one column each
+SCORE_COLUMNS = {
+    'score_title': ('keyword_matching', 'title'),
+    'score_abstract': ('keyword_matching', 'abstract'),
+    'score_content': ('keyword_matching', 'content'),
+    'score_exclusion_penalty': ('exclusion_penalty',),
+    'score_important_words': ('important_words',),
+}
+STAGE_COLUMNS = ['count', 'errors', 'total_seconds', 'mean_seconds', 'p50_seconds',
+                 'p90_seconds', 'p99_seconds', 'max_seconds']
+
+
+def _import_pyarrow():
+    # pyarrow is an optional dependency, only imported once something is exported
+    try:
+        import pyarrow  # type: ignore
+        import pyarrow.parquet  # type: ignore
+    except ImportError as e:
+        raise ImportError(PYARROW_MISSING) from e
+    return pyarrow, pyarrow.parquet
+
+def is_columnar_export(config: Mapping[str, Any]) -> bool:
+    return bool(config.get('analytics', {}).get('columnar_export', False))
+
+def new_run_id() -> str:
+    return f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+def papers_schema():
+    pa, _ = _import_pyarrow()
+    # The submission date is the partition key, so it lives in the directory name
+    return pa.schema(
+        [('run_id', pa.string()), ('id', pa.string()), ('title', pa.string()), ('link', pa.string()),
+         ('categories', pa.list_(pa.string())), ('profile', pa.string()), ('content_type', pa.string()),
+         ('relevance_score', pa.float64()), ('normalized_score', pa.float64()), ('selected', pa.bool_())]
+        + [(column, pa.float64()) for column in SCORE_COLUMNS]
+    )
+
+def stages_schema():
+    pa, _ = _import_pyarrow()
+    return pa.schema(
+        [('run_id', pa.string()), ('started_at', pa.string()), ('stage', pa.string())]
+        + [(column, pa.int64() if column in ('count', 'errors') else pa.float64()) for column in STAGE_COLUMNS]
+    )
+
+
+class ColumnarWriter:
+    # Streams rows into a Parquet dataset partitioned by date
+    # (<root>/date=YYYY-MM-DD/<run id>-NNNNN.parquet). Rows are buffered until
+    # batch_rows have arrived, then each flush writes one new file per date,
+    # so memory stays bounded however large the export. Existing files are
+    # never modified, and files are renamed into place once complete, so
+    # readers only ever see whole files.
+    def __init__(self, root: str, schema, run_id: str, batch_rows: int = DEFAULT_EXPORT_BATCH_ROWS):
+        self.pa, self.pq = _import_pyarrow()
+        self.root = root
+        self.schema = schema
+        self.run_id = run_id
+        self.batch_rows = batch_rows
+        self.buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self.buffered = 0
+        self.files = 0
+        self.rows_written = 0
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, partition: date, row: Dict[str, Any]):
+        self.buffers.setdefault(partition.isoformat(), []).append(row)
+        self.buffered += 1
+        if self.buffered >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        for partition, rows in sorted(self.buffers.items()):
+            self._write_file(partition, rows)
+        self.buffers = {}
+        self.buffered = 0
+
+    def _write_file(self, partition: str, rows: List[Dict[str, Any]]):
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        directory = os.path.join(self.root, f"date={partition}")
+        os.makedirs(directory, exist_ok=True)
+        name = f"{self.run_id}-{self.files:05d}.parquet"
+        # Dot-prefixed files are ignored by dataset readers until renamed
+        temp_path = os.path.join(directory, f".{name}.tmp")
+        self.pq.write_table(table, temp_path)
+        os.replace(temp_path, os.path.join(directory, name))
+        self.files += 1
+        self.rows_written += len(rows)
+
+    def close(self):
+        self.flush()
+
+
+class ScoredPapers:
+    # Every paper scored during a run, whether or not it was selected, for
+    # export_run. Papers are only kept while the export is enabled, so runs
+    # without it hold on to nothing. Scoring may run on several threads.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, enabled: bool = False):
+        with self._lock:
+            self.enabled = enabled
+            self.papers: List[Mapping[str, Any]] = []
+            # Selected papers are tracked by identity: with profiles, each
+            # profile scores its own copy of a paper
+            self._selected: set = set()
+
+    def add(self, papers: Iterable[Mapping[str, Any]]):
+        if self.enabled:
+            with self._lock:
+                self.papers.extend(papers)
+
+    def select(self, papers: Iterable[Mapping[str, Any]]):
+        if self.enabled:
+            with self._lock:
+                self._selected.update(id(paper) for paper in papers)
+
+    def is_selected(self, paper: Mapping[str, Any]) -> bool:
+        return id(paper) in self._selected
+
+
+_scored_papers = ScoredPapers()
+
+def reset_scored_papers(config: Optional[Mapping[str, Any]] = None):
+    _scored_papers.reset(config is not None and is_columnar_export(config))
+
+def record_scored_papers(papers: Iterable[Mapping[str, Any]]):
+    _scored_papers.add(papers)
+
+def record_selected_papers(papers: Iterable[Mapping[str, Any]]):
+    # Selected means above min_score and within max_papers, before any summarization
+    _scored_papers.select(papers)
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+def _score_component(breakdown: Mapping[str, Any], path: Tuple[str, ...]) -> Optional[float]:
+    value: Any = breakdown
+    for key in path:
+        if not isinstance(value, Mapping) or key not in value:
+            return None
+        value = value[key]
+    return float(value)
+
+def paper_row(paper: Mapping[str, Any], run_id: str, selected: Optional[bool] = None) -> Dict[str, Any]:
+    breakdown = paper.get('score_breakdown') or {}
+    row = {
+        'run_id': run_id,
+        'id': paper['id'],
+        'title': paper.get('title'),
+        'link': paper.get('link'),
+        'categories': list(paper.get('categories') or []),
+        'profile': paper.get('profile'),
+        'content_type': paper.get('content_type'),
+        'relevance_score': paper.get('relevance_score'),
+        'normalized_score': paper.get('normalized_score'),
+        'selected': selected,
+    }
+    row.update({column: _score_component(breakdown, path) for column, path in SCORE_COLUMNS.items()})
+    return row
+
+def open_papers_writer(dataset_dir: str, run_id: str,
+                       batch_rows: int = DEFAULT_EXPORT_BATCH_ROWS) -> ColumnarWriter:
+    return ColumnarWriter(os.path.join(dataset_dir, PAPERS_TABLE), papers_schema(), run_id, batch_rows)
+
+def get_dataset_dir(config: Mapping[str, Any]) -> str:
+    return config.get('analytics', {}).get('dataset_dir', DEFAULT_DATASET_DIR)
+
+def open_dataset_writer(config: Mapping[str, Any], run_id: str) -> ColumnarWriter:
+    batch_rows = int(config.get('analytics', {}).get('export_batch_rows', DEFAULT_EXPORT_BATCH_ROWS))
+    return open_papers_writer(get_dataset_dir(config), run_id, batch_rows)
+
+def write_papers(writer: ColumnarWriter, papers: Iterable[Mapping[str, Any]],
+                 is_selected: Optional[Callable[[Mapping[str, Any]], bool]] = None):
+    # Without is_selected, as for a backfill, the selected column is left empty
+    for paper in papers:
+        selected = is_selected(paper) if is_selected is not None else None
+        writer.write(_as_date(paper['date']), paper_row(paper, writer.run_id, selected))
+
+def write_stage_timings(dataset_dir: str, run_id: str, report: Dict[str, Any]):
+    started_at = report['started_at']
+    with ColumnarWriter(os.path.join(dataset_dir, STAGES_TABLE), stages_schema(), run_id) as writer:
+        partition = datetime.fromisoformat(started_at).date()
+        for stage, summary in sorted(report['stages'].items()):
+            writer.write(partition, {'run_id': run_id, 'started_at': started_at, 'stage': stage,
+                                     **{column: summary[column] for column in STAGE_COLUMNS}})
+        # The whole run, as one more stage
+        writer.write(partition, {'run_id': run_id, 'started_at': started_at, 'stage': 'run', 'count': 1,
+                                 'errors': 0, **{column: report['wall_time_seconds'] for column in STAGE_COLUMNS[2:]}})
+
+def export_run(config: Dict[str, Any], report: Dict[str, Any]):
+    # Appends every paper scored in this run, once per profile that scored
+    # it, with its score breakdown and whether it was selected, and the run's
+    # stage timings. An export failure is logged and does not fail the run.
+    if not is_columnar_export(config):
+        return
+    dataset_dir = get_dataset_dir(config)
+    run_id = new_run_id()
+    try:
+        with open_dataset_writer(config, run_id) as writer:
+            write_papers(writer, _scored_papers.papers, _scored_papers.is_selected)
+        write_stage_timings(dataset_dir, run_id, report)
+        logger.info(f"Exported {writer.rows_written} papers and stage timings to {dataset_dir} (run {run_id})")
+    except Exception as e:
+        logger.error(f"Error exporting run to columnar dataset: {e}")
+
+def iter_corpus(corpus_dir: str) -> Iterable[Dict[str, Any]]:
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '**', '*.jsonl'), recursive=True)):
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def export_corpus(corpus_dir: str, dataset_dir: str = DEFAULT_DATASET_DIR,
+                  batch_rows: int = DEFAULT_EXPORT_BATCH_ROWS) -> int:
+    # Converts a backfill corpus (JSON Lines) into the papers table, reading
+    # one line at a time
+    run_id = new_run_id()
+    with open_papers_writer(dataset_dir, run_id, batch_rows) as writer:
+        write_papers(writer, iter_corpus(corpus_dir))
+    logger.info(f"Exported {writer.rows_written} papers from {corpus_dir} to {dataset_dir} (run {run_id})")
+    return writer.rows_written
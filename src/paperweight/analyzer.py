@@ -1,58 +1,234 @@
 import logging
-from typing import Any, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
 
-from SimplerLLM.language.llm import (  # type: ignore
-    LLM,
-    LLMProvider,
-)
-from tenacity import retry, stop_after_attempt, wait_exponential
+from paperweight.cache import CacheKey, hash_prompt_template, open_summary_cache
+from paperweight.instrumentation import increment, timed
+from paperweight.preprocess import clean_paper_text
+from paperweight.ratelimit import RateLimiter
+from paperweight.resilience import TransientError, resilient
+from paperweight.utils import count_tokens, split_into_token_chunks, truncate_to_tokens
 
-from paperweight.utils import count_tokens
+if TYPE_CHECKING:
+    from SimplerLLM.language.llm import LLM  # type: ignore
 
 logger = logging.getLogger(__name__)
 
-def get_abstracts(processed_papers, config):
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+DEFAULT_MAX_INPUT_TOKENS = 12000
+DEFAULT_MAX_CHUNKS = 4
+DEFAULT_MODELS = {
+    'openai': 'gpt-4o-mini',
+    'gemini': 'gemini-1.5-flash',
+}
+SUMMARY_PROMPT_TEMPLATE = "Write a concise, accurate summary of the following paper's content in about 3-5 sentences:\n\n```{content}```"
+CHUNK_PROMPT_TEMPLATE = "The following is one part of a longer paper. Summarize the key points of this part in a few sentences:\n\n```{content}```"
+REDUCE_PROMPT_TEMPLATE = "The following are summaries of consecutive parts of a paper. Combine them into a concise, accurate summary of the whole paper in about 3-5 sentences:\n\n```{content}```"
+
+def get_abstracts(processed_papers, config, client_pool=None):
     analysis_type = config.get('type', 'abstract')
 
     if analysis_type == 'abstract':
         return [paper['abstract'] for paper in processed_papers]
     elif analysis_type == 'summary':
-        return [summarize_paper(paper, config) for paper in processed_papers]
+        return summarize_papers(processed_papers, config, client_pool)
     else:
         raise ValueError(f"Unknown analysis type: {analysis_type}")
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-def summarize_paper(paper: Dict[str, Any], config: Dict[str, Any]) -> str:
-    llm_provider = config.get('analyzer', {}).get('llm_provider', 'openai').lower()
-    api_key = config.get('analyzer', {}).get('api_key')
+class LLMClientPool:
+    # Clients are created lazily and kept on a free list: a request borrows
+    # an idle client (or creates one) and hands it back when it is done, so
+    # clients outlive the worker threads and executors that used them. At
+    # most max_in_flight clients exist when a cap is set. Rate limits and the
+    # in-flight cap are shared by every caller of generate().
+    def __init__(self, provider: str, api_key: str, max_in_flight: int = 0,
+                 request_limiter: Optional[RateLimiter] = None,
+                 token_limiter: Optional[RateLimiter] = None):
+        self.provider = provider
+        self.api_key = api_key
+        self.model_name = DEFAULT_MODELS.get(provider, '')
+        self.request_limiter = request_limiter
+        self.token_limiter = token_limiter
+        self.created = 0
+        self._in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight > 0 else None
+        self._idle: List['LLM'] = []
+        self._lock = threading.Lock()
 
-    if llm_provider not in ['openai', 'gemini'] or not api_key:
-        logger.warning(f"No valid LLM provider or API key available for {llm_provider}. Falling back to abstract.")
-        return paper['abstract']
+    def acquire(self) -> 'LLM':
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        client = create_llm_instance(self.provider, self.api_key)
+        with self._lock:
+            self.created += 1
+        logger.debug(f"Created {self.provider} client ({self.created} in total)")
+        return client
 
-    try:
-        provider = LLMProvider[llm_provider.upper()]
-        model_name = 'gpt-4o-mini' if provider == LLMProvider.OPENAI else 'gemini-1.5-flash'
-        llm_instance = LLM.create(provider=provider, model_name=model_name, api_key=api_key)
-        prompt = f"Write a concise, accurate summary of the following paper's content in about 3-5 sentences:\n\n```{paper['content']}```"
+    def release(self, client: 'LLM'):
+        with self._lock:
+            self._idle.append(client)
+
+    @contextmanager
+    def client(self) -> Iterator['LLM']:
+        client = self.acquire()
+        try:
+            yield client
+        finally:
+            self.release(client)
 
-        input_tokens = count_tokens(prompt)
+    def generate(self, prompt: str) -> str:
+        input_tokens = count_tokens(prompt, self.model_name)
         logger.info(f"Input token count: {input_tokens}")
+        increment('llm_requests')
+        increment('llm_input_tokens', input_tokens)
 
-        response = llm_instance.generate_response(prompt=prompt)
+        if self.request_limiter is not None:
+            self.request_limiter.acquire()
+        if self.token_limiter is not None:
+            self.token_limiter.acquire(input_tokens)
 
-        output_tokens = count_tokens(response)
+        response = self._request(prompt)
+
+        output_tokens = count_tokens(response, self.model_name)
         logger.info(f"Output token count: {output_tokens}")
+        increment('llm_output_tokens', output_tokens)
+        if self.token_limiter is not None:
+            self.token_limiter.charge(output_tokens)
 
         return response
+
+    # SimplerLLM already retries inside generate_response and returns None once
+    # it gives up, so this makes a single attempt; the shared 'llm' circuit
+    # then fails later papers fast (to their abstracts) while the provider is down.
+    @resilient('llm', attempts=1)
+    def _request(self, prompt: str) -> str:
+        if self._in_flight is not None:
+            with self._in_flight:
+                response = self._generate_response(prompt)
+        else:
+            response = self._generate_response(prompt)
+        if response is None:
+            raise TransientError(f"{self.provider} returned no response")
+        return response
+
+    def _generate_response(self, prompt: str) -> Optional[str]:
+        with self.client() as llm_instance:
+            return llm_instance.generate_response(prompt=prompt)
+
+def create_client_pool(analyzer_config: Dict[str, Any]) -> LLMClientPool:
+    return LLMClientPool(
+        analyzer_config.get('llm_provider', 'openai').lower(),
+        analyzer_config.get('api_key', ''),
+        max_in_flight=int(analyzer_config.get('max_concurrent_requests', DEFAULT_MAX_CONCURRENT_REQUESTS)),
+        request_limiter=RateLimiter(float(analyzer_config.get('requests_per_minute', 0))),
+        token_limiter=RateLimiter(float(analyzer_config.get('tokens_per_minute', 0))),
+    )
+
+def summarize_papers(papers: List[Dict[str, Any]], analyzer_config: Dict[str, Any],
+                     client_pool: Optional[LLMClientPool] = None) -> List[str]:
+    if client_pool is None:
+        client_pool = create_client_pool(analyzer_config)
+    max_workers = int(analyzer_config.get('max_concurrent_requests', DEFAULT_MAX_CONCURRENT_REQUESTS))
+    config = {'analyzer': analyzer_config}
+
+    summary_cache = open_summary_cache(analyzer_config)
+    if summary_cache is None:
+        return _run_summaries(papers, config, max_workers, client_pool)
+
+    with summary_cache:
+        summaries: List[Optional[str]] = [None] * len(papers)
+        cache_keys = [get_summary_cache_key(paper, analyzer_config) for paper in papers]
+        for i, key in enumerate(cache_keys):
+            if key is not None:
+                summaries[i] = summary_cache.get(key)
+
+        pending = [i for i, summary in enumerate(summaries) if summary is None]
+        logger.info(f"Found {len(papers) - len(pending)} cached summaries, {len(pending)} to generate")
+        generated = _run_summaries([papers[i] for i in pending], config, max_workers, client_pool)
+        for i, summary in zip(pending, generated):
+            summaries[i] = summary
+            key = cache_keys[i]
+            # summarize_paper falls back to the abstract on failure; don't cache that
+            if key is not None and summary and summary != papers[i].get('abstract'):
+                summary_cache.put(key, summary)
+
+    return [summary or '' for summary in summaries]
+
+def _run_summaries(papers, config, max_workers, client_pool) -> List[str]:
+    if not papers:
+        return []
+    logger.info(f"Summarizing {len(papers)} papers with up to {max_workers} concurrent requests")
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # executor.map yields results in input order regardless of completion order
+        return list(executor.map(lambda paper: summarize_paper(paper, config, client_pool), papers))
+
+def get_summary_cache_key(paper: Dict[str, Any], analyzer_config: Dict[str, Any]) -> Optional[CacheKey]:
+    if not paper.get('id'):
+        return None
+    provider = analyzer_config.get('llm_provider', 'openai').lower()
+    model_name = DEFAULT_MODELS.get(provider, '')
+    # Budget and strategy change what the model sees, so they are part of the prompt identity
+    prompt_identity = '|'.join([
+        SUMMARY_PROMPT_TEMPLATE, CHUNK_PROMPT_TEMPLATE, REDUCE_PROMPT_TEMPLATE,
+        str(analyzer_config.get('summary_strategy', 'truncate')),
+        str(analyzer_config.get('max_input_tokens', DEFAULT_MAX_INPUT_TOKENS)),
+        str(analyzer_config.get('max_chunks', DEFAULT_MAX_CHUNKS)),
+    ])
+    return (paper['id'], provider, model_name, hash_prompt_template(prompt_identity))
+
+@timed('summarize_paper')
+def summarize_paper(paper: Dict[str, Any], config: Dict[str, Any],
+                    client_pool: Optional[LLMClientPool] = None) -> str:
+    analyzer_config = config.get('analyzer', {})
+    llm_provider = analyzer_config.get('llm_provider', 'openai').lower()
+    api_key = analyzer_config.get('api_key')
+
+    if llm_provider not in ['openai', 'gemini'] or not api_key:
+        logger.warning(f"No valid LLM provider or API key available for {llm_provider}. Falling back to abstract.")
+        return paper['abstract']
+
+    try:
+        if client_pool is None:
+            client_pool = LLMClientPool(llm_provider, api_key)
+        content = clean_paper_text(paper['content'], paper.get('content_type', 'source'))
+        max_input_tokens = int(analyzer_config.get('max_input_tokens', DEFAULT_MAX_INPUT_TOKENS))
+
+        if analyzer_config.get('summary_strategy', 'truncate') == 'map_reduce':
+            chunks = split_into_token_chunks(content, max_input_tokens, client_pool.model_name)
+            if len(chunks) > 1:
+                max_chunks = int(analyzer_config.get('max_chunks', DEFAULT_MAX_CHUNKS))
+                summary = _map_reduce_summary(chunks[:max_chunks], client_pool)
+                increment('papers_summarized')
+                return summary
+
+        content = truncate_to_tokens(content, max_input_tokens, client_pool.model_name)
+        summary = client_pool.generate(SUMMARY_PROMPT_TEMPLATE.format(content=content))
+        increment('papers_summarized')
+        return summary
     except Exception as e:
         logger.error(f"Error summarizing paper: {e}", exc_info=True)
         return paper['abstract']
 
-def create_llm_instance(provider: str, api_key: str) -> LLM:
+def _map_reduce_summary(chunks: List[str], client_pool: LLMClientPool) -> str:
+    logger.info(f"Summarizing long paper in {len(chunks)} chunks")
+    # Chunk requests still pass through the pool's in-flight cap and rate limits
+    with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+        partial_summaries = list(executor.map(
+            lambda chunk: client_pool.generate(CHUNK_PROMPT_TEMPLATE.format(content=chunk)),
+            chunks
+        ))
+    return client_pool.generate(REDUCE_PROMPT_TEMPLATE.format(content="\n\n".join(partial_summaries)))
+
+def create_llm_instance(provider: str, api_key: str) -> 'LLM':
+    # SimplerLLM imports every provider SDK, which takes longer than the rest
+    # of startup combined, so it is only loaded once a client is needed
+    from SimplerLLM.language.llm import LLM, LLMProvider  # type: ignore
+
     if provider == 'openai':
-        return LLM.create(provider=LLMProvider.OPENAI, model_name="gpt-4o-mini", api_key=api_key)
+        return LLM.create(provider=LLMProvider.OPENAI, model_name=DEFAULT_MODELS['openai'], api_key=api_key)
     elif provider == 'gemini':
-        return LLM.create(provider=LLMProvider.GEMINI, model_name="gemini-1.5-flash", api_key=api_key)
+        return LLM.create(provider=LLMProvider.GEMINI, model_name=DEFAULT_MODELS['gemini'], api_key=api_key)
     else:
         raise ValueError(f"Unsupported LLM provider: {provider}")
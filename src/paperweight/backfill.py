@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from paperweight.analytics import (
+    is_columnar_export,
+    new_run_id,
+    open_dataset_writer,
+    write_papers,
+)
+from paperweight.dedup import (
+    DEDUP_INDEX_FILE,
+    DEFAULT_THRESHOLD,
+    PaperIndex,
+    indexed_paper_ids,
+    is_duplicate_paper,
+    minhash_signature,
+    signature_text,
+)
+from paperweight.instrumentation import increment
+from paperweight.paper import Paper, serialize_paper
+from paperweight.processor import calculate_paper_score
+from paperweight.profiles import get_fetch_categories
+from paperweight.ratelimit import SharedRateLimiter
+from paperweight.scraper import (
+    build_paper_record,
+    extract_text_from_source,
+    fetch_arxiv_range,
+    fetch_paper_content,
+    is_metadata_only,
+    use_rate_limiter,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_STATE_FILE = "backfill_state.json"
+DEFAULT_CORPUS_DIR = "corpus"
+DEFAULT_WORKER_PROCESSES = 4
+DEFAULT_SHARD_DAYS = 1
+# arXiv asks API users for no more than one request every three seconds
+DEFAULT_ARXIV_REQUESTS_PER_MINUTE = 20
+
+# (category, first day, last day), both days inclusive
+Shard = Tuple[str, date, date]
+
+
+def build_shards(categories: List[str], start_date: date, end_date: date,
+                 shard_days: int = DEFAULT_SHARD_DAYS) -> List[Shard]:
+    shards: List[Shard] = []
+    day = start_date
+    while day <= end_date:
+        last_day = min(day + timedelta(days=shard_days - 1), end_date)
+        shards.extend((category, day, last_day) for category in categories)
+        day = last_day + timedelta(days=1)
+    return shards
+
+def shard_key(shard: Shard) -> str:
+    category, first_day, last_day = shard
+    days = first_day.isoformat() if first_day == last_day else f"{first_day}_{last_day}"
+    return f"{category}/{days}"
+
+def load_backfill_state(state_file: str = BACKFILL_STATE_FILE) -> Set[str]:
+    try:
+        if os.path.exists(state_file):
+            with open(state_file, 'r') as f:
+                return set(json.load(f).get('completed_shards', []))
+    except (IOError, ValueError) as e:
+        logger.error(f"Error reading backfill state: {e}")
+    return set()
+
+def save_backfill_state(completed: Set[str], state_file: str = BACKFILL_STATE_FILE):
+    with open(state_file, 'w') as f:
+        json.dump({'completed_shards': sorted(completed)}, f, indent=2)
+
+def write_corpus_shard(corpus_dir: str, shard: Shard, papers: List[Dict[str, Any]]) -> str:
+    # One JSON line per paper. Appends, skipping papers already written by an
+    # attempt that was interrupted before the shard was marked complete.
+    path = os.path.join(corpus_dir, f"{shard_key(shard)}.jsonl")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    written = set()
+    if os.path.exists(path):
+        with open(path, 'r') as f:
+            written = {json.loads(line)['id'] for line in f if line.strip()}
+    with open(path, 'a') as f:
+        for paper in papers:
+            if paper['id'] not in written:
+                f.write(json.dumps(paper) + "\n")
+    return path
+
+
+# Set in each worker process by the pool initializer
+_worker_config: Dict[str, Any] = {}
+
+def _init_worker(config: Dict[str, Any], limiter: SharedRateLimiter):
+    global _worker_config
+    _worker_config = config
+    use_rate_limiter(limiter)
+
+def process_shard(shard: Shard) -> List[Tuple[Dict[str, Any], List[int]]]:
+    # Runs in a worker process: lists the shard, skips papers the index
+    # already has, then downloads, extracts and scores the rest. Only the
+    # parent process writes to the index and the corpus, so results come
+    # back as serialized papers with their MinHash signatures.
+    config = _worker_config
+    category, first_day, last_day = shard
+    listing = fetch_arxiv_range(category, first_day, last_day)
+    paper_ids = [paper['link'].split('/abs/')[-1] for paper in listing]
+    seen = indexed_paper_ids(config['arxiv'].get('dedup_index_file', DEDUP_INDEX_FILE), paper_ids)
+
+    results = []
+    for paper, paper_id in zip(listing, paper_ids):
+        if paper_id in seen:
+            continue
+        try:
+            record = _build_record(paper, paper_id, config['arxiv'])
+        except Exception as e:
+            logger.error(f"Error fetching content for paper ID {paper_id}: {e}")
+            continue
+        if record is None:
+            continue
+        # Every paper is scored, not just those above min_score, so the corpus can be re-thresholded later
+        record['relevance_score'], record['score_breakdown'] = calculate_paper_score(record, config['processor'])
+        results.append((serialize_paper(record), minhash_signature(signature_text(record))))
+    logger.info(f"Shard {shard_key(shard)}: {len(results)} new of {len(listing)} listed papers")
+    return results
+
+def _build_record(paper: Dict[str, Any], paper_id: str, arxiv_config: Dict[str, Any]) -> Optional[Paper]:
+    if is_metadata_only(arxiv_config):
+        return build_paper_record(paper, paper_id, None, 'metadata')
+    content, method = fetch_paper_content(paper_id, max_source_bytes=int(arxiv_config.get('max_source_bytes', 0)))
+    if not content:
+        return None
+    return build_paper_record(paper, paper_id, extract_text_from_source(content, method), method)
+
+
+def run_backfill(config: Dict[str, Any], start_date: date, end_date: date,
+                 worker_processes: Optional[int] = None,
+                 state_file: str = BACKFILL_STATE_FILE) -> Dict[str, int]:
+    # Shards that finished in an earlier invocation are skipped, so an
+    # interrupted backfill resumes by running the same command again.
+    backfill_config = config.get('backfill', {})
+    workers = worker_processes or int(backfill_config.get('worker_processes', DEFAULT_WORKER_PROCESSES))
+    corpus_dir = backfill_config.get('corpus_dir', DEFAULT_CORPUS_DIR)
+    shard_days = int(backfill_config.get('shard_days', DEFAULT_SHARD_DAYS))
+
+    completed = load_backfill_state(state_file)
+    all_shards = build_shards(get_fetch_categories(config), start_date, end_date, shard_days)
+    shards = [shard for shard in all_shards if shard_key(shard) not in completed]
+    logger.info(f"Backfilling {start_date} to {end_date}: {len(shards)} shards to run, "
+                f"{len(all_shards) - len(shards)} already complete, {workers} worker processes")
+
+    totals = {'shards': 0, 'failed_shards': 0, 'papers': 0}
+    if not shards:
+        return totals
+
+    # Scored papers also go to the analytics dataset when it is enabled
+    writer = open_dataset_writer(config, new_run_id()) if is_columnar_export(config) else None
+    limiter = SharedRateLimiter(float(backfill_config.get('arxiv_requests_per_minute', DEFAULT_ARXIV_REQUESTS_PER_MINUTE)))
+    index = PaperIndex(
+        path=config['arxiv'].get('dedup_index_file', DEDUP_INDEX_FILE),
+        threshold=float(config['arxiv'].get('dedup_threshold', DEFAULT_THRESHOLD)),
+    )
+    with index, ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(config, limiter)) as executor:
+        futures = {executor.submit(process_shard, shard): shard for shard in shards}
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                # Left incomplete, so the next invocation retries it
+                logger.error(f"Backfill shard {shard_key(shard)} failed: {e}")
+                totals['failed_shards'] += 1
+                continue
+
+            # Cross-listed papers turn up in several shards; the index keeps the first
+            papers = [paper for paper, signature in results
+                      if not index.contains(paper['id']) and not is_duplicate_paper(paper, index, signature)]
+            write_corpus_shard(corpus_dir, shard, papers)
+            index.conn.commit()
+            if writer is not None:
+                # Flushed per shard, so a completed shard is always in the dataset
+                write_papers(writer, papers)
+                writer.flush()
+            completed.add(shard_key(shard))
+            save_backfill_state(completed, state_file)
+            totals['shards'] += 1
+            totals['papers'] += len(papers)
+            increment('papers_backfilled', len(papers))
+
+    logger.info(f"Backfill wrote {totals['papers']} papers from {totals['shards']} shards to {corpus_dir}; "
+                f"{totals['failed_shards']} shards failed")
+    return totals
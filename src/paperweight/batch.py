@@ -0,0 +1,251 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import requests
+
+from paperweight.analyzer import (
+    DEFAULT_MAX_INPUT_TOKENS,
+    DEFAULT_MODELS,
+    SUMMARY_PROMPT_TEMPLATE,
+    get_summary_cache_key,
+)
+from paperweight.cache import open_summary_cache
+from paperweight.paper import deserialize_paper, serialize_paper
+from paperweight.preprocess import clean_paper_text
+from paperweight.utils import BATCH_STATE_FILE, truncate_to_tokens_batch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_API_BASE = "https://api.openai.com/v1"
+DEFAULT_POLL_INTERVAL = 60
+BATCH_PROVIDERS = ['openai']
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+SYSTEM_PROMPT = "You are a helpful AI Assistant"
+MAX_OUTPUT_TOKENS = 300
+
+
+class BatchClient:
+    # Minimal client for the OpenAI-compatible Batch API: upload a JSONL file,
+    # create a batch from it, poll the batch, download the output file.
+    def __init__(self, api_key: str, base_url: str = DEFAULT_BATCH_API_BASE, timeout: int = 60):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f"Bearer {api_key}"
+
+    def upload_file(self, content: bytes) -> str:
+        response = self.session.post(
+            f"{self.base_url}/files",
+            data={'purpose': 'batch'},
+            files={'file': ('batch.jsonl', content, 'application/jsonl')},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()['id']
+
+    def create_batch(self, input_file_id: str) -> Dict[str, Any]:
+        response = self.session.post(
+            f"{self.base_url}/batches",
+            json={
+                'input_file_id': input_file_id,
+                'endpoint': '/v1/chat/completions',
+                'completion_window': '24h',
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def get_batch(self, batch_id: str) -> Dict[str, Any]:
+        response = self.session.get(f"{self.base_url}/batches/{batch_id}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def download_file(self, file_id: str) -> str:
+        response = self.session.get(f"{self.base_url}/files/{file_id}/content", timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+
+def create_batch_client(analyzer_config: Dict[str, Any]) -> BatchClient:
+    return BatchClient(
+        analyzer_config.get('api_key', ''),
+        base_url=analyzer_config.get('batch_api_base', DEFAULT_BATCH_API_BASE)
+    )
+
+def is_batch_mode(analyzer_config: Dict[str, Any]) -> bool:
+    if analyzer_config.get('type') != 'summary' or analyzer_config.get('summary_mode') != 'batch':
+        return False
+    provider = analyzer_config.get('llm_provider', 'openai').lower()
+    if provider not in BATCH_PROVIDERS:
+        logger.warning(f"Batch summarization is not supported for {provider}. Using interactive mode.")
+        return False
+    return True
+
+def build_batch_requests(papers: List[Dict[str, Any]], analyzer_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    provider = analyzer_config.get('llm_provider', 'openai').lower()
+    model_name = DEFAULT_MODELS[provider]
+    max_input_tokens = int(analyzer_config.get('max_input_tokens', DEFAULT_MAX_INPUT_TOKENS))
+
+    contents = [clean_paper_text(paper['content'], paper.get('content_type', 'source')) for paper in papers]
+    batch_requests = []
+    for i, content in enumerate(truncate_to_tokens_batch(contents, max_input_tokens, model_name)):
+        prompt = SUMMARY_PROMPT_TEMPLATE.format(content=content)
+        batch_requests.append({
+            'custom_id': f"paper-{i}",
+            'method': 'POST',
+            'url': '/v1/chat/completions',
+            'body': {
+                'model': model_name,
+                'messages': [
+                    {'role': 'system', 'content': SYSTEM_PROMPT},
+                    {'role': 'user', 'content': prompt},
+                ],
+                'max_tokens': MAX_OUTPUT_TOKENS,
+            },
+        })
+    return batch_requests
+
+def parse_batch_results(output: str) -> Dict[str, str]:
+    summaries = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get('response') or {}
+        if result.get('error') or response.get('status_code') != 200:
+            logger.warning(f"Batch request {result.get('custom_id')} failed: {result.get('error') or response}")
+            continue
+        summaries[result['custom_id']] = response['body']['choices'][0]['message']['content']
+    return summaries
+
+def load_pending_batches(state_file: str = BATCH_STATE_FILE) -> List[Dict[str, Any]]:
+    try:
+        if os.path.exists(state_file):
+            with open(state_file, 'r') as f:
+                return json.load(f).get('batches', [])
+    except (IOError, ValueError) as e:
+        logger.error(f"Error reading pending batches: {e}")
+    return []
+
+def save_pending_batches(batches: List[Dict[str, Any]], state_file: str = BATCH_STATE_FILE):
+    if not batches:
+        if os.path.exists(state_file):
+            os.remove(state_file)
+        return
+    with open(state_file, 'w') as f:
+        json.dump({'batches': batches}, f, indent=2)
+
+def submit_summary_batch(papers: List[Dict[str, Any]], analyzer_config: Dict[str, Any],
+                         client: Optional[BatchClient] = None,
+                         state_file: str = BATCH_STATE_FILE) -> Optional[str]:
+    summary_cache = open_summary_cache(analyzer_config)
+    if summary_cache is not None:
+        with summary_cache:
+            for paper in papers:
+                key = get_summary_cache_key(paper, analyzer_config)
+                cached = summary_cache.get(key) if key is not None else None
+                if cached is not None:
+                    paper['summary'] = cached
+
+    pending = [paper for paper in papers if 'summary' not in paper]
+    if not pending:
+        logger.info("All summaries found in cache. No batch submitted.")
+        return None
+
+    client = client or create_batch_client(analyzer_config)
+    batch_requests = build_batch_requests(pending, analyzer_config)
+    jsonl = "\n".join(json.dumps(request) for request in batch_requests).encode('utf-8')
+
+    input_file_id = client.upload_file(jsonl)
+    batch = client.create_batch(input_file_id)
+    logger.info(f"Submitted batch {batch['id']} with {len(batch_requests)} summarization requests")
+
+    for i, paper in enumerate(pending):
+        paper['batch_custom_id'] = f"paper-{i}"
+    batches = load_pending_batches(state_file)
+    batches.append({
+        'batch_id': batch['id'],
+        'submitted_at': datetime.now().isoformat(),
+        'papers': [serialize_paper(paper) for paper in papers],
+    })
+    save_pending_batches(batches, state_file)
+    return batch['id']
+
+def submit_profile_batches(selections, analyzer_config: Dict[str, Any]):
+    # Takes (profile_config, papers) pairs. Batches are per profile so that
+    # collected results reach the right recipients; returns the pairs whose
+    # summaries were all cached and can be sent straight away.
+    ready = []
+    for profile_config, papers in selections:
+        batch_id = submit_summary_batch(papers, analyzer_config)
+        if batch_id is None:
+            ready.append((profile_config, papers))
+        else:
+            name = profile_config.get('profile_name')
+            label = f"profile '{name}'" if name else f"{len(papers)} papers"
+            logger.info(f"Summaries for {label} requested in batch {batch_id}")
+    return ready
+
+def collect_summary_batches(analyzer_config: Dict[str, Any], client: Optional[BatchClient] = None,
+                            state_file: str = BATCH_STATE_FILE) -> List[List[Dict[str, Any]]]:
+    batches = load_pending_batches(state_file)
+    if not batches:
+        return []
+
+    client = client or create_batch_client(analyzer_config)
+    completed = []
+    still_pending = []
+    for entry in batches:
+        batch = client.get_batch(entry['batch_id'])
+        status = batch.get('status')
+        if status not in TERMINAL_STATUSES:
+            logger.info(f"Batch {entry['batch_id']} is still {status}")
+            still_pending.append(entry)
+            continue
+
+        summaries = {}
+        if batch.get('output_file_id'):
+            summaries = parse_batch_results(client.download_file(batch['output_file_id']))
+        if status != 'completed':
+            logger.warning(f"Batch {entry['batch_id']} ended with status {status}")
+        logger.info(f"Collected {len(summaries)} summaries from batch {entry['batch_id']}")
+
+        papers = [deserialize_paper(paper) for paper in entry['papers']]
+        for paper in papers:
+            custom_id = paper.pop('batch_custom_id', None)
+            if 'summary' not in paper:
+                paper['summary'] = summaries.get(custom_id) or paper['abstract']
+        _store_batch_summaries(papers, summaries, analyzer_config)
+        completed.append(papers)
+
+    save_pending_batches(still_pending, state_file)
+    return completed
+
+def _store_batch_summaries(papers, summaries, analyzer_config):
+    summary_cache = open_summary_cache(analyzer_config)
+    if summary_cache is None:
+        return
+    with summary_cache:
+        generated = set(summaries.values())
+        for paper in papers:
+            key = get_summary_cache_key(paper, analyzer_config)
+            if key is not None and paper['summary'] in generated:
+                summary_cache.put(key, paper['summary'])
+
+def wait_for_batches(analyzer_config: Dict[str, Any], client: Optional[BatchClient] = None,
+                     state_file: str = BATCH_STATE_FILE) -> List[List[Dict[str, Any]]]:
+    timeout = float(analyzer_config.get('batch_wait_timeout', 0))
+    poll_interval = float(analyzer_config.get('batch_poll_interval', DEFAULT_POLL_INTERVAL))
+    client = client or create_batch_client(analyzer_config)
+    deadline = time.monotonic() + timeout
+
+    completed = collect_summary_batches(analyzer_config, client, state_file)
+    while not completed and load_pending_batches(state_file) and time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        completed = collect_summary_batches(analyzer_config, client, state_file)
+    return completed
@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from paperweight.instrumentation import increment
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_CACHE_FILE = "summary_cache.db"
+CONTENT_FORMAT_CACHE_FILE = "content_formats.db"
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 10000
+
+CacheKey = Tuple[str, str, str, str]
+# (format, size in bytes or None when unknown)
+ContentFormat = Tuple[str, Optional[int]]
+
+
+def hash_prompt_template(template: str) -> str:
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:16]
+
+
+class SummaryCache:
+    def __init__(self, path: str = SUMMARY_CACHE_FILE, ttl_days: float = DEFAULT_TTL_DAYS,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                paper_id TEXT NOT NULL,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_hash TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (paper_id, provider, model, prompt_hash)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS summaries_accessed_at ON summaries (accessed_at)")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.evict()
+        self.conn.commit()
+        self.conn.close()
+        if self.hits or self.misses:
+            logger.info(f"Summary cache: {self.hits} hits, {self.misses} misses")
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT summary, created_at FROM summaries "
+            "WHERE paper_id = ? AND provider = ? AND model = ? AND prompt_hash = ?",
+            key
+        ).fetchone()
+        now = time.time()
+        if row is None or self._is_expired(row[1], now):
+            self.misses += 1
+            increment('summary_cache_misses')
+            return None
+
+        self.conn.execute(
+            "UPDATE summaries SET accessed_at = ? "
+            "WHERE paper_id = ? AND provider = ? AND model = ? AND prompt_hash = ?",
+            (now, *key)
+        )
+        self.hits += 1
+        increment('summary_cache_hits')
+        return row[0]
+
+    def put(self, key: CacheKey, summary: str):
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO summaries "
+            "(paper_id, provider, model, prompt_hash, summary, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (*key, summary, now, now)
+        )
+
+    def evict(self):
+        if self.ttl_seconds > 0:
+            expired = self.conn.execute(
+                "DELETE FROM summaries WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+            if expired:
+                logger.debug(f"Evicted {expired} expired summaries from cache")
+
+        if self.max_entries > 0:
+            # Least recently used entries go first once the cache is over capacity
+            overflow = self.conn.execute(
+                "DELETE FROM summaries WHERE rowid IN ("
+                "SELECT rowid FROM summaries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            ).rowcount
+            if overflow:
+                logger.debug(f"Evicted {overflow} least recently used summaries from cache")
+
+
+def open_summary_cache(analyzer_config: Dict[str, Any]) -> Optional[SummaryCache]:
+    if not analyzer_config.get('summary_cache', False):
+        return None
+    return SummaryCache(
+        path=analyzer_config.get('summary_cache_file', SUMMARY_CACHE_FILE),
+        ttl_days=float(analyzer_config.get('summary_cache_ttl_days', DEFAULT_TTL_DAYS)),
+        max_entries=int(analyzer_config.get('summary_cache_max_entries', DEFAULT_MAX_ENTRIES)),
+    )
+
+
+class ContentFormatCache:
+    # What arXiv's e-print endpoint serves for each versioned paper ID:
+    # 'source', 'pdf' for PDF-only submissions, or 'missing'. A published
+    # version never changes, so entries have no TTL. Download threads share
+    # one instance.
+    def __init__(self, path: str = CONTENT_FORMAT_CACHE_FILE, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS content_formats (
+                paper_id TEXT PRIMARY KEY,
+                format TEXT NOT NULL,
+                size INTEGER,
+                checked_at REAL NOT NULL
+            )
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            if self.max_entries > 0:
+                self.conn.execute(
+                    "DELETE FROM content_formats WHERE rowid IN ("
+                    "SELECT rowid FROM content_formats ORDER BY checked_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+            self.conn.commit()
+            self.conn.close()
+
+    def get(self, paper_id: str) -> Optional[ContentFormat]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT format, size FROM content_formats WHERE paper_id = ?", (paper_id,)
+            ).fetchone()
+        increment('content_format_cache_hits' if row else 'content_format_cache_misses')
+        return (row[0], row[1]) if row else None
+
+    def put(self, paper_id: str, content_format: str, size: Optional[int] = None):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO content_formats (paper_id, format, size, checked_at) VALUES (?, ?, ?, ?)",
+                (paper_id, content_format, size, time.time())
+            )
+
+
+def open_content_format_cache(arxiv_config: Dict[str, Any]) -> Optional[ContentFormatCache]:
+    if not arxiv_config.get('content_format_cache', False):
+        return None
+    return ContentFormatCache(
+        path=arxiv_config.get('content_format_cache_file', CONTENT_FORMAT_CACHE_FILE),
+    )
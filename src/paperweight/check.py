@@ -0,0 +1,96 @@
+import json
+import logging
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from paperweight.utils import ARXIV_API_URL, BATCH_STATE_FILE, get_last_processed_date
+
+logger = logging.getLogger(__name__)
+
+# Deliberately uses only the standard library and paperweight.utils: this
+# module runs on every idle cron invocation, so it must not import the
+# scraper, the analyzer or requests.
+
+PROBE_STATE_FILE = "listing_probe.json"
+PROBE_TIMEOUT = 10
+ATOM_NAMESPACE = '{http://www.w3.org/2005/Atom}'
+
+
+def probe_newest_entry(categories: List[str], api_url: str = ARXIV_API_URL,
+                       timeout: float = PROBE_TIMEOUT) -> Optional[Dict[str, str]]:
+    # One request for all categories, asking only for the most recent submission
+    import urllib.parse
+    import urllib.request
+
+    params = {
+        'search_query': ' OR '.join(f"cat:{category}" for category in categories),
+        'start': 0,
+        'max_results': 1,
+        'sortBy': 'submittedDate',
+        'sortOrder': 'descending',
+    }
+    with urllib.request.urlopen(f"{api_url}?{urllib.parse.urlencode(params)}", timeout=timeout) as response:
+        root = ET.fromstring(response.read())
+
+    entry = root.find(f'{ATOM_NAMESPACE}entry')
+    if entry is None:
+        return None
+    entry_id = entry.findtext(f'{ATOM_NAMESPACE}id', '').strip()
+    published = entry.findtext(f'{ATOM_NAMESPACE}published', '').strip()
+    return {'id': entry_id, 'published': published}
+
+def load_probe_state(state_file: str = PROBE_STATE_FILE) -> Dict[str, Any]:
+    try:
+        if os.path.exists(state_file):
+            with open(state_file, 'r') as f:
+                return json.load(f)
+    except (IOError, ValueError) as e:
+        logger.error(f"Error reading listing probe state: {e}")
+    return {}
+
+def save_probe_state(newest_entry: Dict[str, str], state_file: str = PROBE_STATE_FILE):
+    try:
+        with open(state_file, 'w') as f:
+            json.dump(newest_entry, f)
+    except IOError as e:
+        logger.error(f"Error saving listing probe state: {e}")
+
+def check_for_new_papers(arxiv_config: Dict[str, Any], api_url: str = ARXIV_API_URL,
+                         state_file: str = PROBE_STATE_FILE):
+    # Returns (has_new_papers, newest_entry). When in doubt the answer is
+    # True, so a failed probe never causes papers to be skipped.
+    last_processed_date = get_last_processed_date()
+    if last_processed_date is None:
+        logger.info("No previous run recorded")
+        return True, None
+    if last_processed_date >= datetime.now().date():
+        logger.info("Already processed papers for today")
+        return False, None
+
+    try:
+        newest_entry = probe_newest_entry(arxiv_config['categories'], api_url)
+    except (OSError, ET.ParseError) as e:
+        logger.warning(f"Listing probe failed: {e}")
+        return True, None
+
+    if newest_entry is None:
+        logger.info("Listing probe returned no papers")
+        return False, None
+    if load_probe_state(state_file).get('id') == newest_entry['id']:
+        logger.info(f"No new listings since {newest_entry['id']}")
+        return False, newest_entry
+    logger.info(f"New listings available, newest is {newest_entry['id']}")
+    return True, newest_entry
+
+def has_pending_batches(state_file: str = BATCH_STATE_FILE) -> bool:
+    # Summary batches submitted by an earlier run still have to be collected
+    # and sent, new listings or not. The state file is removed once the last
+    # batch is collected, so its existence is enough.
+    return os.path.exists(state_file)
+
+def record_processed_listing(newest_entry: Optional[Dict[str, str]], state_file: str = PROBE_STATE_FILE):
+    # Only remember the probed listing once a run has actually processed it
+    if newest_entry is not None and get_last_processed_date() == datetime.now().date():
+        save_probe_state(newest_entry, state_file)
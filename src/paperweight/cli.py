@@ -0,0 +1,121 @@
+import argparse
+import logging
+from datetime import date
+
+import yaml
+
+from paperweight.logging_config import setup_logging
+from paperweight.profiles import get_fetch_categories
+from paperweight.profiling import DEFAULT_PROFILE_DIR, PROFILE_MODES
+from paperweight.utils import load_config
+
+logger = logging.getLogger(__name__)
+
+
+# Kept separate from paperweight.main so that commands which usually exit
+# early (check) don't pay for importing the whole pipeline.
+def build_parser():
+    parser = argparse.ArgumentParser(description="paperweight: Fetch and process arXiv papers")
+    parser.add_argument('--force-refresh', action='store_true', help='Force refresh papers regardless of last processed date')
+    parser.add_argument('--profile', choices=PROFILE_MODES, help='Profile CPU time, memory allocations or both for each pipeline stage')
+    parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR, help='Directory for profiling output')
+
+    subparsers = parser.add_subparsers(dest='command', metavar='command')
+    subparsers.add_parser('check', help='Run the pipeline only if arXiv has new listings since the last run')
+    serve_parser = subparsers.add_parser('serve', help='Stay running and check for new listings on a schedule')
+    serve_parser.add_argument('--interval', type=float, help='Minutes between scheduled runs (overrides serve.run_interval_minutes)')
+    serve_parser.add_argument('--config', default='config.yaml', help='Configuration file, reloaded when it changes')
+    backfill_parser = subparsers.add_parser('backfill', help='Fetch, score and index every paper in a past date range')
+    backfill_parser.add_argument('--from', dest='from_date', type=date.fromisoformat, required=True,
+                                 help='First submission date to fetch (YYYY-MM-DD)')
+    backfill_parser.add_argument('--to', dest='to_date', type=date.fromisoformat,
+                                 help='Last submission date to fetch (YYYY-MM-DD, default: today)')
+    backfill_parser.add_argument('--workers', type=int, help='Worker processes (overrides backfill.worker_processes)')
+    export_parser = subparsers.add_parser('export', help='Write a backfill corpus to the columnar analytics dataset')
+    export_parser.add_argument('--corpus-dir', help='Backfill corpus to read (default: backfill.corpus_dir)')
+    export_parser.add_argument('--dataset-dir', help='Dataset to append to (default: analytics.dataset_dir)')
+    return parser
+
+def run_check(args):
+    from paperweight.check import (
+        check_for_new_papers,
+        has_pending_batches,
+        record_processed_listing,
+    )
+
+    try:
+        config = load_config()
+        setup_logging(config['logging'])
+        has_new_papers, newest_entry = check_for_new_papers(dict(config['arxiv'], categories=get_fetch_categories(config)))
+    except (yaml.YAMLError, KeyError, ValueError, OSError):
+        # The full pipeline reports configuration problems the usual way
+        has_new_papers, newest_entry = True, None
+
+    if not has_new_papers:
+        if has_pending_batches():
+            logger.info("Nothing new to process. Collecting pending summary batches.")
+            from paperweight.main import run_pipeline
+            run_pipeline(args.force_refresh, args.profile, args.profile_dir, deliver_only=True)
+            return
+        logger.info("Nothing new to process. Exiting.")
+        return
+
+    from paperweight.main import run_pipeline
+    run_pipeline(args.force_refresh, args.profile, args.profile_dir)
+    record_processed_listing(newest_entry)
+
+def run_serve(args):
+    import signal
+
+    from paperweight.serve import PipelineDaemon
+
+    daemon = PipelineDaemon(args.config, args.interval)
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    signal.signal(signal.SIGINT, lambda signum, frame: daemon.stop())
+    if hasattr(signal, 'SIGHUP'):
+        signal.signal(signal.SIGHUP, lambda signum, frame: daemon.request_reload())
+    daemon.serve(args.force_refresh)
+
+def run_backfill_command(args):
+    from paperweight.backfill import run_backfill
+
+    config = load_config()
+    setup_logging(config['logging'])
+    to_date = args.to_date or date.today()
+    if args.from_date > to_date:
+        logger.error(f"Backfill start date {args.from_date} is after end date {to_date}")
+        return
+    run_backfill(config, args.from_date, to_date, args.workers)
+
+def run_export_command(args):
+    from paperweight.analytics import export_corpus, get_dataset_dir
+    from paperweight.backfill import DEFAULT_CORPUS_DIR
+
+    config = load_config()
+    setup_logging(config['logging'])
+    corpus_dir = args.corpus_dir or config.get('backfill', {}).get('corpus_dir', DEFAULT_CORPUS_DIR)
+    try:
+        export_corpus(corpus_dir, args.dataset_dir or get_dataset_dir(config))
+    except ImportError as e:
+        logger.error(str(e))
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'check':
+        run_check(args)
+        return
+    if args.command == 'serve':
+        run_serve(args)
+        return
+    if args.command == 'backfill':
+        run_backfill_command(args)
+        return
+    if args.command == 'export':
+        run_export_command(args)
+        return
+
+    from paperweight.main import run_pipeline
+    run_pipeline(args.force_refresh, args.profile, args.profile_dir)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import logging
+import os
+import re
+import sqlite3
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from paperweight.instrumentation import increment
+
+logger = logging.getLogger(__name__)
+
+DEDUP_INDEX_FILE = "paper_index.db"
+NUM_PERM = 128
+NUM_BANDS = 16
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.8
+
+_EMPTY_BIN = (1 << 64) - 1
+_VERSION_PATTERN = re.compile(r'v(\d+)$')
+
+
+def split_arxiv_id(paper_id: str) -> Tuple[str, Optional[int]]:
+    match = _VERSION_PATTERN.search(paper_id)
+    if match:
+        return paper_id[:match.start()], int(match.group(1))
+    return paper_id, None
+
+def shingle_hashes(text: str, shingle_size: int = SHINGLE_SIZE) -> Set[int]:
+    words = re.findall(r'\w+', text.lower())
+    if len(words) < shingle_size:
+        return {zlib.crc32(' '.join(words).encode())} if words else set()
+    return {
+        zlib.crc32(' '.join(words[i:i + shingle_size]).encode())
+        for i in range(len(words) - shingle_size + 1)
+    }
+
+def minhash_signature(text: str, num_perm: int = NUM_PERM) -> List[int]:
+    # One-permutation MinHash: every shingle is hashed once and binned, so the
+    # cost is linear in the text length instead of num_perm passes over it.
+    bin_width = (1 << 32) // num_perm + 1
+    signature = [_EMPTY_BIN] * num_perm
+    for shingle_hash in shingle_hashes(text):
+        mixed = (shingle_hash * 0x9E3779B1) & 0xFFFFFFFF
+        bucket, value = divmod(mixed, bin_width)
+        if value < signature[bucket]:
+            signature[bucket] = value
+
+    if all(value == _EMPTY_BIN for value in signature):
+        return []
+
+    # Densify empty bins by borrowing from the next non-empty bin (rotation),
+    # offset by the distance so borrowed values stay distinguishable.
+    for i in range(num_perm):
+        if signature[i] != _EMPTY_BIN:
+            continue
+        distance = 1
+        while signature[(i + distance) % num_perm] == _EMPTY_BIN:
+            distance += 1
+        signature[i] = signature[(i + distance) % num_perm] + distance * bin_width
+    return signature
+
+def estimate_similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+def _pack_signature(signature: Sequence[int]) -> bytes:
+    return struct.pack(f'<{len(signature)}Q', *signature)
+
+def _unpack_signature(blob: bytes) -> List[int]:
+    return list(struct.unpack(f'<{len(blob) // 8}Q', blob))
+
+
+class PaperIndex:
+    def __init__(self, path: str = DEDUP_INDEX_FILE, threshold: float = DEFAULT_THRESHOLD,
+                 num_bands: int = NUM_BANDS):
+        if NUM_PERM % num_bands != 0:
+            raise ValueError(f"Number of bands must divide {NUM_PERM}, got {num_bands}")
+        self.threshold = threshold
+        self.num_bands = num_bands
+        self.rows_per_band = NUM_PERM // num_bands
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS papers (
+                paper_id TEXT PRIMARY KEY,
+                base_id TEXT NOT NULL,
+                signature BLOB NOT NULL,
+                added_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS papers_base_id ON papers (base_id);
+            CREATE TABLE IF NOT EXISTS bands (
+                band INTEGER NOT NULL,
+                bucket BLOB NOT NULL,
+                paper_id TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS bands_lookup ON bands (band, bucket);
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def _buckets(self, signature: Sequence[int]):
+        for band in range(self.num_bands):
+            start = band * self.rows_per_band
+            yield band, _pack_signature(signature[start:start + self.rows_per_band])
+
+    def contains(self, paper_id: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM papers WHERE paper_id = ?", (paper_id,)).fetchone()
+        return row is not None
+
+    def versions_of(self, paper_id: str) -> List[str]:
+        base_id, _ = split_arxiv_id(paper_id)
+        rows = self.conn.execute("SELECT paper_id FROM papers WHERE base_id = ?", (base_id,))
+        return [row[0] for row in rows if row[0] != paper_id]
+
+    def query(self, signature: Sequence[int], exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        # exclude is the queried paper's own id, which matches itself once indexed
+        candidates: Set[str] = set()
+        for band, bucket in self._buckets(signature):
+            rows = self.conn.execute(
+                "SELECT paper_id FROM bands WHERE band = ? AND bucket = ?", (band, bucket)
+            )
+            candidates.update(row[0] for row in rows)
+        if exclude is not None:
+            candidates.discard(exclude)
+
+        matches = []
+        for candidate in candidates:
+            row = self.conn.execute(
+                "SELECT signature FROM papers WHERE paper_id = ?", (candidate,)
+            ).fetchone()
+            similarity = estimate_similarity(signature, _unpack_signature(row[0]))
+            if similarity >= self.threshold:
+                matches.append((candidate, similarity))
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def add(self, paper_id: str, signature: Sequence[int]):
+        if self.contains(paper_id):
+            return
+        base_id, _ = split_arxiv_id(paper_id)
+        self.conn.execute(
+            "INSERT INTO papers (paper_id, base_id, signature, added_at) VALUES (?, ?, ?, ?)",
+            (paper_id, base_id, _pack_signature(signature), datetime.now().isoformat())
+        )
+        self.conn.executemany(
+            "INSERT INTO bands (band, bucket, paper_id) VALUES (?, ?, ?)",
+            [(band, bucket, paper_id) for band, bucket in self._buckets(signature)]
+        )
+
+
+def open_paper_index(arxiv_config: Dict[str, Any]) -> Optional[PaperIndex]:
+    if not arxiv_config.get('dedup', False):
+        return None
+    return PaperIndex(
+        path=arxiv_config.get('dedup_index_file', DEDUP_INDEX_FILE),
+        threshold=float(arxiv_config.get('dedup_threshold', DEFAULT_THRESHOLD)),
+    )
+
+def indexed_paper_ids(path: str, paper_ids: Iterable[str]) -> Set[str]:
+    # Read-only lookup for processes that must leave writing to another one
+    if not os.path.exists(path):
+        return set()
+    conn = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+    try:
+        return {paper_id for paper_id in paper_ids
+                if conn.execute("SELECT 1 FROM papers WHERE paper_id = ?", (paper_id,)).fetchone()}
+    except sqlite3.OperationalError:
+        # The index file exists but nothing has been added yet
+        return set()
+    finally:
+        conn.close()
+
+def filter_seen_papers(papers: List[Dict[str, Any]], index: PaperIndex) -> List[Dict[str, Any]]:
+    unseen = []
+    for paper in papers:
+        paper_id = paper['link'].split('/abs/')[-1]
+        if index.contains(paper_id):
+            logger.debug(f"Skipping already indexed paper: {paper_id}")
+        else:
+            unseen.append(paper)
+    if len(unseen) < len(papers):
+        logger.info(f"Skipped {len(papers) - len(unseen)} papers already processed in a previous run")
+    return unseen
+
+def filter_duplicate_papers(papers: List[Dict[str, Any]], index: PaperIndex) -> List[Dict[str, Any]]:
+    unique_papers = [paper for paper in papers if not is_duplicate_paper(paper, index)]
+    index.conn.commit()
+    logger.info(f"Kept {len(unique_papers)} of {len(papers)} papers after near-duplicate detection")
+    return unique_papers
+
+def signature_text(paper: Mapping[str, Any]) -> str:
+    # Metadata-only papers are indexed by their abstract
+    return paper.get('content') or paper.get('abstract') or ''
+
+def is_duplicate_paper(paper: Dict[str, Any], index: PaperIndex,
+                       signature: Optional[List[int]] = None) -> bool:
+    # Indexes the paper as a side effect. The signature can be computed
+    # beforehand, off the thread that owns the index connection.
+    if signature is None:
+        signature = minhash_signature(signature_text(paper))
+    if not signature:
+        return False
+
+    # A paper seen before (e.g. on --force-refresh) is compared with every other paper, not itself
+    matches = index.query(signature, exclude=paper['id'])
+    index.add(paper['id'], signature)
+    if matches:
+        match_id, similarity = matches[0]
+        increment('papers_deduplicated')
+        if split_arxiv_id(match_id)[0] == split_arxiv_id(paper['id'])[0]:
+            logger.info(f"Skipping {paper['id']}: unchanged from {match_id} (similarity {similarity:.2f})")
+        else:
+            logger.info(f"Skipping {paper['id']}: near-duplicate of {match_id} (similarity {similarity:.2f})")
+        return True
+
+    previous_versions = index.versions_of(paper['id'])
+    if previous_versions:
+        paper['previous_versions'] = previous_versions
+        logger.info(f"Paper {paper['id']} is a revised version of {', '.join(previous_versions)}")
+    return False
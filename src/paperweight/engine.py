@@ -0,0 +1,266 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from paperweight.analytics import record_scored_papers, record_selected_papers
+from paperweight.analyzer import (
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    LLMClientPool,
+    create_client_pool,
+    summarize_papers,
+)
+from paperweight.batch import is_batch_mode, submit_profile_batches
+from paperweight.cache import ContentFormatCache, open_content_format_cache
+from paperweight.dedup import (
+    filter_seen_papers,
+    is_duplicate_paper,
+    minhash_signature,
+    open_paper_index,
+    signature_text,
+)
+from paperweight.instrumentation import increment
+from paperweight.paper import release_contents
+from paperweight.processor import TopPapers, rank_papers, score_paper
+from paperweight.profiles import build_profile_configs, select_profile_papers
+from paperweight.ratelimit import RateLimiter
+from paperweight.scraper import (
+    build_paper_record,
+    extract_text_from_source,
+    fetch_paper_content,
+    fetch_recent_papers,
+    get_fetch_days,
+    is_metadata_only,
+)
+from paperweight.utils import save_last_processed_date
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_ENGINES = ['sequential', 'async']
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_EXTRACT_WORKERS = 2
+# Same pacing as fetch_paper_contents: four papers per second, shared by all download workers
+DOWNLOADS_PER_MINUTE = 240
+DOWNLOAD_BURST = 4
+
+# Marks the end of a queue's input; each consumer receives one
+_DONE = object()
+
+
+def run_async_pipeline(config: Dict[str, Any], force_refresh: bool = False,
+                       client_pool: Optional[LLMClientPool] = None):
+    return asyncio.run(AsyncPipeline(config, force_refresh, client_pool).run())
+
+
+class AsyncPipeline:
+    # Listing, downloads, extraction and scoring, and summarization run as
+    # concurrent stages joined by bounded queues, so a run takes roughly as
+    # long as its slowest stage instead of the sum of all of them. The HTTP,
+    # LLM and SQLite clients are blocking, so each stage hands its work to
+    # threads; the event loop only moves papers between queues and owns the
+    # dedup index connection. Returns the same (profile_config, papers) pairs
+    # as main.process_profiles.
+    def __init__(self, config: Dict[str, Any], force_refresh: bool = False,
+                 client_pool: Optional[LLMClientPool] = None):
+        pipeline_config = config.get('pipeline', {})
+        self.config = config
+        self.force_refresh = force_refresh
+        self.queue_size = int(pipeline_config.get('queue_size', DEFAULT_QUEUE_SIZE))
+        self.download_workers = int(pipeline_config.get('download_workers', DEFAULT_DOWNLOAD_WORKERS))
+        self.extract_workers = int(pipeline_config.get('extract_workers', DEFAULT_EXTRACT_WORKERS))
+        analyzer_config = config['analyzer']
+        self.batch = is_batch_mode(analyzer_config)
+        self.summarize = analyzer_config.get('type', 'abstract') == 'summary' and not self.batch
+        self.summary_workers = int(analyzer_config.get('max_concurrent_requests', DEFAULT_MAX_CONCURRENT_REQUESTS))
+        # Papers are summarized one call at a time, so they must share one pool
+        # for its rate limits and in-flight cap to apply across the run
+        if client_pool is None and self.summarize:
+            client_pool = create_client_pool(analyzer_config)
+        self.client_pool = client_pool
+        self.download_limiter = RateLimiter(DOWNLOADS_PER_MINUTE, burst=DOWNLOAD_BURST)
+        self.max_source_bytes = int(config['arxiv'].get('max_source_bytes', 0))
+        self.metadata_only = is_metadata_only(config['arxiv'])
+        self.format_cache: Optional[ContentFormatCache] = None
+        self.profile_configs = build_profile_configs(config)
+        self.selected = [TopPapers(int(profile_config['processor'].get('max_papers', 0)))
+                         for profile_config in self.profile_configs]
+        self.summaries: Dict[str, str] = {}
+        self.accepted = 0
+        self.listing_order: Dict[str, int] = {}
+
+    async def run(self) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        days = await asyncio.to_thread(get_fetch_days, self.force_refresh)
+        if days == 0:
+            return []
+
+        listing = await asyncio.to_thread(fetch_recent_papers, days, self.config)
+        paper_index = open_paper_index(self.config['arxiv'])
+        self.format_cache = None if self.metadata_only else open_content_format_cache(self.config['arxiv'])
+        try:
+            if paper_index is not None and not self.force_refresh:
+                listing = filter_seen_papers(listing, paper_index)
+            self.listing_order = {paper['link'].split('/abs/')[-1]: i for i, paper in enumerate(listing)}
+            with ThreadPoolExecutor(max_workers=max(1, self.extract_workers)) as executor:
+                await self._run_stages(listing, paper_index, executor)
+        finally:
+            if paper_index is not None:
+                paper_index.close()
+            if self.format_cache is not None:
+                self.format_cache.close()
+
+        if self.accepted:
+            save_last_processed_date(datetime.now().date())
+        logger.info(f"Async pipeline processed {self.accepted} of {len(listing)} listed papers")
+        return self._finish()
+
+    async def _run_stages(self, listing, paper_index, executor):
+        download_queue = asyncio.Queue(self.queue_size)
+        extract_queue = asyncio.Queue(self.queue_size)
+        select_queue = asyncio.Queue(self.queue_size)
+        summary_queue = asyncio.Queue(self.queue_size)
+        summary_workers = max(1, self.summary_workers) if self.summarize else 0
+
+        async def produce():
+            for paper in listing:
+                await download_queue.put(paper)
+            await _close(download_queue, self.download_workers)
+
+        async def stage(workers, handler, inbox, outbox, outbox_consumers):
+            await asyncio.gather(*(self._consume(handler, inbox, outbox) for _ in range(workers)))
+            if outbox is not None:
+                await _close(outbox, outbox_consumers)
+
+        await asyncio.gather(
+            produce(),
+            stage(self.download_workers, self._download, download_queue, extract_queue, self.extract_workers),
+            stage(self.extract_workers, lambda item: self._extract(item, executor, paper_index),
+                  extract_queue, select_queue, 1),
+            stage(1, self._select, select_queue, summary_queue, summary_workers),
+            stage(summary_workers, self._summarize, summary_queue, None, 0),
+        )
+
+    async def _consume(self, handler, inbox, outbox):
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            result = await handler(item)
+            if result is not None and outbox is not None:
+                await outbox.put(result)
+
+    async def _download(self, paper):
+        paper_id = paper['link'].split('/abs/')[-1]
+        if self.metadata_only:
+            return paper, paper_id, None, 'metadata'
+        try:
+            content, method = await asyncio.to_thread(self._paced_fetch, paper_id)
+        except Exception as e:
+            logger.error(f"Error fetching content for paper ID {paper_id}: {e}")
+            return None
+        return (paper, paper_id, content, method) if content else None
+
+    def _paced_fetch(self, paper_id):
+        self.download_limiter.acquire()
+        return fetch_paper_content(paper_id, self.format_cache, self.max_source_bytes)
+
+    async def _extract(self, item, executor, paper_index):
+        # Extraction and scoring run on the executor; the duplicate check in
+        # between runs here, on the loop thread that owns the index connection,
+        # so duplicates are dropped before they are scored
+        loop = asyncio.get_running_loop()
+        try:
+            record, signature = await loop.run_in_executor(executor, self._extract_record, *item)
+            if paper_index is not None and signature is not None and is_duplicate_paper(record, paper_index, signature):
+                return None
+            scored = await loop.run_in_executor(executor, self._score, record)
+        except Exception as e:
+            logger.error(f"Error extracting text for paper ID {item[1]}: {e}")
+            return None
+        return record, scored
+
+    def _extract_record(self, paper, paper_id, content, method):
+        # CPU-bound work for one paper; runs on the extraction executor
+        text = extract_text_from_source(content, method) if content is not None else None
+        record = build_paper_record(paper, paper_id, text, method)
+        signature = minhash_signature(signature_text(record)) if self.config['arxiv'].get('dedup') else None
+        return record, signature
+
+    def _score(self, record):
+        scored = []
+        for profile_config in self.profile_configs:
+            candidates = select_profile_papers([record], profile_config)
+            if candidates and score_paper(candidates[0], profile_config['processor']):
+                scored.append(candidates[0])
+            else:
+                scored.append(None)
+                release_contents(candidates)
+            record_scored_papers(candidates)
+            increment('papers_scored', len(candidates))
+        return scored
+
+    async def _select(self, item):
+        record, scored = item
+        self.accepted += 1
+        # With max_papers, a paper is only summarized while it is in some
+        # profile's top K; one pushed out later has cost at most one summary
+        kept = []
+        for selected, paper in zip(self.selected, scored):
+            if paper is None:
+                continue
+            dropped = selected.push(paper, self.listing_order.get(record['id'], 0))
+            if dropped is not paper:
+                kept.append(paper)
+            # Kept papers only hold their text in batch mode; see below
+            if dropped is not None and self.batch:
+                release_contents([dropped])
+        # Summarization starts as soon as any profile wants the paper
+        if self.summarize and kept:
+            return record, kept
+        if not self.batch:
+            release_contents([record, *kept])
+        elif not any(paper is record for paper in kept):
+            # Batch requests are built from the kept papers when the run
+            # finishes; profile copies share the text, so the record can go
+            release_contents([record])
+        return None
+
+    async def _summarize(self, item):
+        record, kept = item
+        summaries = await asyncio.to_thread(summarize_papers, [record], self.config['analyzer'], self.client_pool)
+        self.summaries[record['id']] = summaries[0]
+        # Each profile keeps its own copy of the paper, and each copy holds the text
+        release_contents([record, *kept])
+        return None
+
+    def _finish(self):
+        selections = []
+        for profile_config, top_papers in zip(self.profile_configs, self.selected):
+            papers = top_papers.papers()
+            name = profile_config.get('profile_name')
+            if name:
+                logger.info(f"Profile '{name}': {len(papers)} of {self.accepted} papers met the relevance criteria")
+            if not papers:
+                continue
+            # Papers finish in any order; restore the listing order so ties rank as in the sequential engine
+            papers.sort(key=lambda paper: self.listing_order.get(paper['id'], 0))
+            record_selected_papers(papers)
+            selections.append((profile_config, rank_papers(papers)))
+
+        if self.batch:
+            # Submitted papers are not returned, but still hold their text until here
+            ready = submit_profile_batches(selections, self.config['analyzer'])
+        else:
+            ready = selections
+            for _, papers in selections:
+                for paper in papers:
+                    summary = self.summaries.get(paper['id']) if self.summarize else paper['abstract']
+                    paper['summary'] = summary if summary else paper.get('abstract', 'No summary available')
+        for _, papers in selections:
+            release_contents(papers)
+        return ready
+
+async def _close(queue: asyncio.Queue, consumers: int):
+    for _ in range(consumers):
+        await queue.put(_DONE)
@@ -0,0 +1,142 @@
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from paperweight.instrumentation import HISTOGRAM_BUCKETS, run_metrics
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "paperweight"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+
+def _split_series(key: str) -> Tuple[str, str]:
+    # Counter keys are either "name" or "name{label=\"value\",...}"
+    name, brace, labels = key.partition('{')
+    return name, brace + labels
+
+def _with_label(labels: str, extra: str) -> str:
+    if not labels:
+        return f"{{{extra}}}"
+    return f"{labels[:-1]},{extra}}}"
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _render_counters(counters: Dict[str, float]) -> List[str]:
+    by_name: Dict[str, List[Tuple[str, float]]] = {}
+    for key, value in sorted(counters.items()):
+        name, labels = _split_series(key)
+        by_name.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, series in by_name.items():
+        metric = f"{METRIC_PREFIX}_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.extend(f"{metric}{labels} {_format_value(value)}" for labels, value in series)
+
+    hits = counters.get('summary_cache_hits', 0)
+    misses = counters.get('summary_cache_misses', 0)
+    if hits + misses:
+        metric = f"{METRIC_PREFIX}_summary_cache_hit_ratio"
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {_format_value(round(hits / (hits + misses), 6))}")
+    return lines
+
+def _render_stages(stages: Dict[str, Dict[str, Any]]) -> List[str]:
+    if not stages:
+        return []
+    duration = f"{METRIC_PREFIX}_stage_duration_seconds"
+    errors = f"{METRIC_PREFIX}_stage_errors_total"
+    lines = [f"# TYPE {duration} histogram"]
+    for stage, summary in sorted(stages.items()):
+        stage_label = f'{{stage="{stage}"}}'
+        for bound in [str(bound) for bound in HISTOGRAM_BUCKETS] + ['+Inf']:
+            le_label = _with_label(stage_label, f'le="{bound}"')
+            lines.append(f"{duration}_bucket{le_label} {summary['histogram'][bound]}")
+        lines.append(f"{duration}_sum{stage_label} {_format_value(summary['total_seconds'])}")
+        lines.append(f"{duration}_count{stage_label} {summary['count']}")
+
+    lines.append(f"# TYPE {errors} counter")
+    lines.extend(f'{errors}{{stage="{stage}"}} {summary["errors"]}' for stage, summary in sorted(stages.items()))
+    return lines
+
+def render_metrics(report: Optional[Dict[str, Any]] = None) -> str:
+    # Prometheus text exposition format, as read by node_exporter's textfile
+    # collector and by any scraper of the /metrics endpoint.
+    report = report if report is not None else run_metrics.report()
+    lines = _render_stages(report['stages'])
+    lines.extend(_render_counters(report['counters']))
+    lines.append(f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge")
+    lines.append(f"{METRIC_PREFIX}_run_duration_seconds {_format_value(report['wall_time_seconds'])}")
+    lines.append(f"# TYPE {METRIC_PREFIX}_last_run_timestamp_seconds gauge")
+    lines.append(f"{METRIC_PREFIX}_last_run_timestamp_seconds {int(time.time())}")
+    return "\n".join(lines) + "\n"
+
+def write_textfile(path: str, report: Optional[Dict[str, Any]] = None):
+    # Written to a temporary file and renamed so the collector never reads a partial file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            f.write(render_metrics(report))
+        os.replace(temp_path, path)
+        logger.info(f"Metrics written to {path}")
+    except IOError as e:
+        logger.error(f"Error writing metrics textfile: {e}")
+
+
+def _metrics_handler():
+    # http.server is only imported when the endpoint is enabled
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render_metrics().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MetricsHandler
+
+def start_metrics_server(metrics_config: Dict[str, Any]) -> Optional['ThreadingHTTPServer']:
+    port = int(metrics_config.get('prometheus_port', 0))
+    if port <= 0:
+        return None
+    from http.server import ThreadingHTTPServer
+
+    host = metrics_config.get('prometheus_host', DEFAULT_METRICS_HOST)
+    try:
+        server = ThreadingHTTPServer((host, port), _metrics_handler())
+    except OSError as e:
+        logger.error(f"Could not start metrics endpoint on {host}:{port}: {e}")
+        return None
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.1}, daemon=True)
+    thread.start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+def stop_metrics_server(server: Optional['ThreadingHTTPServer']):
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+
+def export_metrics(metrics_config: Dict[str, Any], report: Optional[Dict[str, Any]] = None):
+    textfile = metrics_config.get('prometheus_textfile')
+    if textfile:
+        write_textfile(textfile, report)
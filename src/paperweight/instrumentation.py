@@ -0,0 +1,142 @@
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+RUN_REPORT_FILE = "run_report.json"
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is unbounded
+HISTOGRAM_BUCKETS = [0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+
+def series_name(name: str, labels: Dict[str, Any]) -> str:
+    if not labels:
+        return name
+    label_text = ','.join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return f"{name}{{{label_text}}}"
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RunMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = datetime.now()
+            self._start = time.perf_counter()
+            self.durations: Dict[str, List[float]] = {}
+            self.errors: Dict[str, int] = {}
+            self.counters: Dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float, error: bool = False):
+        with self._lock:
+            self.durations.setdefault(stage, []).append(seconds)
+            if error:
+                self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        key = series_name(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    @contextmanager
+    def span(self, stage: str):
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(stage, time.perf_counter() - start, error)
+
+    def stage_summary(self, stage: str) -> Dict[str, Any]:
+        with self._lock:
+            values = sorted(self.durations.get(stage, []))
+            errors = self.errors.get(stage, 0)
+        total = sum(values)
+        buckets = {}
+        for bound in HISTOGRAM_BUCKETS:
+            buckets[str(bound)] = sum(1 for value in values if value <= bound)
+        buckets['+Inf'] = len(values)
+        return {
+            'count': len(values),
+            'errors': errors,
+            'total_seconds': round(total, 6),
+            'mean_seconds': round(total / len(values), 6) if values else 0.0,
+            'p50_seconds': round(_percentile(values, 0.5), 6),
+            'p90_seconds': round(_percentile(values, 0.9), 6),
+            'p99_seconds': round(_percentile(values, 0.99), 6),
+            'max_seconds': round(values[-1], 6) if values else 0.0,
+            'items_per_second': round(len(values) / total, 3) if total else 0.0,
+            'histogram': buckets,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = list(self.durations)
+            counters = dict(self.counters)
+            wall_time = time.perf_counter() - self._start
+        return {
+            'started_at': self.started_at.isoformat(),
+            'wall_time_seconds': round(wall_time, 6),
+            'stages': {stage: self.stage_summary(stage) for stage in stages},
+            'counters': counters,
+        }
+
+
+# Process-wide collector shared by every module, like the logging registry
+run_metrics = RunMetrics()
+
+def span(stage: str):
+    return run_metrics.span(stage)
+
+def increment(name: str, amount: float = 1, **labels):
+    run_metrics.increment(name, amount, **labels)
+
+def record_retry(function: str, attempt: int, delay: float):
+    # Called by resilience.resilient before each retry sleep
+    run_metrics.increment('retries', function=function)
+    logger.debug(f"Retrying {function} in {delay:.1f}s (attempt {attempt} failed)")
+
+def timed(stage: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with run_metrics.span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def reset_metrics():
+    run_metrics.reset()
+
+def write_run_report(metrics_config: Dict[str, Any]):
+    report = run_metrics.report()
+    for stage, summary in report['stages'].items():
+        logger.info(f"Stage {stage}: {summary['count']} calls, {summary['total_seconds']:.2f}s total, "
+                    f"p50 {summary['p50_seconds']:.3f}s, p90 {summary['p90_seconds']:.3f}s")
+
+    if not metrics_config.get('run_report', True):
+        return report
+    report_file = metrics_config.get('run_report_file', RUN_REPORT_FILE)
+    try:
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Run report written to {report_file}")
+    except IOError as e:
+        logger.error(f"Error writing run report: {e}")
+    return report
@@ -1,31 +1,56 @@
-import argparse
 import logging
 import traceback
 
 import requests
 import yaml
 
+from paperweight.analytics import export_run, reset_scored_papers
 from paperweight.analyzer import get_abstracts
+from paperweight.batch import (
+    is_batch_mode,
+    submit_profile_batches,
+    submit_summary_batch,
+    wait_for_batches,
+)
+from paperweight.exporter import (
+    export_metrics,
+    start_metrics_server,
+    stop_metrics_server,
+)
+from paperweight.instrumentation import reset_metrics, write_run_report
 from paperweight.logging_config import setup_logging
 from paperweight.notifier import compile_and_send_notifications
+from paperweight.paper import release_contents
 from paperweight.processor import process_papers
+from paperweight.profiles import (
+    build_profile_configs,
+    has_profiles,
+    select_profile_papers,
+)
+from paperweight.profiling import DEFAULT_PROFILE_DIR, PipelineProfiler
 from paperweight.scraper import get_recent_papers
 from paperweight.utils import load_config
 
 logger = logging.getLogger(__name__)
 
-def setup_and_get_papers(force_refresh):
+def load_pipeline_config():
     config = load_config()
     setup_logging(config['logging'])
     logger.info("Configuration loaded successfully")
+    return config
+
+def setup_and_get_papers(force_refresh, config=None):
+    # paperweight serve passes in the configuration it already loaded
+    if config is None:
+        config = load_pipeline_config()
 
     if force_refresh:
         logger.info("Force refresh requested. Ignoring last processed date.")
-        return get_recent_papers(force_refresh=True), config
+        return get_recent_papers(force_refresh=True, config=config), config
     else:
-        return get_recent_papers(), config
+        return get_recent_papers(config=config), config
 
-def process_and_summarize_papers(recent_papers, config):
+def process_and_summarize_papers(recent_papers, config, client_pool=None):
     if not recent_papers:
         logger.info("No new papers to process. Exiting.")
         return None
@@ -37,27 +62,121 @@ def process_and_summarize_papers(recent_papers, config):
         logger.info("No papers met the relevance criteria. Exiting.")
         return None
 
-    summaries = get_abstracts(processed_papers, config['analyzer'])
+    if is_batch_mode(config['analyzer']):
+        batch_id = submit_summary_batch(processed_papers, config['analyzer'])
+        if batch_id is not None:
+            logger.info(f"Summaries for {len(processed_papers)} papers requested in batch {batch_id}")
+            return None
+        return processed_papers
+
+    summaries = get_abstracts(processed_papers, config['analyzer'], client_pool)
     for paper, summary in zip(processed_papers, summaries):
         paper['summary'] = summary if summary else paper.get('abstract', 'No summary available')
 
     return processed_papers
 
-def main():
-    parser = argparse.ArgumentParser(description="paperweight: Fetch and process arXiv papers")
-    parser.add_argument('--force-refresh', action='store_true', help='Force refresh papers regardless of last processed date')
-    args = parser.parse_args()
+def process_profiles(recent_papers, config, client_pool=None):
+    # One fetch, then a scoring pass per profile. Returns (profile_config,
+    # papers) pairs that are ready to be sent.
+    if not recent_papers:
+        logger.info("No new papers to process. Exiting.")
+        return []
 
+    selections = []
+    for profile_config in build_profile_configs(config):
+        name = profile_config['profile_name']
+        candidates = select_profile_papers(recent_papers, profile_config)
+        processed_papers = process_papers(candidates, profile_config['processor'])
+        logger.info(f"Profile '{name}': {len(processed_papers)} of {len(candidates)} papers met the relevance criteria")
+        if processed_papers:
+            selections.append((profile_config, processed_papers))
+
+    if is_batch_mode(config['analyzer']):
+        return submit_profile_batches(selections, config['analyzer'])
+
+    summarize_selected_papers(selections, config['analyzer'], client_pool)
+    return selections
+
+def summarize_selected_papers(selections, analyzer_config, client_pool=None):
+    # A paper picked by several profiles is summarized once
+    unique_papers = {}
+    for _, papers in selections:
+        for paper in papers:
+            unique_papers.setdefault(paper['id'], paper)
+    summaries = dict(zip(unique_papers, get_abstracts(list(unique_papers.values()), analyzer_config, client_pool)))
+    for _, papers in selections:
+        for paper in papers:
+            summary = summaries[paper['id']]
+            paper['summary'] = summary if summary else paper.get('abstract', 'No summary available')
+
+def process_stage(recent_papers, config, client_pool=None):
+    if has_profiles(config):
+        selections = process_profiles(recent_papers, config, client_pool)
+    else:
+        processed_papers = process_and_summarize_papers(recent_papers, config, client_pool)
+        selections = [(config, processed_papers)] if processed_papers else []
+    # Scored, summarized or submitted: nothing downstream reads the full text
+    release_contents(recent_papers or [])
+    for _, papers in selections:
+        release_contents(papers)
+    return selections
+
+def fetch_and_process(force_refresh, config, profiler, client_pool=None):
+    if config.get('pipeline', {}).get('engine', 'sequential') == 'async':
+        # The async engine overlaps fetching and processing, so they are profiled together
+        from paperweight.engine import run_async_pipeline
+        with profiler.stage('fetch_and_process'):
+            return run_async_pipeline(config, force_refresh, client_pool)
+
+    with profiler.stage('fetch'):
+        recent_papers, config = setup_and_get_papers(force_refresh, config)
+    with profiler.stage('process'):
+        return process_stage(recent_papers, config, client_pool)
+
+def send_notifications(papers, config):
+    notification_sent = compile_and_send_notifications(papers, config['notifier'])
+    if notification_sent:
+        logger.info("Notifications compiled and sent successfully")
+    else:
+        logger.warning("Failed to send notifications")
+
+def deliver_batch_results(config):
+    if not is_batch_mode(config['analyzer']):
+        return []
+    # Papers submitted by a profile are tagged with its name; a profile that
+    # has since been removed falls back to the top-level notifier
+    profile_configs = {profile_config.get('profile_name'): profile_config
+                       for profile_config in build_profile_configs(config)}
+    delivered = []
+    for papers in wait_for_batches(config['analyzer']):
+        profile_name = papers[0].get('profile') if papers else None
+        profile_config = profile_configs.get(profile_name, config)
+        send_notifications(papers, profile_config)
+        delivered.append((profile_config, papers))
+    return delivered
+
+def run_pipeline(force_refresh=False, profile=None, profile_dir=DEFAULT_PROFILE_DIR,
+                 config=None, client_pool=None, serve_metrics=True, deliver_only=False):
+    # serve_metrics is False when a long-running process owns the endpoint.
+    # deliver_only skips fetching and only collects pending summary batches,
+    # for check and serve runs that find no new listings.
+    reset_metrics()
+    profiler = PipelineProfiler(profile, profile_dir)
+    metrics_server = None
     try:
-        recent_papers, config = setup_and_get_papers(args.force_refresh)
-        processed_papers = process_and_summarize_papers(recent_papers, config)
+        if config is None:
+            config = load_pipeline_config()
+        # Scoring records the papers for the analytics export, if enabled
+        reset_scored_papers(config)
+        if serve_metrics:
+            metrics_server = start_metrics_server(config.get('metrics', {}))
+        selections = [] if deliver_only else fetch_and_process(force_refresh, config, profiler, client_pool)
 
-        if processed_papers:
-            notification_sent = compile_and_send_notifications(processed_papers, config['notifier'])
-            if notification_sent:
-                logger.info("Notifications compiled and sent successfully")
-            else:
-                logger.warning("Failed to send notifications")
+        with profiler.stage('notify'):
+            for profile_config, papers in selections:
+                send_notifications(papers, profile_config)
+
+            deliver_batch_results(config)
     except requests.RequestException as e:
         logger.error(f"Network error occurred: {e}")
     except yaml.YAMLError as e:
@@ -68,6 +187,18 @@ def main():
         logger.error(f"Configuration validation error: {e}")
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
+    finally:
+        if config is not None:
+            report = write_run_report(config.get('metrics', {}))
+            export_metrics(config.get('metrics', {}), report)
+            export_run(config, report)
+            reset_scored_papers()
+        stop_metrics_server(metrics_server)
+        profiler.stop()
+
+def main():
+    from paperweight.cli import main as cli_main
+    cli_main()
 
 if __name__ == "__main__":
     try:
@@ -1,11 +1,17 @@
 import logging
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+
+from paperweight.instrumentation import increment, timed
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_EMAIL_SUBJECT = "New Papers from ArXiv"
+
+@timed('send_email_notification')
 def send_email_notification(subject, body, config):
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     from_email = config['email']['from']
     from_password = config['email']['password']
     to_email = config['email']['to']
@@ -29,6 +35,7 @@ def send_email_notification(subject, body, config):
         server.sendmail(from_email, to_email, text)
         server.quit()
         logger.info("Email sent successfully")
+        increment('emails_sent')
         return True
     except Exception as e:
         logger.error(f"Failed to send email: {e}")
@@ -39,6 +46,11 @@ def compile_and_send_notifications(papers, config):
         logger.info("No papers to send notifications for.")
         return
 
+    subject, body = compose_notification(papers, config)
+    success = send_email_notification(subject, body, config)
+    return success
+
+def compose_notification(papers, config):
     sort_order = config.get('email', {}).get('sort_order', 'relevance')
 
     if sort_order == 'alphabetical':
@@ -47,7 +59,7 @@ def compile_and_send_notifications(papers, config):
         papers = sorted(papers, key=lambda x: x['date'], reverse=True)
     # For 'relevance' or any other value, we keep the existing order (already sorted by relevance)
 
-    subject = "New Papers from ArXiv"
+    subject = config.get('email', {}).get('subject', DEFAULT_EMAIL_SUBJECT)
     body = "Here are the latest papers:\n\n"
     for paper in papers:
         body += f"Title: {paper['title']}\n"
@@ -56,5 +68,4 @@ def compile_and_send_notifications(papers, config):
         body += f"Link: {paper['link']}\n"
         body += f"Relevance Score: {paper['relevance_score']:.2f}\n\n"
 
-    success = send_email_notification(subject, body, config)
-    return success
+    return subject, body
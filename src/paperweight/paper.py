@@ -0,0 +1,79 @@
+from collections.abc import MutableMapping
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator
+
+# Fields a paper can carry through the pipeline, in the order they are set
+PAPER_FIELDS = (
+    'id', 'title', 'link', 'date', 'abstract', 'categories', 'content', 'content_type',
+    'relevance_score', 'score_breakdown', 'normalized_score', 'summary',
+    'profile', 'previous_versions', 'batch_custom_id',
+)
+
+
+class Paper(MutableMapping):
+    # A paper record with slots instead of a per-instance dict, which keeps
+    # large listings and backfills compact. It behaves as a mapping, so every
+    # stage (and the tests) can keep using paper['title'], paper.get(...) and
+    # 'summary' in paper, and plain dicts are still accepted everywhere.
+    # Fields that were never set are missing, as with a dict.
+    __slots__ = PAPER_FIELDS
+
+    def __init__(self, **fields: Any):
+        for key, value in fields.items():
+            self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in PAPER_FIELDS:
+            raise KeyError(f"Unknown paper field: {key}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str):
+        try:
+            delattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in PAPER_FIELDS if hasattr(self, key))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        fields = {key: value for key, value in self.items() if key != 'content'}
+        return f"Paper({fields!r})"
+
+    def __copy__(self) -> 'Paper':
+        return Paper(**self)
+
+    def copy(self) -> 'Paper':
+        return self.__copy__()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+
+def serialize_paper(paper: MutableMapping) -> Dict[str, Any]:
+    # JSON-ready, without the full text; used for state files and the backfill corpus
+    serialized = {key: value for key, value in paper.items() if key != 'content'}
+    if isinstance(serialized.get('date'), date):
+        serialized['date'] = serialized['date'].isoformat()
+    return serialized
+
+def deserialize_paper(paper: Dict[str, Any]) -> Dict[str, Any]:
+    if isinstance(paper.get('date'), str):
+        paper['date'] = datetime.strptime(paper['date'], "%Y-%m-%d").date()
+    return paper
+
+def release_contents(papers: Iterable[MutableMapping]):
+    # Full text is only needed for scoring and summarization; dropping it
+    # afterwards keeps a run's memory to the papers still in flight
+    for paper in papers:
+        if paper.get('content') is not None:
+            paper['content'] = None
@@ -0,0 +1,58 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_COMMENT_PATTERN = re.compile(r'(?<!\\)%.*$', re.MULTILINE)
+_PREAMBLE_PATTERN = re.compile(r'\\documentclass.*?\\begin\{document\}', re.DOTALL)
+_DOCUMENT_END_PATTERN = re.compile(r'\\end\{document\}')
+_MACRO_DEFINITION_PATTERN = re.compile(
+    r'^\s*\\(?:newcommand|renewcommand|providecommand|DeclareMathOperator|def|let|newenvironment|'
+    r'renewenvironment|newtheorem|usepackage|RequirePackage)\b.*$',
+    re.MULTILINE
+)
+_BIBLIOGRAPHY_PATTERN = re.compile(
+    r'\\begin\{thebibliography\}.*?(?:\\end\{thebibliography\}|\Z)', re.DOTALL
+)
+_BIBLIOGRAPHY_COMMAND_PATTERN = re.compile(r'\\(?:bibliography|bibliographystyle|printbibliography)\b(?:\{[^}]*\})?')
+_REFERENCES_HEADING_PATTERN = re.compile(r'^\s*(?:\d+\.?\s*)?(?:references|bibliography)\s*$',
+                                         re.IGNORECASE | re.MULTILINE)
+_BLANK_LINES_PATTERN = re.compile(r'\n\s*\n+')
+
+
+def strip_latex_comments(text: str) -> str:
+    return _COMMENT_PATTERN.sub('', text)
+
+def strip_latex_preamble(text: str) -> str:
+    # Only the \documentclass ... \begin{document} span is removed, so any
+    # other files concatenated before the main one are preserved.
+    text = _PREAMBLE_PATTERN.sub('', text)
+    return _DOCUMENT_END_PATTERN.sub('', text)
+
+def strip_macro_definitions(text: str) -> str:
+    return _MACRO_DEFINITION_PATTERN.sub('', text)
+
+def strip_bibliography(text: str) -> str:
+    text = _BIBLIOGRAPHY_PATTERN.sub('', text)
+    return _BIBLIOGRAPHY_COMMAND_PATTERN.sub('', text)
+
+def strip_references_section(text: str) -> str:
+    # Extracted PDF text has no markup; drop everything after a trailing
+    # "References" heading if it appears in the second half of the paper.
+    matches = list(_REFERENCES_HEADING_PATTERN.finditer(text))
+    if matches and matches[-1].start() > len(text) // 2:
+        return text[:matches[-1].start()]
+    return text
+
+def clean_paper_text(text: str, content_type: str = 'source') -> str:
+    original_length = len(text)
+    if content_type == 'pdf':
+        text = strip_references_section(text)
+    else:
+        text = strip_latex_comments(text)
+        text = strip_latex_preamble(text)
+        text = strip_macro_definitions(text)
+        text = strip_bibliography(text)
+    text = _BLANK_LINES_PATTERN.sub('\n\n', text).strip()
+    logger.debug(f"Cleaned paper text from {original_length} to {len(text)} characters")
+    return text
@@ -1,27 +1,80 @@
+import heapq
 import logging
 import math
 import re
 from collections import Counter
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+from paperweight.analytics import record_scored_papers, record_selected_papers
+from paperweight.instrumentation import increment, timed
+from paperweight.paper import release_contents
 
 logger = logging.getLogger(__name__)
 
+
+class TopPapers:
+    # The best-scoring papers seen so far, bounded by a min-heap when limit
+    # is positive, so the rest can be dropped while scoring continues. Ties
+    # keep the earlier paper, as the stable sort in rank_papers does.
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._count = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, paper: Dict[str, Any], order: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        # Returns the paper that no longer makes the cut: an evicted one, the
+        # new one itself, or None while under the limit. order defaults to
+        # arrival order; papers that arrive out of order can pass their own.
+        entry = (paper['relevance_score'], -(self._count if order is None else order), paper)
+        self._count += 1
+        if self.limit <= 0 or len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+            return None
+        if entry[:2] < self._heap[0][:2]:
+            return paper
+        return heapq.heapreplace(self._heap, entry)[2]
+
+    def papers(self) -> List[Dict[str, Any]]:
+        # In push (or given) order
+        return [paper for _, _, paper in sorted(self._heap, key=lambda entry: -entry[1])]
+
 def process_papers(papers: List[Dict[str, Any]], processor_config: Dict[str, Any]) -> List[Dict[str, Any]]:
-    processed_papers = []
+    top_papers = TopPapers(int(processor_config.get('max_papers', 0)))
     for paper in papers:
-        score, score_breakdown = calculate_paper_score(paper, processor_config)
-        logger.debug(f"Paper '{paper['title']}' scored {score}")
-        if score >= processor_config['min_score']:
-            paper['relevance_score'] = score
-            paper['score_breakdown'] = score_breakdown
-            processed_papers.append(paper)
+        if score_paper(paper, processor_config):
+            dropped = top_papers.push(paper)
+            if dropped is not None:
+                release_contents([dropped])
         else:
-            logger.debug(f"Paper '{paper['title']}' filtered out. Score {score} < min_score {processor_config['min_score']}")
+            release_contents([paper])
+    processed_papers = top_papers.papers()
+    record_scored_papers(papers)
+    record_selected_papers(processed_papers)
 
     logger.debug(f"Processed {len(processed_papers)} papers out of {len(papers)}")
-
-    processed_papers = normalize_scores(processed_papers)
-    return sorted(processed_papers, key=lambda x: x['normalized_score'], reverse=True)
+    increment('papers_scored', len(papers))
+
+    return rank_papers(processed_papers)
+
+def score_paper(paper: Dict[str, Any], processor_config: Dict[str, Any]) -> bool:
+    # Records the score on the paper, whether or not it meets min_score, and
+    # reports whether it does
+    score, score_breakdown = calculate_paper_score(paper, processor_config)
+    logger.debug(f"Paper '{paper['title']}' scored {score}")
+    paper['relevance_score'] = score
+    paper['score_breakdown'] = score_breakdown
+    if score >= processor_config['min_score']:
+        return True
+    logger.debug(f"Paper '{paper['title']}' filtered out. Score {score} < min_score {processor_config['min_score']}")
+    return False
+
+def rank_papers(papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Normalization needs every selected paper, so ranking runs after scoring
+    papers = normalize_scores(papers)
+    return sorted(papers, key=lambda x: x['normalized_score'], reverse=True)
 
 def normalize_scores(papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     if not papers:
@@ -39,13 +92,18 @@ def normalize_scores(papers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     logger.debug("Normalized scores calculated")
     return papers
 
+@timed('calculate_paper_score')
 def calculate_paper_score(paper, config):
     score = 0
     score_breakdown = {}
+    # Papers fetched with fetch_depth: metadata have no content; the abstract
+    # stands in for the exclusion and important-word checks
+    content = paper.get('content')
+    body = content or paper['abstract']
     # Keyword matching
     title_keywords = count_keywords(paper['title'], config['keywords'])
     abstract_keywords = count_keywords(paper['abstract'], config['keywords'])
-    content_keywords = count_keywords(paper['content'], config['keywords'])
+    content_keywords = count_keywords(content, config['keywords']) if content else 0
 
     max_title_score = 50
     max_abstract_score = 50
@@ -63,13 +121,13 @@ def calculate_paper_score(paper, config):
     }
 
     # Exclusion list
-    exclusion_count = count_keywords(paper['content'], config['exclusion_keywords'])
+    exclusion_count = count_keywords(body, config['exclusion_keywords'])
     exclusion_score = min(exclusion_count * config['exclusion_keyword_penalty'], max_content_score)
     score -= exclusion_score
     score_breakdown['exclusion_penalty'] = -round(exclusion_score, 2)
 
     # Simple text analysis
-    important_word_count = count_important_words(paper['content'], config['important_words'])
+    important_word_count = count_important_words(body, config['important_words'])
     important_word_score = min(important_word_count * config['important_words_weight'], max_content_score)
     score += important_word_score
     score_breakdown['important_words'] = round(important_word_score, 2)
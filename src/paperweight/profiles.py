@@ -0,0 +1,66 @@
+import copy
+from typing import Any, Dict, List
+
+from paperweight.notifier import DEFAULT_EMAIL_SUBJECT
+
+# Profiles let one config serve several readers: the union of their
+# categories is fetched and extracted once, then each profile scores,
+# summarizes and notifies on its own. Like check.py this module stays clear
+# of the HTTP and LLM stacks so `paperweight check` can use it.
+
+PROFILE_SECTIONS = ['processor', 'notifier']
+
+
+def has_profiles(config: Dict[str, Any]) -> bool:
+    profiles = config.get('profiles')
+    return isinstance(profiles, list) and len(profiles) > 0
+
+def merge_sections(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    # Nested mappings are merged, so a profile can change just notifier.email.to
+    merged = copy.deepcopy(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_sections(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+def get_fetch_categories(config: Dict[str, Any]) -> List[str]:
+    # Top-level categories first, then any extra ones profiles ask for, without repeats
+    categories = list(config['arxiv'].get('categories', []))
+    for profile in config['profiles'] if has_profiles(config) else []:
+        categories.extend(profile.get('categories', []))
+    return list(dict.fromkeys(categories))
+
+def build_profile_configs(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # A config without profiles behaves as a single unnamed profile
+    if not has_profiles(config):
+        return [config]
+
+    profile_configs = []
+    for profile in config['profiles']:
+        profile_config = dict(config)
+        for section in PROFILE_SECTIONS:
+            profile_config[section] = merge_sections(config[section], profile.get(section, {}))
+        email = profile_config['notifier'].setdefault('email', {})
+        if 'subject' not in profile.get('notifier', {}).get('email', {}):
+            email['subject'] = f"{email.get('subject', DEFAULT_EMAIL_SUBJECT)} ({profile['name']})"
+        profile_config['profile_name'] = profile['name']
+        profile_config['profile_categories'] = profile.get('categories') or config['arxiv']['categories']
+        profile_configs.append(profile_config)
+    return profile_configs
+
+def select_profile_papers(papers: List[Dict[str, Any]], profile_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Shallow copies: scoring writes per-profile fields onto each paper, while
+    # the extracted content string is shared rather than duplicated.
+    categories = profile_config.get('profile_categories')
+    if categories is None:
+        return papers
+    wanted = set(categories)
+    selected = []
+    for paper in papers:
+        if wanted.intersection(paper.get('categories', [])):
+            selected_paper = copy.copy(paper)
+            selected_paper['profile'] = profile_config['profile_name']
+            selected.append(selected_paper)
+    return selected
@@ -0,0 +1,99 @@
+import cProfile
+import logging
+import os
+import tracemalloc
+from contextlib import contextmanager
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ['cpu', 'mem', 'both']
+DEFAULT_PROFILE_DIR = "profile"
+TOP_FUNCTIONS = 15
+TOP_ALLOCATIONS = 15
+TRACEMALLOC_FRAMES = 10
+# Allocations made by the profilers themselves or by the import system are noise
+_IGNORED_ALLOCATIONS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def _format_function(function) -> str:
+    filename, line, name = function
+    return f"{os.path.basename(filename)}:{line}({name})" if line else name
+
+
+class PipelineProfiler:
+    # cProfile only observes the thread that enabled it, so time spent in
+    # worker threads (downloads, LLM calls) shows up as waits in the caller.
+    def __init__(self, mode: Optional[str] = None, output_dir: str = DEFAULT_PROFILE_DIR):
+        self.cpu = mode in ('cpu', 'both')
+        self.mem = mode in ('mem', 'both')
+        self.output_dir = output_dir
+
+    @property
+    def enabled(self) -> bool:
+        return self.cpu or self.mem
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        profiler = None
+        before = None
+        if self.mem:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+        if self.cpu:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._write_cpu_profile(name, profiler)
+            if before is not None:
+                self._write_memory_profile(name, before)
+
+    def _write_cpu_profile(self, name: str, profiler: cProfile.Profile):
+        import pstats
+
+        path = os.path.join(self.output_dir, f"{name}.pstats")
+        profiler.dump_stats(path)
+
+        stats = pstats.Stats(profiler)
+        stats.sort_stats(pstats.SortKey.TIME)
+        lines = []
+        for function in stats.fcn_list[:TOP_FUNCTIONS]:  # type: ignore[attr-defined]
+            _, ncalls, tottime, cumtime, _ = stats.stats[function]  # type: ignore[attr-defined]
+            lines.append(f"  {tottime:8.3f}s self {cumtime:8.3f}s total {ncalls:7d} calls  {_format_function(function)}")
+        logger.info(f"CPU profile for stage {name} written to {path}. Hottest functions:\n" + "\n".join(lines))
+
+    def _write_memory_profile(self, name: str, before: tracemalloc.Snapshot):
+        after = tracemalloc.take_snapshot().filter_traces(_IGNORED_ALLOCATIONS)
+        _, peak = tracemalloc.get_traced_memory()
+        differences = after.compare_to(before.filter_traces(_IGNORED_ALLOCATIONS), 'lineno')
+
+        path = os.path.join(self.output_dir, f"{name}.allocations.txt")
+        with open(path, 'w') as f:
+            f.write(f"Peak traced memory: {peak / 1024 / 1024:.1f} MiB\n")
+            for difference in differences[:TOP_ALLOCATIONS]:
+                f.write(f"{difference}\n")
+        after.dump(os.path.join(self.output_dir, f"{name}.snapshot"))
+
+        top = "\n".join(f"  {difference}" for difference in differences[:5])
+        logger.info(f"Memory profile for stage {name} written to {path}. "
+                    f"Peak {peak / 1024 / 1024:.1f} MiB. Top allocations:\n{top}")
+
+    def stop(self):
+        if self.mem and tracemalloc.is_tracing():
+            tracemalloc.stop()
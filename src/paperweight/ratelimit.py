@@ -0,0 +1,81 @@
+import logging
+import multiprocessing
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    # Thread-safe token bucket. A rate of 0 disables limiting entirely.
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst if burst is not None else per_minute
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1) -> float:
+        if not self.enabled:
+            return 0.0
+        # Requests larger than the bucket could never be satisfied; let them
+        # through once the bucket is full instead of blocking forever.
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.available >= amount:
+                    self.available -= amount
+                    if waited:
+                        logger.debug(f"Rate limiter waited {waited:.2f}s for {amount} units")
+                    return waited
+                delay = (amount - self.available) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def charge(self, amount: float):
+        # Record usage that is only known after the fact (e.g. output tokens);
+        # the bucket may go negative, delaying subsequent acquires.
+        if not self.enabled:
+            return
+        with self.lock:
+            self._refill()
+            self.available -= amount
+
+
+class SharedRateLimiter:
+    # Spaces requests evenly across worker processes: each acquire reserves
+    # the next free slot in a schedule kept in shared memory. Hand it to
+    # workers when they start (e.g. a pool initializer); it cannot be sent
+    # to them later. A rate of 0 disables limiting.
+    def __init__(self, per_minute: float, context=None):
+        context = context or multiprocessing.get_context()
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self.next_slot = context.Value('d', 0.0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def acquire(self) -> float:
+        if not self.enabled:
+            return 0.0
+        with self.next_slot.get_lock():
+            now = time.monotonic()
+            slot = max(now, self.next_slot.value)
+            self.next_slot.value = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
@@ -0,0 +1,194 @@
+import functools
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+
+from paperweight.instrumentation import increment, record_retry
+
+logger = logging.getLogger(__name__)
+
+# Overloaded or briefly unavailable; anything else with a status code is permanent
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 10.0
+# A server asking us to wait longer than this is treated as down for this run
+DEFAULT_MAX_RETRY_AFTER = 60.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 60.0
+
+
+class TransientError(Exception):
+    # Raised by callers for failures that are worth retrying but carry no status code
+    pass
+
+class CircuitOpenError(requests.RequestException):
+    # A RequestException so existing network error handling covers it
+    pass
+
+
+class CircuitBreaker:
+    # Thread-safe. Opens after failure_threshold consecutive transient
+    # failures; once reset_timeout has passed a single trial call is let
+    # through, and its outcome closes or re-opens the circuit.
+    def __init__(self, name: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+                 reset_timeout: float = DEFAULT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_progress = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def before_call(self):
+        with self.lock:
+            state = self._state()
+            if state == 'closed':
+                return
+            if state == 'half_open' and not self.trial_in_progress:
+                self.trial_in_progress = True
+                logger.info(f"Circuit for {self.name} is half-open, trying one request")
+                return
+        increment('circuit_rejections', service=self.name)
+        raise CircuitOpenError(f"Circuit for {self.name} is open after repeated failures")
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info(f"Circuit for {self.name} closed")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            reopen = self.trial_in_progress
+            self.trial_in_progress = False
+            if reopen or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                increment('circuit_opened', service=self.name)
+                logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures")
+
+    def reset(self):
+        self.record_success()
+
+
+# Shared per service, so every caller of arXiv (or of the LLM) sees the same health
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(service: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if service not in _breakers:
+            _breakers[service] = CircuitBreaker(service)
+        return _breakers[service]
+
+def reset_circuit_breakers():
+    with _breakers_lock:
+        for breaker in _breakers.values():
+            breaker.reset()
+
+
+def get_status_code(exc: BaseException) -> Optional[int]:
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None) if response is not None else None
+    if status is None:
+        status = getattr(exc, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, TransientError):
+        return True
+    status = get_status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout, ConnectionError, TimeoutError))
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    # Retry-After is either a number of seconds or an HTTP date
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('Retry-After')
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+def backoff_delay(attempt: int, base_delay: float = DEFAULT_BASE_DELAY,
+                  max_delay: float = DEFAULT_MAX_DELAY) -> float:
+    # "Full jitter": spreads out retries from concurrent workers
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+def resilient(service: str, attempts: int = DEFAULT_ATTEMPTS, base_delay: float = DEFAULT_BASE_DELAY,
+              max_delay: float = DEFAULT_MAX_DELAY, max_retry_after: float = DEFAULT_MAX_RETRY_AFTER):
+    # Retries transient failures with jittered backoff (or as long as the
+    # server's Retry-After asks), raises permanent ones straight away, and
+    # fails fast while the service's circuit is open.
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            breaker = get_circuit_breaker(service)
+            attempt = 1
+            while True:
+                breaker.before_call()
+                try:
+                    result = func(*args, **kwargs)
+                except Exception as e:
+                    if not is_retryable(e):
+                        # The service answered; the request itself was wrong
+                        breaker.record_success()
+                        raise
+                    breaker.record_failure()
+                    delay = _retry_delay(e, attempt, attempts, base_delay, max_delay, max_retry_after)
+                    if delay is None:
+                        raise
+                    record_retry(func.__name__, attempt, delay)
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                breaker.record_success()
+                return result
+        return wrapper
+    return decorator
+
+def _retry_delay(exc, attempt, attempts, base_delay, max_delay, max_retry_after) -> Optional[float]:
+    if attempt >= attempts:
+        return None
+    retry_after = get_retry_after(exc)
+    if retry_after is None:
+        return backoff_delay(attempt, base_delay, max_delay)
+    if retry_after > max_retry_after:
+        logger.warning(f"Server asked to retry after {retry_after:.0f}s; not waiting that long")
+        return None
+    return retry_after
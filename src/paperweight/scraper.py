@@ -2,23 +2,37 @@ import gzip
 import io
 import logging
 import os
+import posixpath
+import re
 import tarfile
 import time
 import xml.etree.ElementTree as ET
 from datetime import date, datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 
 import requests
-from pypdf import PdfReader
 from requests.exceptions import HTTPError
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
 
+from paperweight.cache import (
+    ContentFormat,
+    ContentFormatCache,
+    open_content_format_cache,
+)
+from paperweight.dedup import (
+    filter_duplicate_papers,
+    filter_seen_papers,
+    open_paper_index,
+)
+from paperweight.instrumentation import increment, timed
+from paperweight.paper import Paper
+from paperweight.preprocess import strip_latex_comments
+from paperweight.profiles import get_fetch_categories
+from paperweight.ratelimit import SharedRateLimiter
+from paperweight.resilience import get_status_code, resilient
 from paperweight.utils import (
+    ARXIV_API_URL,
+    ARXIV_EPRINT_URL,
+    ARXIV_PDF_URL,
     get_last_processed_date,
     load_config,
     save_last_processed_date,
@@ -26,14 +40,44 @@ from paperweight.utils import (
 
 logger = logging.getLogger(__name__)
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=10),
-    retry=retry_if_exception_type((requests.ConnectionError, requests.Timeout))
-)
+# arXiv serves at most 2000 entries per request; smaller pages fail faster
+RANGE_PAGE_SIZE = 500
+
+_LATEX_INPUT_PATTERN = re.compile(r'\\(?:input|include|subfile)\s*(?:\{([^}]+)\}|\s+([^\s{}\\]+))')
+
+# A long-running process (paperweight serve) installs a Session so that
+# connections to arXiv are kept alive across requests and across runs.
+_http_session: Optional[requests.Session] = None
+
+# paperweight backfill installs a limiter shared by its worker processes,
+# so together they stay within arXiv's request rate
+_rate_limiter: Optional[SharedRateLimiter] = None
+
+def use_http_session(session: Optional[requests.Session]):
+    global _http_session
+    _http_session = session
+
+def use_rate_limiter(limiter: Optional[SharedRateLimiter]):
+    global _rate_limiter
+    _rate_limiter = limiter
+
+def http_get(url, **kwargs):
+    if _rate_limiter is not None:
+        _rate_limiter.acquire()
+    if _http_session is not None:
+        return _http_session.get(url, **kwargs)
+    return requests.get(url, **kwargs)
+
+def http_head(url, **kwargs):
+    if _rate_limiter is not None:
+        _rate_limiter.acquire()
+    if _http_session is not None:
+        return _http_session.head(url, **kwargs)
+    return requests.head(url, **kwargs)
+
+@timed('fetch_arxiv_papers')
 def fetch_arxiv_papers(category: str, start_date: date, max_results: Optional[int] = None) -> List[Dict[str, Any]]:
     logger.debug(f"Fetching arXiv papers for category '{category}' since {start_date}")
-    base_url = "http://export.arxiv.org/api/query?"
     query = f"cat:{category}"
     params: Dict[str, Union[str, int]] = {
         "search_query": query,
@@ -44,10 +88,56 @@ def fetch_arxiv_papers(category: str, start_date: date, max_results: Optional[in
     if max_results is not None and max_results > 0:
         params["max_results"] = max_results
 
+    papers = []
+    for paper in parse_listing(query_arxiv(params, category), category):
+        if paper['date'] < start_date:
+            logger.debug(f"Stopping fetch: paper date {paper['date']} is before start date {start_date}")
+            break
+
+        papers.append(paper)
+
+        if max_results is not None and max_results > 0 and len(papers) >= max_results:
+            logger.debug(f"Reached max_results limit of {max_results}")
+            break
+
+    increment('papers_listed', len(papers))
+    logger.info(f"Successfully fetched {len(papers)} papers for category '{category}' since {start_date}")
+    return papers
+
+@timed('fetch_arxiv_range')
+def fetch_arxiv_range(category: str, start_date: date, end_date: date,
+                      page_size: int = RANGE_PAGE_SIZE) -> List[Dict[str, Any]]:
+    # Every paper submitted between the two dates (inclusive), oldest first,
+    # a page at a time; unlike fetch_arxiv_papers this reaches any date range
+    query = f"cat:{category} AND submittedDate:[{start_date:%Y%m%d}0000 TO {end_date:%Y%m%d}2359]"
+    papers: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        params: Dict[str, Union[str, int]] = {
+            "search_query": query,
+            "start": start,
+            "max_results": page_size,
+            "sortBy": "submittedDate",
+            "sortOrder": "ascending"
+        }
+        page = list(parse_listing(query_arxiv(params, category), category))
+        papers.extend(paper for paper in page if start_date <= paper['date'] <= end_date)
+        # Sorted oldest first, so a page reaching past end_date is the last one needed
+        if len(page) < page_size or page[-1]['date'] > end_date:
+            break
+        start += page_size
+
+    increment('papers_listed', len(papers))
+    logger.info(f"Fetched {len(papers)} papers for category '{category}' from {start_date} to {end_date}")
+    return papers
+
+@resilient('arxiv', base_delay=2.0, max_delay=16.0)
+def query_arxiv(params: Dict[str, Union[str, int]], category: str) -> bytes:
     try:
-        response = requests.get(base_url, params=params)
+        response = http_get(ARXIV_API_URL, params=params)
         response.raise_for_status()
     except HTTPError as http_err:
+        response = http_err.response if http_err.response is not None else response
         if response.status_code == 400 and "Invalid field: cat" in response.text:
             logger.error(f"Invalid arXiv category: {category}. Please check your configuration.")
             raise ValueError(f"Invalid arXiv category: {category}. Please check your configuration.") from http_err
@@ -55,9 +145,11 @@ def fetch_arxiv_papers(category: str, start_date: date, max_results: Optional[in
             logger.error(f"HTTP error occurred: {http_err}")
             raise
 
-    root = ET.fromstring(response.content)
+    increment('bytes_downloaded', len(response.content))
+    return response.content
 
-    papers = []
+def parse_listing(content: bytes, category: str) -> Iterator[Dict[str, Any]]:
+    root = ET.fromstring(content)
     for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
         title_elem = entry.find('{http://www.w3.org/2005/Atom}title')
         link_elem = entry.find('{http://www.w3.org/2005/Atom}id')
@@ -81,27 +173,23 @@ def fetch_arxiv_papers(category: str, start_date: date, max_results: Optional[in
 
         logger.debug(f"Paper '{title}' submitted on {submitted_date}")
 
-        if submitted_date < start_date:
-            logger.debug(f"Stopping fetch: paper date {submitted_date} is before start date {start_date}")
-            break
+        # Cross-listed papers carry every category they appear in
+        categories = [elem.get('term', '') for elem in entry.findall('{http://www.w3.org/2005/Atom}category')]
+        if category not in categories:
+            categories.insert(0, category)
 
-        papers.append({
+        yield {
             "title": title,
             "link": link,
             "date": submitted_date,
-            "abstract": abstract
-        })
-
-        if max_results is not None and max_results > 0 and len(papers) >= max_results:
-            logger.debug(f"Reached max_results limit of {max_results}")
-            break
-
-    logger.info(f"Successfully fetched {len(papers)} papers for category '{category}' since {start_date}")
-    return papers
-
-def fetch_recent_papers(start_days=1):
-    config = load_config()
-    categories = config['arxiv']['categories']
+            "abstract": abstract,
+            "categories": categories
+        }
+
+def fetch_recent_papers(start_days=1, config=None):
+    if config is None:
+        config = load_config()
+    categories = get_fetch_categories(config)
     max_results = config['arxiv'].get('max_results', 0)  # Default to 0 if not set
     end_date = datetime.now().date()
     start_date = end_date - timedelta(days=start_days)
@@ -109,14 +197,21 @@ def fetch_recent_papers(start_days=1):
     logger.info(f"Fetching papers from {start_date} to {end_date}")
 
     all_papers = []
-    processed_ids = set()
+    papers_by_id: Dict[str, Dict[str, Any]] = {}
 
     for category in categories:
         logger.info(f"Processing category: {category}")
         try:
             papers = fetch_arxiv_papers(category, start_date, max_results=max_results if max_results > 0 else None)
-            new_papers = [paper for paper in papers if paper['link'].split('/abs/')[-1] not in processed_ids]
-            processed_ids.update(paper['link'].split('/abs/')[-1] for paper in new_papers)
+            new_papers = []
+            for paper in papers:
+                paper_id = paper['link'].split('/abs/')[-1]
+                if paper_id in papers_by_id:
+                    seen = papers_by_id[paper_id].setdefault('categories', [])
+                    seen.extend(c for c in paper.get('categories', []) if c not in seen)
+                else:
+                    papers_by_id[paper_id] = paper
+                    new_papers.append(paper)
 
             if max_results > 0:
                 new_papers = new_papers[:max_results]
@@ -130,30 +225,69 @@ def fetch_recent_papers(start_days=1):
     logger.info(f"Fetched a total of {len(all_papers)} papers")
     return all_papers
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=4, max=10),
-    retry=retry_if_exception_type((requests.ConnectionError, requests.Timeout, requests.RequestException))
-)
-def fetch_paper_content(paper_id):
+# Per URL, so a missing e-print (404) falls through to the PDF at once while
+# a 503 or dropped connection is retried before giving up on that format
+@resilient('arxiv')
+def _download(url):
+    response = http_get(url, timeout=30)
+    response.raise_for_status()
+    return response
+
+def _eprint_format(response) -> str:
+    # For PDF-only submissions the e-print endpoint serves the PDF itself
+    content_type = response.headers.get('Content-Type', '')
+    return 'pdf' if content_type.split(';')[0].strip() == 'application/pdf' else 'source'
+
+@resilient('arxiv')
+def probe_content_format(paper_id: str) -> ContentFormat:
+    response = http_head(f'{ARXIV_EPRINT_URL}/{paper_id}', timeout=30, allow_redirects=True)
+    if response.status_code == 404:
+        return 'missing', None
+    response.raise_for_status()
+    length = response.headers.get('Content-Length', '')
+    return _eprint_format(response), int(length) if length.isdigit() else None
+
+def get_content_format(paper_id: str, format_cache: Optional[ContentFormatCache] = None,
+                       max_source_bytes: int = 0) -> Optional[ContentFormat]:
+    known = format_cache.get(paper_id) if format_cache is not None else None
+    if known is None and max_source_bytes > 0:
+        # Only the size limit needs a HEAD request; otherwise the download itself reveals the format
+        try:
+            known = probe_content_format(paper_id)
+        except requests.RequestException as e:
+            logger.debug(f"Could not probe e-print for paper ID {paper_id}: {e}")
+            return None
+        if format_cache is not None:
+            format_cache.put(paper_id, *known)
+    return known
+
+def prefers_pdf(known: Optional[ContentFormat], max_source_bytes: int = 0) -> bool:
+    if known is None:
+        return False
+    content_format, size = known
+    if content_format != 'source':
+        return True
+    return max_source_bytes > 0 and size is not None and size > max_source_bytes
+
+@timed('fetch_paper_content')
+def fetch_paper_content(paper_id, format_cache: Optional[ContentFormatCache] = None, max_source_bytes: int = 0):
+    # Source gives cleaner text than the PDF, so it is tried first unless the
+    # paper is known to be PDF-only, to have no source, or to have a source
+    # bundle larger than max_source_bytes.
     logger.debug(f"Fetching content for paper ID: {paper_id}")
-    source_url = f'http://export.arxiv.org/e-print/{paper_id}'
-    pdf_url = f'https://export.arxiv.org/pdf/{paper_id}'
-
-    try:
-        # Try to fetch source first
-        response = requests.get(source_url, timeout=30)
-        response.raise_for_status()
-        logger.debug(f"Successfully fetched source for paper ID: {paper_id}")
-        return response.content, 'source'
-    except requests.RequestException as e:
-        logger.warning(f"Failed to fetch source for paper ID: {paper_id}. Error: {e}")
+    known = get_content_format(paper_id, format_cache, max_source_bytes)
+    if prefers_pdf(known, max_source_bytes):
+        logger.debug(f"Skipping e-print for paper ID {paper_id}: {known}")
+    else:
+        content, method = _fetch_eprint(paper_id, format_cache)
+        if content:
+            return content, method
 
     try:
-        # If source is not available, try PDF
-        response = requests.get(pdf_url, timeout=30)
-        response.raise_for_status()
+        response = _download(f'{ARXIV_PDF_URL}/{paper_id}')
         logger.debug(f"Successfully fetched PDF for paper ID: {paper_id}")
+        increment('bytes_downloaded', len(response.content))
+        increment('papers_downloaded')
         return response.content, 'pdf'
     except requests.RequestException as e:
         logger.warning(f"Failed to fetch PDF for paper ID: {paper_id}. Error: {e}")
@@ -161,7 +295,26 @@ def fetch_paper_content(paper_id):
     logger.error(f"Failed to fetch content for paper ID: {paper_id}")
     return None, None
 
+def _fetch_eprint(paper_id, format_cache):
+    try:
+        response = _download(f'{ARXIV_EPRINT_URL}/{paper_id}')
+    except requests.RequestException as e:
+        logger.warning(f"Failed to fetch source for paper ID: {paper_id}. Error: {e}")
+        if format_cache is not None and get_status_code(e) == 404:
+            format_cache.put(paper_id, 'missing')
+        return None, None
+
+    method = _eprint_format(response)
+    if format_cache is not None:
+        format_cache.put(paper_id, method, len(response.content))
+    logger.debug(f"Successfully fetched e-print ({method}) for paper ID: {paper_id}")
+    increment('bytes_downloaded', len(response.content))
+    increment('papers_downloaded')
+    return response.content, method
+
 def extract_text_from_pdf(pdf_content):
+    from pypdf import PdfReader
+
     pdf_file = io.BytesIO(pdf_content)
     pdf_reader = PdfReader(pdf_file)
     text = ""
@@ -169,6 +322,7 @@ def extract_text_from_pdf(pdf_content):
         text += page.extract_text()
     return text
 
+@timed('extract_text_from_source')
 def extract_text_from_source(content, method):
     if method not in ['pdf', 'source']:
         raise ValueError(f"Invalid source type: {method}")
@@ -185,32 +339,87 @@ def extract_text_from_source(content, method):
 
     # Check if it's a tar file
     if tarfile.is_tarfile(io.BytesIO(decompressed)):
-        with tarfile.open(fileobj=io.BytesIO(decompressed)) as tar:
-            text = ""
-            for member in tar.getmembers():
-                if member.isfile():
-                    _, ext = os.path.splitext(member.name)
-                    if ext.lower() in ['.tex', '.txt', '.log']:
-                        f = tar.extractfile(member)
-                        if f:
-                            text += f.read().decode('utf-8', errors='ignore')
-                    elif ext.lower() in ['.png', '.jpg', '.jpeg']:
-                        # Optionally log the presence of image files
-                        logger.debug(f"Skipping image file: {member.name}")
-                    else:
-                        logger.debug(f"Unhandled file type: {member.name}")
-            return text
+        tex_files, text_files = _read_tar_text_files(decompressed)
+        if tex_files:
+            return extract_latex_document(tex_files)
+        return "\n".join(text_files[name] for name in sorted(text_files))
     else:
         # If it's not a tar file, assume it's a single file
-        return decompressed.decode('utf-8', errors='ignore')
-
-def fetch_paper_contents(paper_ids):
+        text = decompressed.decode('utf-8', errors='ignore')
+        if '\\documentclass' in text:
+            return extract_latex_document({'main.tex': text})
+        return text
+
+def _read_tar_text_files(data):
+    tex_files = {}
+    text_files = {}
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        for member in tar.getmembers():
+            if member.isfile():
+                name = posixpath.normpath(member.name)
+                _, ext = os.path.splitext(name)
+                if ext.lower() in ['.tex', '.txt']:
+                    f = tar.extractfile(member)
+                    if f:
+                        files = tex_files if ext.lower() == '.tex' else text_files
+                        files[name] = f.read().decode('utf-8', errors='ignore')
+                elif ext.lower() in ['.png', '.jpg', '.jpeg']:
+                    # Optionally log the presence of image files
+                    logger.debug(f"Skipping image file: {member.name}")
+                else:
+                    logger.debug(f"Unhandled file type: {member.name}")
+    return tex_files, text_files
+
+def find_main_tex(tex_files):
+    candidates = [
+        name for name, text in tex_files.items()
+        if '\\documentclass' in strip_latex_comments(text)
+    ]
+    if not candidates:
+        return None
+    # Prefer a complete document, then the largest one (drafts and standalone
+    # figures are usually smaller than the paper itself)
+    return max(candidates, key=lambda name: ('\\begin{document}' in tex_files[name], len(tex_files[name])))
+
+def extract_latex_document(tex_files):
+    main_name = find_main_tex(tex_files)
+    if main_name is None:
+        logger.debug("No main .tex file found, concatenating all .tex files")
+        return "\n".join(strip_latex_comments(tex_files[name]) for name in sorted(tex_files))
+
+    logger.debug(f"Using {main_name} as main .tex file")
+    text = strip_latex_comments(tex_files[main_name])
+    begin = text.find('\\begin{document}')
+    if begin != -1:
+        text = text[begin + len('\\begin{document}'):]
+    end = text.find('\\end{document}')
+    if end != -1:
+        text = text[:end]
+    return _resolve_latex_inputs(text, posixpath.dirname(main_name), tex_files, {main_name})
+
+def _resolve_latex_inputs(text, base_dir, tex_files, included):
+    def replace(match):
+        target = (match.group(1) or match.group(2)).strip()
+        for candidate in [target, f"{target}.tex"]:
+            name = posixpath.normpath(posixpath.join(base_dir, candidate))
+            if name in tex_files:
+                if name in included:
+                    logger.debug(f"Skipping recursive include of {name}")
+                    return ''
+                included.add(name)
+                return _resolve_latex_inputs(strip_latex_comments(tex_files[name]), base_dir, tex_files, included)
+        logger.debug(f"Included file not found in source: {target}")
+        return ''
+
+    return _LATEX_INPUT_PATTERN.sub(replace, text)
+
+def fetch_paper_contents(paper_ids, format_cache: Optional[ContentFormatCache] = None, max_source_bytes: int = 0):
     contents = []
     total_papers = len(paper_ids)
     logger.info(f"Fetching content for {total_papers} papers")
     for i, paper_id in enumerate(paper_ids):
         try:
-            content, method = fetch_paper_content(paper_id)
+            content, method = fetch_paper_content(paper_id, format_cache, max_source_bytes)
             contents.append((paper_id, content, method))
         except Exception as e:
             logger.error(f"Error fetching content for paper ID {paper_id}: {e}")
@@ -226,7 +435,8 @@ def fetch_paper_contents(paper_ids):
     logger.info(f"Finished fetching content for all {total_papers} papers")
     return contents
 
-def get_recent_papers(force_refresh=False):
+def get_fetch_days(force_refresh=False):
+    # Number of days of listings to fetch; 0 when today was already processed
     last_processed_date = get_last_processed_date()
     logger.info(f"Last processed date: {last_processed_date}")
     current_date = datetime.now().date()
@@ -234,24 +444,42 @@ def get_recent_papers(force_refresh=False):
 
     if last_processed_date is None or force_refresh:
         # If never run before, fetch papers from the last 7 days
-        days = 7
         logger.info("First run detected. Fetching papers from the last 7 days.")
-    else:
-        days = (current_date - last_processed_date).days
-        if days == 0:
-            logger.info("Already processed papers for today. No new papers to fetch.")
-            return []
-        elif days > 7:
-            # If more than a week has passed, limit to 7 days to avoid overload
-            days = 7
-            logger.warning(f"More than a week since last run. Limiting fetch to last {days} days.")
+        return 7
 
-    logger.info(f"Fetching papers for the last {days} days")
-    recent_papers = fetch_recent_papers(days)
-    logger.info(f"Fetched {len(recent_papers)} recent papers")
+    days = (current_date - last_processed_date).days
+    if days == 0:
+        logger.info("Already processed papers for today. No new papers to fetch.")
+    elif days > 7:
+        # If more than a week has passed, limit to 7 days to avoid overload
+        days = 7
+        logger.warning(f"More than a week since last run. Limiting fetch to last {days} days.")
+    return days
+
+def build_paper_record(paper, paper_id, text, method):
+    return Paper(
+        id=paper_id,
+        title=paper['title'],
+        link=paper['link'],
+        date=paper['date'],
+        abstract=paper['abstract'],
+        categories=paper.get('categories', []),
+        content=text,
+        content_type=method,
+    )
+
+def is_metadata_only(arxiv_config: Dict[str, Any]) -> bool:
+    return arxiv_config.get('fetch_depth', 'full_text') == 'metadata'
+
+def fetch_full_texts(recent_papers, arxiv_config):
     paper_ids = [paper['link'].split('/abs/')[-1] for paper in recent_papers]
 
-    contents = fetch_paper_contents(paper_ids)
+    format_cache = open_content_format_cache(arxiv_config)
+    try:
+        contents = fetch_paper_contents(paper_ids, format_cache, int(arxiv_config.get('max_source_bytes', 0)))
+    finally:
+        if format_cache is not None:
+            format_cache.close()
 
     papers_with_content = []
     for paper, (paper_id, content, method) in zip(recent_papers, contents):
@@ -259,15 +487,39 @@ def get_recent_papers(force_refresh=False):
             logger.debug(f"Extracting text for paper ID: {paper_id}")
             text = extract_text_from_source(content, method)
 
-            papers_with_content.append({
-                "id": paper_id,
-                "title": paper['title'],
-                "link": paper['link'],
-                "date": paper['date'],
-                "abstract": paper['abstract'],
-                "content": text,
-                "content_type": method
-            })
+            papers_with_content.append(build_paper_record(paper, paper_id, text, method))
+    return papers_with_content
+
+def get_recent_papers(force_refresh=False, config=None):
+    if config is None:
+        config = load_config()
+    current_date = datetime.now().date()
+    days = get_fetch_days(force_refresh)
+    if days == 0:
+        return []
+
+    logger.info(f"Fetching papers for the last {days} days")
+    recent_papers = fetch_recent_papers(days, config)
+    logger.info(f"Fetched {len(recent_papers)} recent papers")
+
+    paper_index = open_paper_index(config['arxiv'])
+    try:
+        if paper_index is not None and not force_refresh:
+            recent_papers = filter_seen_papers(recent_papers, paper_index)
+
+        if is_metadata_only(config['arxiv']):
+            logger.info("Fetch depth is 'metadata'; skipping full-text downloads")
+            papers_with_content = [build_paper_record(paper, paper['link'].split('/abs/')[-1], None, 'metadata')
+                                   for paper in recent_papers]
+        else:
+            papers_with_content = fetch_full_texts(recent_papers, config['arxiv'])
+
+        if paper_index is not None:
+            papers_with_content = filter_duplicate_papers(papers_with_content, paper_index)
+    finally:
+        # A failed download or extraction must not leak the index connection
+        if paper_index is not None:
+            paper_index.close()
 
     if papers_with_content:
         save_last_processed_date(current_date)
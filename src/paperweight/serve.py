@@ -0,0 +1,149 @@
+import logging
+import os
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+import requests
+import yaml
+
+from paperweight.analyzer import LLMClientPool, create_client_pool
+from paperweight.check import (
+    check_for_new_papers,
+    has_pending_batches,
+    record_processed_listing,
+)
+from paperweight.exporter import start_metrics_server, stop_metrics_server
+from paperweight.logging_config import setup_logging
+from paperweight.main import run_pipeline
+from paperweight.profiles import get_fetch_categories
+from paperweight.scraper import use_http_session
+from paperweight.utils import load_config
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUN_INTERVAL_MINUTES = 60
+# How often config.yaml is checked for changes between runs
+CONFIG_POLL_SECONDS = 5
+
+
+class PipelineDaemon:
+    # Keeps the state that a cron invocation rebuilds on every run: imported
+    # modules, the parsed configuration, a keep-alive HTTP session for arXiv
+    # and the LLM client pool with its rate limiters. Tokenizer encodings are
+    # cached per process by get_encoding, so they stay loaded after the first
+    # run. The SQLite summary cache and paper index are still opened per run;
+    # that costs well under a millisecond and keeps them consistent if the
+    # daemon is killed.
+    def __init__(self, config_path: str = 'config.yaml', interval_minutes: Optional[float] = None):
+        self.config_path = config_path
+        self.interval_override = interval_minutes
+        self.config: Dict[str, Any] = {}
+        self.client_pool: Optional[LLMClientPool] = None
+        self.http_session: Optional[requests.Session] = None
+        self.metrics_server: Optional['ThreadingHTTPServer'] = None
+        self.runs = 0
+        self._config_mtime: Optional[float] = None
+        self._stop = threading.Event()
+        self._reload = threading.Event()
+
+    @property
+    def interval_seconds(self) -> float:
+        minutes = self.interval_override
+        if minutes is None:
+            minutes = self.config.get('serve', {}).get('run_interval_minutes', DEFAULT_RUN_INTERVAL_MINUTES)
+        return float(minutes) * 60
+
+    def reload_config(self) -> bool:
+        # Returns True when a new configuration was loaded. A broken edit keeps
+        # the previous configuration running rather than stopping the daemon.
+        try:
+            mtime = os.stat(self.config_path).st_mtime
+        except OSError as e:
+            if not self.config:
+                raise
+            logger.error(f"Cannot read {self.config_path}, keeping previous configuration: {e}")
+            return False
+        if self.config and mtime == self._config_mtime and not self._reload.is_set():
+            return False
+        self._reload.clear()
+        self._config_mtime = mtime
+
+        try:
+            config = load_config(self.config_path)
+        except (yaml.YAMLError, KeyError, ValueError) as e:
+            if not self.config:
+                raise
+            logger.error(f"Invalid configuration, keeping previous configuration: {e}")
+            return False
+
+        previous = self.config
+        self.config = config
+        setup_logging(config['logging'])
+        self._warm(previous, config)
+        logger.info(f"Configuration loaded from {self.config_path}")
+        return True
+
+    def _warm(self, previous: Dict[str, Any], config: Dict[str, Any]):
+        # Only rebuild what the changed sections affect
+        if previous.get('analyzer') != config['analyzer']:
+            self.client_pool = create_client_pool(config['analyzer'])
+        if not previous or previous.get('metrics') != config.get('metrics'):
+            stop_metrics_server(self.metrics_server)
+            self.metrics_server = start_metrics_server(config.get('metrics', {}))
+
+    def run_once(self, force_refresh: bool = False):
+        if force_refresh:
+            has_new_papers, newest_entry = True, None
+        else:
+            arxiv_config = dict(self.config['arxiv'], categories=get_fetch_categories(self.config))
+            has_new_papers, newest_entry = check_for_new_papers(arxiv_config)
+        if has_new_papers:
+            run_pipeline(force_refresh, config=self.config, client_pool=self.client_pool, serve_metrics=False)
+            record_processed_listing(newest_entry)
+        elif has_pending_batches():
+            run_pipeline(config=self.config, client_pool=self.client_pool, serve_metrics=False, deliver_only=True)
+
+    def _wait_for_next_run(self, started: float):
+        while not self._stop.is_set():
+            # Recomputed each time so an interval change applies to the current wait
+            remaining = started + self.interval_seconds - time.monotonic()
+            if remaining <= 0:
+                return
+            self._stop.wait(min(CONFIG_POLL_SECONDS, remaining))
+            if not self._stop.is_set():
+                self.reload_config()
+
+    def serve(self, force_refresh: bool = False, max_runs: Optional[int] = None):
+        self.reload_config()
+        self.http_session = requests.Session()
+        use_http_session(self.http_session)
+        logger.info(f"paperweight serve started, running every {self.interval_seconds / 60:g} minutes")
+        try:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                try:
+                    self.run_once(force_refresh)
+                except Exception as e:
+                    # One failed run must not take the daemon down
+                    logger.error(f"Scheduled run failed: {e}", exc_info=True)
+                self.runs += 1
+                force_refresh = False
+                if max_runs is not None and self.runs >= max_runs:
+                    break
+                self._wait_for_next_run(started)
+        finally:
+            use_http_session(None)
+            self.http_session.close()
+            stop_metrics_server(self.metrics_server)
+            self.metrics_server = None
+            logger.info("paperweight serve stopped")
+
+    def stop(self):
+        self._stop.set()
+
+    def request_reload(self):
+        self._reload.set()
@@ -1,13 +1,23 @@
+import functools
+import importlib.util
 import logging
 import os
 import re
 from datetime import datetime
 
-import tiktoken
 import yaml
 from dotenv import load_dotenv
 
 LAST_PROCESSED_DATE_FILE = "last_processed_date.txt"
+BATCH_STATE_FILE = "pending_batches.json"
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+ARXIV_EPRINT_URL = "http://export.arxiv.org/e-print"
+ARXIV_PDF_URL = "https://export.arxiv.org/pdf"
+DEFAULT_TOKENIZER_MODEL = "gpt-3.5-turbo"
+FALLBACK_ENCODING = "cl100k_base"
+
+# libyaml's loader parses the config several times faster when PyYAML was built with it
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +54,7 @@ def load_config(config_path='config.yaml'):
         load_dotenv()
 
         with open(config_path, 'r') as config_file:
-            config = yaml.safe_load(config_file)
+            config = yaml.load(config_file, Loader=YAML_LOADER)
         if config is None:
             raise ValueError("Empty configuration file")
 
@@ -96,8 +106,17 @@ def check_config(config):
         _check_required_sections(config)
         _check_arxiv_section(config['arxiv'])
         _check_analyzer_section(config['analyzer'])
+        _check_fetch_depth(config['arxiv'], config['analyzer'])
+        _check_processor_section(config['processor'])
         _check_notifier_section(config['notifier'])
         _check_logging_section(config['logging'])
+        _check_non_negative_numbers(config.get('metrics', {}), 'metrics', ['prometheus_port'])
+        _check_serve_section(config.get('serve', {}))
+        _check_pipeline_section(config.get('pipeline', {}))
+        _check_backfill_section(config.get('backfill', {}))
+        _check_analytics_section(config.get('analytics', {}))
+        _check_profiles_section(config.get('profiles') or [])
+        _check_profile_configs(config)
     except KeyError as e:
         raise ValueError(f"Missing required section or key: {e}")
 
@@ -121,6 +140,35 @@ def _check_arxiv_section(arxiv):
 
         if max_results < 0:
             raise ValueError("'max_results' in 'arxiv' section must be a non-negative integer")
+    if 'dedup_threshold' in arxiv:
+        try:
+            dedup_threshold = float(arxiv['dedup_threshold'])
+        except ValueError:
+            raise ValueError("'dedup_threshold' in 'arxiv' section must be a number")
+
+        if not 0 < dedup_threshold <= 1:
+            raise ValueError("'dedup_threshold' in 'arxiv' section must be between 0 and 1")
+    _check_non_negative_numbers(arxiv, 'arxiv', ['max_source_bytes'])
+
+def _check_processor_section(processor, label="'processor' section"):
+    for key in ['keywords', 'exclusion_keywords', 'important_words']:
+        if key in processor and not (isinstance(processor[key], list)
+                                     and all(isinstance(word, str) for word in processor[key])):
+            raise ValueError(f"'{key}' in {label} must be a list of strings")
+    for key in ['title_keyword_weight', 'abstract_keyword_weight', 'content_keyword_weight',
+                'exclusion_keyword_penalty', 'important_words_weight', 'min_score']:
+        if key in processor and (isinstance(processor[key], bool) or not isinstance(processor[key], (int, float))):
+            raise ValueError(f"'{key}' in {label} must be a number")
+    if 'max_papers' in processor:
+        if not isinstance(processor['max_papers'], int) or processor['max_papers'] < 0:
+            raise ValueError(f"'max_papers' in {label} must be a non-negative integer")
+
+def _check_fetch_depth(arxiv, analyzer):
+    fetch_depth = arxiv.get('fetch_depth', 'full_text')
+    if fetch_depth not in ['full_text', 'metadata']:
+        raise ValueError(f"Invalid fetch depth: '{fetch_depth}'")
+    if fetch_depth == 'metadata' and analyzer.get('type') == 'summary':
+        raise ValueError("'fetch_depth: metadata' cannot be used with the 'summary' analyzer, which needs full text")
 
 def _check_analyzer_section(analyzer):
     valid_analyzer_types = ['abstract', 'summary']
@@ -130,14 +178,101 @@ def _check_analyzer_section(analyzer):
         valid_llm_providers = ['openai', 'gemini']
         if analyzer.get('llm_provider') not in valid_llm_providers:
             raise ValueError(f"Invalid LLM provider: '{analyzer.get('llm_provider')}'")
+    if 'max_concurrent_requests' in analyzer:
+        if not isinstance(analyzer['max_concurrent_requests'], int) or analyzer['max_concurrent_requests'] < 1:
+            raise ValueError("'max_concurrent_requests' in 'analyzer' section must be a positive integer")
+    if analyzer.get('summary_mode', 'interactive') not in ['interactive', 'batch']:
+        raise ValueError(f"Invalid summary mode: '{analyzer.get('summary_mode')}'")
+    if analyzer.get('summary_strategy', 'truncate') not in ['truncate', 'map_reduce']:
+        raise ValueError(f"Invalid summary strategy: '{analyzer.get('summary_strategy')}'")
+    for key in ['max_input_tokens', 'max_chunks']:
+        if key in analyzer and (not isinstance(analyzer[key], int) or analyzer[key] < 1):
+            raise ValueError(f"'{key}' in 'analyzer' section must be a positive integer")
+    non_negative_keys = ['requests_per_minute', 'tokens_per_minute',
+                         'summary_cache_ttl_days', 'summary_cache_max_entries',
+                         'batch_poll_interval', 'batch_wait_timeout']
+    _check_non_negative_numbers(analyzer, 'analyzer', non_negative_keys)
+
+def _check_non_negative_numbers(section, section_name, keys):
+    for key in keys:
+        if key in section:
+            if not isinstance(section[key], (int, float)) or section[key] < 0:
+                raise ValueError(f"'{key}' in '{section_name}' section must be a non-negative number")
+
+def _check_serve_section(serve):
+    if 'run_interval_minutes' in serve:
+        interval = serve['run_interval_minutes']
+        if not isinstance(interval, (int, float)) or interval <= 0:
+            raise ValueError("'run_interval_minutes' in 'serve' section must be a positive number")
+
+def _check_pipeline_section(pipeline):
+    if pipeline.get('engine', 'sequential') not in ['sequential', 'async']:
+        raise ValueError(f"Invalid pipeline engine: '{pipeline.get('engine')}'")
+    for key in ['queue_size', 'download_workers', 'extract_workers']:
+        if key in pipeline and (not isinstance(pipeline[key], int) or pipeline[key] < 1):
+            raise ValueError(f"'{key}' in 'pipeline' section must be a positive integer")
+
+def _check_backfill_section(backfill):
+    for key in ['worker_processes', 'shard_days']:
+        if key in backfill and (not isinstance(backfill[key], int) or backfill[key] < 1):
+            raise ValueError(f"'{key}' in 'backfill' section must be a positive integer")
+    _check_non_negative_numbers(backfill, 'backfill', ['arxiv_requests_per_minute'])
+
+def _check_analytics_section(analytics):
+    if 'export_batch_rows' in analytics and (not isinstance(analytics['export_batch_rows'], int) or analytics['export_batch_rows'] < 1):
+        raise ValueError("'export_batch_rows' in 'analytics' section must be a positive integer")
+    # pyarrow is optional; fail at start-up rather than after the run
+    if analytics.get('columnar_export') and importlib.util.find_spec('pyarrow') is None:
+        raise ValueError("'columnar_export' needs pyarrow; install it with: pip install 'paperweight[analytics]'")
+
+def _check_profiles_section(profiles):
+    if not isinstance(profiles, list):
+        raise ValueError("'profiles' must be a list")
+    names = set()
+    for profile in profiles:
+        if not isinstance(profile, dict) or not profile.get('name'):
+            raise ValueError("Each profile must have a 'name'")
+        if profile['name'] in names:
+            raise ValueError(f"Duplicate profile name: '{profile['name']}'")
+        names.add(profile['name'])
+        invalid_categories = [cat for cat in profile.get('categories', []) if not is_valid_arxiv_category(cat)]
+        if invalid_categories:
+            raise ValueError(f"Invalid arXiv category in profile '{profile['name']}': {', '.join(invalid_categories)}")
+        for section in ['processor', 'notifier']:
+            if not isinstance(profile.get(section, {}), dict):
+                raise ValueError(f"'{section}' in profile '{profile['name']}' must be a mapping")
+        if not isinstance(profile.get('notifier', {}).get('email', {}), dict):
+            raise ValueError(f"'email' in profile '{profile['name']}' notifier must be a mapping")
+
+def _check_profile_configs(config):
+    # Each profile runs with its overrides merged over the top-level
+    # sections, so the merged sections get the same checks
+    from paperweight.profiles import build_profile_configs, has_profiles
+
+    if not has_profiles(config):
+        return
+    for profile_config in build_profile_configs(config):
+        label = f"profile '{profile_config['profile_name']}'"
+        _check_processor_section(profile_config['processor'], label)
+        try:
+            _check_notifier_section(profile_config['notifier'])
+        except ValueError as e:
+            raise ValueError(f"Invalid notifier in {label}: {e}") from None
 
 def _check_notifier_section(notifier):
     if 'email' not in notifier:
         raise ValueError("Missing required subsection: 'email' in 'notifier'")
+    email = notifier['email']
+    if not isinstance(email, dict):
+        raise ValueError("'email' in 'notifier' section must be a mapping")
     required_email_fields = ['to', 'from', 'password', 'smtp_server', 'smtp_port']
     for field in required_email_fields:
-        if field not in notifier['email']:
+        if field not in email:
             raise ValueError(f"Missing required email field: '{field}'")
+    if not email['to']:
+        raise ValueError("Email field 'to' must not be empty")
+    if not str(email['smtp_port']).isdigit():
+        raise ValueError(f"Invalid SMTP port: '{email['smtp_port']}'")
 
 def _check_logging_section(logging):
     valid_logging_levels = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
@@ -167,6 +302,37 @@ def save_last_processed_date(date):
     except IOError as e:
         logger.error(f"Error saving last processed date: {e}")
 
-def count_tokens(text):
-    encoding = tiktoken.encoding_for_model("gpt-3.5-turbo")
-    return len(encoding.encode(text, allowed_special={'<|endoftext|>'}))
+@functools.lru_cache(maxsize=None)
+def get_encoding(model=DEFAULT_TOKENIZER_MODEL):
+    # Building an encoding parses the whole BPE rank file, so each model's
+    # encoding is created once per process and shared by all threads.
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        logger.debug(f"No tiktoken encoding registered for {model}, using {FALLBACK_ENCODING}")
+        return tiktoken.get_encoding(FALLBACK_ENCODING)
+
+def count_tokens(text, model=DEFAULT_TOKENIZER_MODEL):
+    return len(get_encoding(model).encode(text, allowed_special={'<|endoftext|>'}))
+
+def truncate_to_tokens(text, max_tokens, model=DEFAULT_TOKENIZER_MODEL):
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text, allowed_special={'<|endoftext|>'})
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+def truncate_to_tokens_batch(texts, max_tokens, model=DEFAULT_TOKENIZER_MODEL, num_threads=8):
+    # One multi-threaded encode for many texts (tiktoken releases the GIL)
+    encoding = get_encoding(model)
+    texts = list(texts)
+    encoded = encoding.encode_batch(texts, num_threads=num_threads, allowed_special={'<|endoftext|>'})
+    return [text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+            for text, tokens in zip(texts, encoded)]
+
+def split_into_token_chunks(text, chunk_tokens, model=DEFAULT_TOKENIZER_MODEL):
+    encoding = get_encoding(model)
+    tokens = encoding.encode(text, allowed_special={'<|endoftext|>'})
+    return [encoding.decode(tokens[i:i + chunk_tokens]) for i in range(0, len(tokens), chunk_tokens)]
@@ -0,0 +1,11 @@
+import pytest
+
+from paperweight.resilience import reset_circuit_breakers
+
+
+@pytest.fixture(autouse=True)
+def closed_circuits():
+    # Circuit breakers are shared per process; failures in one test must not trip the next
+    reset_circuit_breakers()
+    yield
+    reset_circuit_breakers()
@@ -0,0 +1,115 @@
+import json
+from datetime import date
+
+import pytest
+
+from paperweight.analytics import (
+    ColumnarWriter,
+    export_corpus,
+    export_run,
+    open_papers_writer,
+    paper_row,
+    record_scored_papers,
+    record_selected_papers,
+    reset_scored_papers,
+    write_papers,
+)
+
+pa = pytest.importorskip('pyarrow')
+ds = pytest.importorskip('pyarrow.dataset')
+
+
+@pytest.fixture(autouse=True)
+def no_scored_papers():
+    yield
+    reset_scored_papers()
+
+def scored_paper(paper_id, day, score=10.0):
+    return {
+        'id': paper_id, 'title': f'Paper {paper_id}', 'link': f'http://arxiv.org/abs/{paper_id}',
+        'date': day, 'categories': ['cs.CL', 'cs.LG'], 'content_type': 'pdf', 'relevance_score': score,
+        'score_breakdown': {'keyword_matching': {'title': 3.0, 'abstract': 4.0, 'content': 5.0},
+                            'exclusion_penalty': -2.0, 'important_words': 0.5},
+    }
+
+def read_table(path):
+    return ds.dataset(str(path), partitioning='hive').to_table().sort_by('id')
+
+def test_paper_row_flattens_score_breakdown():
+    row = paper_row(scored_paper('2401.00001v1', date(2024, 1, 15)), 'run-1')
+
+    assert row['run_id'] == 'run-1'
+    assert (row['score_title'], row['score_abstract'], row['score_content']) == (3.0, 4.0, 5.0)
+    assert row['score_exclusion_penalty'] == -2.0
+    assert row['score_important_words'] == 0.5
+    assert row['selected'] is None
+    assert paper_row(scored_paper('2401.00001v1', date(2024, 1, 15)), 'run-1', True)['selected'] is True
+    assert paper_row({'id': 'x', 'date': '2024-01-15'}, 'run-1')['score_title'] is None
+
+def test_writer_streams_batches_into_date_partitions(tmp_path):
+    papers = [scored_paper(f'2401.0000{i}v1', date(2024, 1, 15 + i % 2)) for i in range(5)]
+
+    with open_papers_writer(str(tmp_path), 'run-1', batch_rows=2) as writer:
+        write_papers(writer, papers)
+
+    assert writer.rows_written == 5
+    days = sorted(path.name for path in (tmp_path / 'papers').iterdir())
+    assert days == ['date=2024-01-15', 'date=2024-01-16']
+    # Three flushes of at most two rows, each split by date
+    assert len(list((tmp_path / 'papers').glob('*/*.parquet'))) == 5
+    assert not list((tmp_path / 'papers').glob('*/.*'))
+    table = read_table(tmp_path / 'papers')
+    assert table.column('id').to_pylist() == [paper['id'] for paper in papers]
+    assert table.column('categories').to_pylist()[0] == ['cs.CL', 'cs.LG']
+
+def test_writer_never_overwrites_earlier_runs(tmp_path):
+    for run_id in ['run-1', 'run-2']:
+        with ColumnarWriter(str(tmp_path), pa.schema([('id', pa.string())]), run_id) as writer:
+            writer.write(date(2024, 1, 15), {'id': run_id})
+
+    assert read_table(tmp_path).column('id').to_pylist() == ['run-1', 'run-2']
+
+def test_export_run_writes_papers_and_stage_timings(tmp_path):
+    config = {'analytics': {'columnar_export': True, 'dataset_dir': str(tmp_path)}}
+    reset_scored_papers(config)
+    papers = [scored_paper('2401.00001v1', date(2024, 1, 15)), scored_paper('2401.00002v1', date(2024, 1, 15), 1.0)]
+    record_scored_papers(papers)
+    record_selected_papers(papers[:1])
+    report = {
+        'started_at': '2024-01-16T08:00:00', 'wall_time_seconds': 12.5,
+        'stages': {'fetch_arxiv_papers': {'count': 2, 'errors': 0, 'total_seconds': 1.5, 'mean_seconds': 0.75,
+                                          'p50_seconds': 0.7, 'p90_seconds': 0.8, 'p99_seconds': 0.8,
+                                          'max_seconds': 0.8}},
+    }
+
+    export_run(config, report)
+
+    papers = read_table(tmp_path / 'papers')
+    assert papers.column('id').to_pylist() == ['2401.00001v1', '2401.00002v1']
+    assert papers.column('selected').to_pylist() == [True, False]
+    assert papers.column('relevance_score').to_pylist() == [10.0, 1.0]
+    stages = ds.dataset(str(tmp_path / 'stages'), partitioning='hive').to_table().sort_by('stage')
+    assert stages.column('stage').to_pylist() == ['fetch_arxiv_papers', 'run']
+    assert stages.column('total_seconds').to_pylist() == [1.5, 12.5]
+    assert stages.column('run_id').to_pylist()[0] == papers.column('run_id').to_pylist()[0]
+
+def test_export_run_disabled(tmp_path):
+    config = {'analytics': {'dataset_dir': str(tmp_path)}}
+    reset_scored_papers(config)
+    record_scored_papers([scored_paper('x', date(2024, 1, 15))])
+
+    export_run(config, {})
+    assert not list(tmp_path.iterdir())
+
+def test_export_corpus(tmp_path):
+    corpus_dir = tmp_path / 'corpus' / 'cs.CL'
+    corpus_dir.mkdir(parents=True)
+    for day in ['2024-01-15', '2024-01-16']:
+        with open(corpus_dir / f'{day}.jsonl', 'w') as f:
+            f.write(json.dumps(scored_paper(f'id-{day}', day)) + '\n')
+
+    assert export_corpus(str(tmp_path / 'corpus'), str(tmp_path / 'dataset')) == 2
+    table = read_table(tmp_path / 'dataset' / 'papers')
+    assert table.column('id').to_pylist() == ['id-2024-01-15', 'id-2024-01-16']
+    assert [str(day) for day in table.column('date').to_pylist()] == ['2024-01-15', '2024-01-16']
+    assert table.column('selected').to_pylist() == [None, None]
@@ -1,8 +1,17 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
 import pytest
 
-from paperweight.analyzer import get_abstracts, summarize_paper
+from paperweight.analyzer import (
+    LLMClientPool,
+    create_client_pool,
+    get_abstracts,
+    summarize_paper,
+    summarize_papers,
+)
+from paperweight.resilience import get_circuit_breaker
 
 
 @pytest.mark.parametrize("llm_provider, api_key, expected_result", [
@@ -13,7 +22,7 @@ from paperweight.analyzer import get_abstracts, summarize_paper
 def test_summarize_paper(llm_provider, api_key, expected_result, mocker):
     mock_llm = mocker.Mock()
     mock_llm.generate_response.return_value = "This is a summary of the paper."
-    mocker.patch('paperweight.analyzer.LLM.create', return_value=mock_llm)
+    mocker.patch('SimplerLLM.language.llm.LLM.create', return_value=mock_llm)
 
     paper = {
         'title': 'Test Paper',
@@ -61,3 +70,166 @@ def test_summarize_paper_invalid_llm_provider():
         result = summarize_paper(paper, config)
         assert result == paper['abstract']
         mock_logger.warning.assert_called_with("No valid LLM provider or API key available for invalid_provider. Falling back to abstract.")
+
+def test_summarize_papers_preserves_input_order(mocker):
+    def fake_summarize(paper, *args):
+        time.sleep(paper['delay'])
+        return f"Summary of {paper['title']}"
+
+    mocker.patch('paperweight.analyzer.summarize_paper', side_effect=fake_summarize)
+    papers = [{'title': f'Paper {i}', 'delay': 0.05 * (3 - i)} for i in range(4)]
+
+    result = summarize_papers(papers, {'type': 'summary', 'max_concurrent_requests': 4})
+
+    assert result == ['Summary of Paper 0', 'Summary of Paper 1', 'Summary of Paper 2', 'Summary of Paper 3']
+
+def test_get_abstracts_summary_passes_full_config(mocker):
+    mock_summarize = mocker.patch('paperweight.analyzer.summarize_paper', return_value='Summary')
+    analyzer_config = {'type': 'summary', 'llm_provider': 'openai', 'api_key': 'key'}
+
+    get_abstracts([{'title': 'Paper'}], analyzer_config)
+
+    assert mock_summarize.call_args[0][1] == {'analyzer': analyzer_config}
+
+def test_llm_client_pool_generate_applies_rate_limits(mocker):
+    mock_llm = mocker.Mock()
+    mock_llm.generate_response.return_value = "Summary"
+    mocker.patch('SimplerLLM.language.llm.LLM.create', return_value=mock_llm)
+    mocker.patch('paperweight.analyzer.count_tokens', side_effect=[120, 30])
+    request_limiter = mocker.Mock()
+    token_limiter = mocker.Mock()
+    pool = LLMClientPool('openai', 'fake_api_key', max_in_flight=2,
+                         request_limiter=request_limiter, token_limiter=token_limiter)
+
+    assert pool.generate("Prompt") == "Summary"
+    request_limiter.acquire.assert_called_once_with()
+    token_limiter.acquire.assert_called_once_with(120)
+    token_limiter.charge.assert_called_once_with(30)
+
+def test_summarize_papers_uses_summary_cache(mocker, tmp_path):
+    mock_summarize = mocker.patch('paperweight.analyzer.summarize_paper',
+                                  side_effect=lambda paper, *args: f"Summary of {paper['id']}")
+    analyzer_config = {
+        'type': 'summary',
+        'llm_provider': 'openai',
+        'summary_cache': True,
+        'summary_cache_file': str(tmp_path / 'summary_cache.db'),
+    }
+    papers = [{'id': '2401.00001v1', 'abstract': 'A'}, {'id': '2401.00002v1', 'abstract': 'B'}]
+
+    assert summarize_papers(papers, analyzer_config) == ['Summary of 2401.00001v1', 'Summary of 2401.00002v1']
+    assert mock_summarize.call_count == 2
+
+    papers.append({'id': '2401.00003v1', 'abstract': 'C'})
+    assert summarize_papers(papers, analyzer_config) == [
+        'Summary of 2401.00001v1', 'Summary of 2401.00002v1', 'Summary of 2401.00003v1'
+    ]
+    assert mock_summarize.call_count == 3
+
+def test_summarize_papers_does_not_cache_abstract_fallback(mocker, tmp_path):
+    mock_summarize = mocker.patch('paperweight.analyzer.summarize_paper',
+                                  side_effect=lambda paper, *args: paper['abstract'])
+    analyzer_config = {
+        'type': 'summary',
+        'llm_provider': 'openai',
+        'summary_cache': True,
+        'summary_cache_file': str(tmp_path / 'summary_cache.db'),
+    }
+    papers = [{'id': '2401.00001v1', 'abstract': 'A'}]
+
+    summarize_papers(papers, analyzer_config)
+    summarize_papers(papers, analyzer_config)
+
+    assert mock_summarize.call_count == 2
+
+def test_llm_client_pool_reuses_idle_clients(mocker):
+    mock_create = mocker.patch('SimplerLLM.language.llm.LLM.create', side_effect=lambda **kwargs: mocker.Mock())
+    pool = LLMClientPool('openai', 'fake_api_key')
+
+    first = pool.acquire()
+    # A client in use is never handed out twice
+    second = pool.acquire()
+    assert second is not first
+    pool.release(first)
+    pool.release(second)
+
+    # Released clients outlive the threads that used them
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        reused = executor.submit(pool.acquire).result()
+    assert reused in (first, second)
+    assert pool.created == 2
+    assert mock_create.call_count == 2
+
+def test_summarize_papers_reuses_clients_across_calls(mocker):
+    mock_llm = mocker.Mock()
+    mock_llm.generate_response.return_value = "Summary"
+    mock_create = mocker.patch('SimplerLLM.language.llm.LLM.create', return_value=mock_llm)
+    mocker.patch('paperweight.analyzer.count_tokens', return_value=10)
+    mocker.patch('paperweight.analyzer.truncate_to_tokens', side_effect=lambda text, *args: text)
+    papers = [{'title': f'Paper {i}', 'abstract': 'Abstract', 'content': 'Content'} for i in range(4)]
+    analyzer_config = {'type': 'summary', 'llm_provider': 'openai', 'api_key': 'fake_api_key',
+                       'max_concurrent_requests': 2}
+    pool = create_client_pool(analyzer_config)
+
+    for _ in range(3):
+        summarize_papers(papers, analyzer_config, pool)
+
+    # Never more clients than requests in flight, however many runs and executors
+    assert mock_create.call_count <= 2
+    assert pool.created == mock_create.call_count
+
+def test_summarize_papers_shares_client_pool(mocker):
+    mock_llm = mocker.Mock()
+    mock_llm.generate_response.return_value = "Summary"
+    mock_create = mocker.patch('SimplerLLM.language.llm.LLM.create', return_value=mock_llm)
+    mocker.patch('paperweight.analyzer.count_tokens', return_value=10)
+    mocker.patch('paperweight.analyzer.truncate_to_tokens', side_effect=lambda text, *args: text)
+    papers = [{'title': f'Paper {i}', 'abstract': 'Abstract', 'content': 'Content'} for i in range(5)]
+    analyzer_config = {'type': 'summary', 'llm_provider': 'openai', 'api_key': 'fake_api_key',
+                       'max_concurrent_requests': 1}
+
+    assert summarize_papers(papers, analyzer_config) == ["Summary"] * 5
+    assert mock_create.call_count == 1
+
+def test_summarize_paper_truncates_to_token_budget(mocker):
+    mock_pool = mocker.Mock(model_name='gpt-4o-mini')
+    mock_pool.generate.return_value = "Summary"
+    mock_truncate = mocker.patch('paperweight.analyzer.truncate_to_tokens', return_value="Truncated")
+    paper = {
+        'abstract': 'Abstract',
+        'content': '\\documentclass{article}\\usepackage{x}\\begin{document}Body text.\\end{document}',
+    }
+    config = {'analyzer': {'llm_provider': 'openai', 'api_key': 'fake_api_key', 'max_input_tokens': 50}}
+
+    assert summarize_paper(paper, config, mock_pool) == "Summary"
+    mock_truncate.assert_called_once_with("Body text.", 50, 'gpt-4o-mini')
+    assert "Truncated" in mock_pool.generate.call_args[0][0]
+
+def test_summarize_paper_map_reduce(mocker):
+    mock_pool = mocker.Mock()
+    mock_pool.generate.side_effect = lambda prompt: "Final" if "consecutive parts" in prompt else "Partial"
+    mocker.patch('paperweight.analyzer.split_into_token_chunks', return_value=['one', 'two', 'three'])
+    paper = {'abstract': 'Abstract', 'content': 'Long content'}
+    config = {'analyzer': {'llm_provider': 'openai', 'api_key': 'fake_api_key',
+                           'summary_strategy': 'map_reduce', 'max_chunks': 2}}
+
+    assert summarize_paper(paper, config, mock_pool) == "Final"
+    prompts = [call[0][0] for call in mock_pool.generate.call_args_list]
+    assert len(prompts) == 3
+    assert "Partial\n\nPartial" in prompts[-1]
+
+def test_summarize_paper_falls_back_while_llm_circuit_is_open(mocker):
+    mock_llm = mocker.Mock()
+    mock_llm.generate_response.return_value = None
+    mocker.patch('paperweight.analyzer.create_llm_instance', return_value=mock_llm)
+    mocker.patch('paperweight.analyzer.count_tokens', return_value=10)
+    mocker.patch('paperweight.analyzer.truncate_to_tokens', side_effect=lambda text, *args: text)
+    pool = LLMClientPool('openai', 'key')
+    config = {'analyzer': {'llm_provider': 'openai', 'api_key': 'key'}}
+    paper = {'id': '1', 'content': 'text', 'abstract': 'Abstract'}
+
+    threshold = get_circuit_breaker('llm').failure_threshold
+    for _ in range(threshold + 3):
+        assert summarize_paper(paper, config, pool) == 'Abstract'
+    # Once the circuit opens, the provider is not called again this run
+    assert mock_llm.generate_response.call_count == threshold
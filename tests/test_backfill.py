@@ -0,0 +1,115 @@
+import json
+import multiprocessing
+from datetime import date
+
+import pytest
+
+from benchmarks.run import benchmark_config
+from benchmarks.stub_server import ArxivStub
+from paperweight.backfill import (
+    build_shards,
+    load_backfill_state,
+    run_backfill,
+    save_backfill_state,
+    shard_key,
+    write_corpus_shard,
+)
+from paperweight.cli import main as cli_main
+from paperweight.dedup import DEDUP_INDEX_FILE, indexed_paper_ids
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def backfill_config():
+    config = benchmark_config()
+    config['arxiv']['fetch_depth'] = 'metadata'
+    config['backfill'] = {'worker_processes': 2, 'arxiv_requests_per_minute': 0}
+    return config
+
+def read_corpus(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def test_build_shards():
+    shards = build_shards(['cs.CL', 'cs.LG'], date(2024, 1, 1), date(2024, 1, 3))
+    assert [shard_key(shard) for shard in shards] == [
+        'cs.CL/2024-01-01', 'cs.LG/2024-01-01', 'cs.CL/2024-01-02',
+        'cs.LG/2024-01-02', 'cs.CL/2024-01-03', 'cs.LG/2024-01-03',
+    ]
+
+    weeks = build_shards(['cs.CL'], date(2024, 1, 1), date(2024, 1, 10), shard_days=7)
+    assert [shard_key(shard) for shard in weeks] == ['cs.CL/2024-01-01_2024-01-07', 'cs.CL/2024-01-08_2024-01-10']
+
+def test_backfill_state_round_trip(tmp_path):
+    state_file = str(tmp_path / 'state.json')
+    assert load_backfill_state(state_file) == set()
+
+    save_backfill_state({'cs.CL/2024-01-02', 'cs.CL/2024-01-01'}, state_file)
+
+    assert load_backfill_state(state_file) == {'cs.CL/2024-01-01', 'cs.CL/2024-01-02'}
+
+def test_write_corpus_shard_skips_papers_already_written(tmp_path):
+    shard = ('cs.CL', date(2024, 1, 1), date(2024, 1, 1))
+    write_corpus_shard(str(tmp_path), shard, [{'id': '1'}, {'id': '2'}])
+
+    path = write_corpus_shard(str(tmp_path), shard, [{'id': '2'}, {'id': '3'}])
+
+    assert path == str(tmp_path / 'cs.CL' / '2024-01-01.jsonl')
+    assert [paper['id'] for paper in read_corpus(path)] == ['1', '2', '3']
+
+def test_run_backfill_skips_completed_shards(mocker):
+    save_backfill_state({'cs.CL/2024-01-01', 'cs.CL/2024-01-02'})
+    mock_pool = mocker.patch('paperweight.backfill.ProcessPoolExecutor')
+
+    totals = run_backfill(backfill_config(), date(2024, 1, 1), date(2024, 1, 2))
+
+    assert totals == {'shards': 0, 'failed_shards': 0, 'papers': 0}
+    mock_pool.assert_not_called()
+
+def test_backfill_command(mocker):
+    config = backfill_config()
+    mocker.patch('paperweight.cli.load_config', return_value=config)
+    mocker.patch('paperweight.cli.setup_logging')
+    mock_backfill = mocker.patch('paperweight.backfill.run_backfill')
+
+    cli_main(['backfill', '--from', '2024-01-01', '--to', '2024-01-31', '--workers', '8'])
+    mock_backfill.assert_called_once_with(config, date(2024, 1, 1), date(2024, 1, 31), 8)
+
+    mock_backfill.reset_mock()
+    cli_main(['backfill', '--from', '2024-02-01', '--to', '2024-01-31'])
+    mock_backfill.assert_not_called()
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='workers must inherit the stub server URLs')
+def test_run_backfill_writes_corpus_and_index(work_dir):
+    config = backfill_config()
+    today = date.today()
+    with ArxivStub(listing_size=6):
+        totals = run_backfill(config, today, today)
+        # A rerun finds every shard complete
+        assert run_backfill(config, today, today)['shards'] == 0
+
+    # The stub repeats three abstracts, so the index keeps the first of each
+    assert totals == {'shards': 1, 'failed_shards': 0, 'papers': 3}
+    corpus = read_corpus(work_dir / 'corpus' / 'cs.CL' / f'{today}.jsonl')
+    assert len(corpus) == 3
+    assert all('relevance_score' in paper and 'content' not in paper for paper in corpus)
+    paper_ids = [paper['id'] for paper in corpus]
+    assert indexed_paper_ids(DEDUP_INDEX_FILE, paper_ids) == set(paper_ids)
+    assert load_backfill_state() == {f'cs.CL/{today}'}
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork',
+                    reason='workers must inherit the stub server URLs')
+def test_run_backfill_exports_to_dataset(work_dir):
+    ds = pytest.importorskip('pyarrow.dataset')
+    config = backfill_config()
+    config['analytics'] = {'columnar_export': True, 'dataset_dir': 'analytics'}
+    with ArxivStub(listing_size=3):
+        run_backfill(config, date.today(), date.today())
+
+    table = ds.dataset(str(work_dir / 'analytics' / 'papers'), partitioning='hive').to_table()
+    corpus = read_corpus(work_dir / 'corpus' / 'cs.CL' / f'{date.today()}.jsonl')
+    assert sorted(table.column('id').to_pylist()) == sorted(paper['id'] for paper in corpus)
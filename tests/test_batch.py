@@ -0,0 +1,176 @@
+import json
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from paperweight.batch import (
+    BatchClient,
+    collect_summary_batches,
+    is_batch_mode,
+    load_pending_batches,
+    parse_batch_results,
+    submit_summary_batch,
+    wait_for_batches,
+)
+
+
+class FakeBatchAPI(BaseHTTPRequestHandler):
+    # Implements just enough of the Batch API: uploads are parsed for JSONL
+    # request lines, and a batch completes after `polls_until_complete` GETs.
+    files: dict = {}
+    batches: dict = {}
+    polls_until_complete = 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        if self.path == '/v1/files':
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = [line for line in body.splitlines() if line.startswith('{"custom_id"')]
+            self._send_json({'id': file_id})
+        elif self.path == '/v1/batches':
+            request = json.loads(body)
+            batch_id = f"batch-{len(self.batches)}"
+            self.batches[batch_id] = {'input_file_id': request['input_file_id'], 'polls': 0}
+            self._send_json({'id': batch_id, 'status': 'validating'})
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+    def do_GET(self):
+        if self.path.startswith('/v1/batches/'):
+            batch_id = self.path.rsplit('/', 1)[-1]
+            batch = self.batches[batch_id]
+            batch['polls'] += 1
+            if batch['polls'] < self.polls_until_complete:
+                self._send_json({'id': batch_id, 'status': 'in_progress'})
+                return
+            output_id = f"output-{batch_id}"
+            self.files[output_id] = [
+                json.dumps({
+                    'custom_id': json.loads(line)['custom_id'],
+                    'response': {'status_code': 200, 'body': {'choices': [
+                        {'message': {'content': f"Summary of {json.loads(line)['custom_id']}"}}
+                    ]}},
+                    'error': None,
+                })
+                for line in self.files[batch['input_file_id']]
+            ]
+            self._send_json({'id': batch_id, 'status': 'completed', 'output_file_id': output_id})
+        elif self.path.startswith('/v1/files/') and self.path.endswith('/content'):
+            file_id = self.path.split('/')[3]
+            body = "\n".join(self.files[file_id]).encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json({'error': 'not found'}, status=404)
+
+
+@pytest.fixture
+def fake_batch_api():
+    FakeBatchAPI.files = {}
+    FakeBatchAPI.batches = {}
+    FakeBatchAPI.polls_until_complete = 1
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBatchAPI)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def analyzer_config(fake_batch_api):
+    return {
+        'type': 'summary',
+        'llm_provider': 'openai',
+        'api_key': 'fake_api_key',
+        'summary_mode': 'batch',
+        'batch_api_base': fake_batch_api,
+    }
+
+@pytest.fixture
+def papers():
+    return [
+        {'id': f'2401.0000{i}v1', 'title': f'Paper {i}', 'abstract': f'Abstract {i}', 'content': f'Content {i}',
+         'date': date(2024, 1, 15), 'link': f'http://arxiv.org/abs/2401.0000{i}v1', 'relevance_score': 10.0}
+        for i in range(3)
+    ]
+
+@pytest.fixture(autouse=True)
+def no_tokenizer(mocker):
+    mocker.patch('paperweight.batch.truncate_to_tokens_batch', side_effect=lambda texts, *args: list(texts))
+
+def test_is_batch_mode(analyzer_config):
+    assert is_batch_mode(analyzer_config)
+    assert not is_batch_mode({**analyzer_config, 'summary_mode': 'interactive'})
+    assert not is_batch_mode({**analyzer_config, 'llm_provider': 'gemini'})
+
+def test_parse_batch_results_skips_failures():
+    output = "\n".join([
+        json.dumps({'custom_id': 'paper-0', 'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': 'Ok'}}]}}}),
+        json.dumps({'custom_id': 'paper-1', 'response': {'status_code': 500, 'body': {}}}),
+        json.dumps({'custom_id': 'paper-2', 'response': None, 'error': {'message': 'expired'}}),
+    ])
+    assert parse_batch_results(output) == {'paper-0': 'Ok'}
+
+def test_submit_and_collect_across_runs(analyzer_config, papers, tmp_path):
+    state_file = str(tmp_path / 'pending_batches.json')
+    FakeBatchAPI.polls_until_complete = 2
+
+    batch_id = submit_summary_batch(papers, analyzer_config, state_file=state_file)
+    assert batch_id == 'batch-0'
+    assert load_pending_batches(state_file)[0]['batch_id'] == 'batch-0'
+    assert 'content' not in load_pending_batches(state_file)[0]['papers'][0]
+
+    # First collection: batch still in progress, state is kept
+    assert collect_summary_batches(analyzer_config, state_file=state_file) == []
+    assert len(load_pending_batches(state_file)) == 1
+
+    # A later run collects the results and clears the state
+    completed = collect_summary_batches(analyzer_config, state_file=state_file)
+    assert [paper['summary'] for paper in completed[0]] == ['Summary of paper-0', 'Summary of paper-1', 'Summary of paper-2']
+    assert completed[0][0]['date'] == date(2024, 1, 15)
+    assert load_pending_batches(state_file) == []
+
+def test_wait_for_batches_polls_until_complete(analyzer_config, papers, tmp_path, mocker):
+    mock_sleep = mocker.patch('paperweight.batch.time.sleep')
+    state_file = str(tmp_path / 'pending_batches.json')
+    FakeBatchAPI.polls_until_complete = 3
+    analyzer_config.update({'batch_wait_timeout': 3600, 'batch_poll_interval': 5})
+
+    submit_summary_batch(papers, analyzer_config, state_file=state_file)
+    completed = wait_for_batches(analyzer_config, state_file=state_file)
+
+    assert len(completed[0]) == 3
+    assert mock_sleep.call_count == 2
+
+def test_submit_uses_summary_cache(analyzer_config, papers, tmp_path):
+    state_file = str(tmp_path / 'pending_batches.json')
+    analyzer_config.update({'summary_cache': True, 'summary_cache_file': str(tmp_path / 'cache.db')})
+
+    submit_summary_batch(papers, analyzer_config, state_file=state_file)
+    collect_summary_batches(analyzer_config, state_file=state_file)
+
+    resubmitted = [dict(paper, content='Content') for paper in papers]
+    for paper in resubmitted:
+        paper.pop('summary', None)
+    assert submit_summary_batch(resubmitted, analyzer_config, state_file=state_file) is None
+    assert resubmitted[1]['summary'] == 'Summary of paper-1'
+
+def test_batch_client_sends_jsonl(fake_batch_api):
+    client = BatchClient('fake_api_key', base_url=fake_batch_api)
+    file_id = client.upload_file(b'{"custom_id": "paper-0"}\n{"custom_id": "paper-1"}')
+    assert FakeBatchAPI.files[file_id] == ['{"custom_id": "paper-0"}', '{"custom_id": "paper-1"}']
@@ -0,0 +1,43 @@
+import json
+from datetime import date, timedelta
+
+from benchmarks.run import compare, run_benchmarks
+from benchmarks.startup import CHECK_EXCLUDED_MODULES, heavy_modules_loaded
+from benchmarks.stub_server import ArxivStub, build_listing
+from paperweight import scraper
+from paperweight.scraper import fetch_arxiv_papers, fetch_paper_content
+
+
+def test_build_listing_expands_recorded_feed():
+    papers_xml = build_listing(5).decode()
+    assert papers_xml.count('<entry>') == 5
+    assert 'http://arxiv.org/abs/2410.10004v1' in papers_xml
+
+def test_stub_serves_listing_and_content():
+    original_url = scraper.ARXIV_API_URL
+    with ArxivStub(listing_size=7, pdf_only_every=2):
+        papers = fetch_arxiv_papers('cs.CL', date.today() - timedelta(days=1))
+        assert len(papers) == 7
+        assert fetch_paper_content('2410.10000v1')[1] == 'source'
+        assert fetch_paper_content('2410.10001v1')[1] == 'pdf'
+    assert scraper.ARXIV_API_URL == original_url
+
+def test_run_benchmarks_small(tmp_path):
+    report = run_benchmarks(scoring_sizes=[10], listing_sizes=[10], download_papers=2,
+                            pipeline_papers=3, repeats=1)
+
+    results = report['results']
+    assert set(results) == {'startup_import', 'startup_noop_run', 'startup_check_run', 'listing_parse[10]', 'download[2]', 'extract_source', 'extract_pdf',
+                            'scoring[10]', 'normalize[10]', 'notify[10]', 'end_to_end[3]',
+                            'end_to_end_async[3]', 'end_to_end_metadata[3]'}
+    assert results['scoring[10]']['items'] == 10
+    assert 'fetch_paper_content' in results['end_to_end[3]']['stages']
+    json.dumps(report)
+
+    lines = compare(report, {'results': {'scoring[10]': results['scoring[10]']}})
+    assert any('1.00x vs baseline' in line for line in lines)
+    assert any('(new)' in line for line in lines)
+
+def test_startup_does_not_import_heavy_dependencies():
+    assert heavy_modules_loaded('paperweight.main') == []
+    assert heavy_modules_loaded('paperweight.cli', CHECK_EXCLUDED_MODULES) == []
@@ -0,0 +1,68 @@
+import pytest
+
+from paperweight.cache import ContentFormatCache, SummaryCache, hash_prompt_template
+
+KEY = ('2401.12345v1', 'openai', 'gpt-4o-mini', hash_prompt_template('template {content}'))
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / 'summary_cache.db')
+
+def test_hash_prompt_template_changes_with_template():
+    assert hash_prompt_template('a {content}') != hash_prompt_template('b {content}')
+    assert hash_prompt_template('a {content}') == hash_prompt_template('a {content}')
+
+def test_summary_cache_round_trip(cache_path):
+    with SummaryCache(path=cache_path) as cache:
+        assert cache.get(KEY) is None
+        cache.put(KEY, 'A summary.')
+
+    with SummaryCache(path=cache_path) as cache:
+        assert cache.get(KEY) == 'A summary.'
+        assert cache.get(('2401.12345v2',) + KEY[1:]) is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+def test_summary_cache_ttl_expiry(cache_path, mocker):
+    mock_time = mocker.patch('paperweight.cache.time.time', return_value=1_000_000)
+    with SummaryCache(path=cache_path, ttl_days=1) as cache:
+        cache.put(KEY, 'A summary.')
+        mock_time.return_value += 2 * 86400
+        assert cache.get(KEY) is None
+
+def test_summary_cache_evicts_least_recently_used(cache_path, mocker):
+    mock_time = mocker.patch('paperweight.cache.time.time', return_value=1_000_000)
+    with SummaryCache(path=cache_path, max_entries=2) as cache:
+        for i in range(3):
+            mock_time.return_value += 1
+            cache.put((f'paper{i}',) + KEY[1:], f'Summary {i}')
+        mock_time.return_value += 1
+        cache.get(('paper0',) + KEY[1:])
+        cache.evict()
+
+        assert cache.get(('paper0',) + KEY[1:]) == 'Summary 0'
+        assert cache.get(('paper1',) + KEY[1:]) is None
+        assert cache.get(('paper2',) + KEY[1:]) == 'Summary 2'
+
+def test_content_format_cache_round_trip(tmp_path):
+    path = str(tmp_path / 'content_formats.db')
+    with ContentFormatCache(path=path) as cache:
+        assert cache.get('2401.12345v1') is None
+        cache.put('2401.12345v1', 'pdf', 2048)
+        cache.put('2401.67890v1', 'missing')
+
+    with ContentFormatCache(path=path) as cache:
+        assert cache.get('2401.12345v1') == ('pdf', 2048)
+        assert cache.get('2401.67890v1') == ('missing', None)
+
+def test_content_format_cache_keeps_most_recent_entries(tmp_path, mocker):
+    mock_time = mocker.patch('paperweight.cache.time.time', return_value=1_000_000)
+    path = str(tmp_path / 'content_formats.db')
+    with ContentFormatCache(path=path, max_entries=2) as cache:
+        for i in range(3):
+            mock_time.return_value += 1
+            cache.put(f'paper{i}', 'source', i)
+
+    with ContentFormatCache(path=path) as cache:
+        assert cache.get('paper0') is None
+        assert cache.get('paper2') == ('source', 2)
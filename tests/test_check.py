@@ -0,0 +1,130 @@
+import os
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from paperweight.check import (
+    check_for_new_papers,
+    has_pending_batches,
+    load_probe_state,
+    probe_newest_entry,
+    record_processed_listing,
+    save_probe_state,
+)
+from paperweight.cli import main as cli_main
+from paperweight.utils import save_last_processed_date
+
+LISTING_PATH = os.path.join(os.path.dirname(__file__), 'test_data', 'arxiv_listing.xml')
+NEWEST = {'id': 'http://arxiv.org/abs/2410.02741v1', 'published': '2024-10-03T17:59:58Z'}
+
+
+class ListingHandler(BaseHTTPRequestHandler):
+    queries: list = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.queries.append(parse_qs(urlparse(self.path).query))
+        with open(LISTING_PATH, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+@pytest.fixture
+def listing_server():
+    ListingHandler.queries = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ListingHandler)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.01}, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api/query"
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+def test_probe_newest_entry_uses_single_request(listing_server):
+    assert probe_newest_entry(['cs.CL', 'cs.LG'], listing_server) == NEWEST
+    assert len(ListingHandler.queries) == 1
+    assert ListingHandler.queries[0]['search_query'] == ['cat:cs.CL OR cat:cs.LG']
+    assert ListingHandler.queries[0]['max_results'] == ['1']
+
+def test_first_run_has_new_papers(mocker):
+    mock_probe = mocker.patch('paperweight.check.probe_newest_entry')
+    assert check_for_new_papers({'categories': ['cs.CL']}) == (True, None)
+    mock_probe.assert_not_called()
+
+def test_already_processed_today_skips_probe(mocker):
+    save_last_processed_date(date.today())
+    mock_probe = mocker.patch('paperweight.check.probe_newest_entry')
+    assert check_for_new_papers({'categories': ['cs.CL']}) == (False, None)
+    mock_probe.assert_not_called()
+
+def test_unchanged_listing_means_nothing_new(listing_server):
+    save_last_processed_date(date.today() - timedelta(days=1))
+    assert check_for_new_papers({'categories': ['cs.CL']}, listing_server) == (True, NEWEST)
+
+    save_probe_state(NEWEST)
+    assert check_for_new_papers({'categories': ['cs.CL']}, listing_server) == (False, NEWEST)
+
+def test_failed_probe_runs_pipeline(mocker):
+    save_last_processed_date(date.today() - timedelta(days=1))
+    mocker.patch('paperweight.check.probe_newest_entry', side_effect=OSError('unreachable'))
+    assert check_for_new_papers({'categories': ['cs.CL']}) == (True, None)
+
+def test_listing_recorded_only_after_successful_run():
+    save_last_processed_date(date.today() - timedelta(days=1))
+    record_processed_listing(NEWEST)
+    assert load_probe_state() == {}
+
+    save_last_processed_date(date.today())
+    record_processed_listing(NEWEST)
+    assert load_probe_state() == NEWEST
+
+def test_check_command_exits_without_running_pipeline(mocker):
+    mocker.patch('paperweight.cli.load_config', return_value={'logging': {}, 'arxiv': {'categories': ['cs.CL']}})
+    mocker.patch('paperweight.cli.setup_logging')
+    mocker.patch('paperweight.check.check_for_new_papers', return_value=(False, NEWEST))
+    mock_run = mocker.patch('paperweight.main.run_pipeline')
+
+    cli_main(['check'])
+    mock_run.assert_not_called()
+
+def test_has_pending_batches(work_dir):
+    assert not has_pending_batches()
+    (work_dir / 'pending_batches.json').write_text('{"batches": [{"batch_id": "batch-0", "papers": []}]}')
+    assert has_pending_batches()
+
+def test_check_command_collects_pending_batches_without_new_listings(work_dir, mocker):
+    (work_dir / 'pending_batches.json').write_text('{"batches": [{"batch_id": "batch-0", "papers": []}]}')
+    mocker.patch('paperweight.cli.load_config', return_value={'logging': {}, 'arxiv': {'categories': ['cs.CL']}})
+    mocker.patch('paperweight.cli.setup_logging')
+    mocker.patch('paperweight.check.check_for_new_papers', return_value=(False, NEWEST))
+    mock_run = mocker.patch('paperweight.main.run_pipeline')
+
+    cli_main(['check'])
+    mock_run.assert_called_once_with(False, None, 'profile', deliver_only=True)
+    assert load_probe_state() == {}
+
+def test_check_command_runs_pipeline_and_records_listing(mocker):
+    mocker.patch('paperweight.cli.load_config', return_value={'logging': {}, 'arxiv': {'categories': ['cs.CL']}})
+    mocker.patch('paperweight.cli.setup_logging')
+    mocker.patch('paperweight.check.check_for_new_papers', return_value=(True, NEWEST))
+    mock_run = mocker.patch('paperweight.main.run_pipeline',
+                            side_effect=lambda *args: save_last_processed_date(date.today()))
+
+    cli_main(['check'])
+    mock_run.assert_called_once_with(False, None, 'profile')
+    assert load_probe_state() == NEWEST
+
+def test_default_command_runs_pipeline(mocker):
+    mock_run = mocker.patch('paperweight.main.run_pipeline')
+    cli_main(['--force-refresh', '--profile', 'cpu'])
+    mock_run.assert_called_once_with(True, 'cpu', 'profile')
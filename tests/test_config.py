@@ -156,3 +156,158 @@ def test_invalid_config_file():
             'notifier': {}
         }
         check_config(invalid_config)
+
+@pytest.mark.parametrize("analyzer, message", [
+    ({'type': 'abstract', 'max_concurrent_requests': 0}, "'max_concurrent_requests' in 'analyzer' section must be a positive integer"),
+    ({'type': 'abstract', 'requests_per_minute': -1}, "'requests_per_minute' in 'analyzer' section must be a non-negative number"),
+    ({'type': 'abstract', 'summary_cache_ttl_days': 'never'}, "'summary_cache_ttl_days' in 'analyzer' section must be a non-negative number"),
+])
+def test_invalid_analyzer_limits(analyzer, message):
+    config = {
+        'arxiv': {'categories': ['cs.AI']},
+        'processor': {},
+        'analyzer': analyzer,
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'}
+    }
+    with pytest.raises(ValueError, match=message):
+        check_config(config)
+
+def test_invalid_dedup_threshold():
+    config = {
+        'arxiv': {'categories': ['cs.AI'], 'dedup_threshold': 1.5},
+        'processor': {},
+        'analyzer': {'type': 'abstract'},
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'}
+    }
+    with pytest.raises(ValueError, match="'dedup_threshold' in 'arxiv' section must be between 0 and 1"):
+        check_config(config)
+
+def test_metadata_fetch_depth_requires_abstract_analyzer():
+    config = {
+        'arxiv': {'categories': ['cs.AI'], 'fetch_depth': 'metadata'},
+        'processor': {},
+        'analyzer': {'type': 'summary', 'llm_provider': 'openai'},
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'}
+    }
+    with pytest.raises(ValueError, match="cannot be used with the 'summary' analyzer"):
+        check_config(config)
+
+    config['arxiv']['fetch_depth'] = 'abstracts'
+    with pytest.raises(ValueError, match="Invalid fetch depth: 'abstracts'"):
+        check_config(config)
+
+def test_invalid_max_papers():
+    config = {
+        'arxiv': {'categories': ['cs.AI']},
+        'processor': {'max_papers': -5},
+        'analyzer': {'type': 'abstract'},
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'}
+    }
+    with pytest.raises(ValueError, match="'max_papers' in 'processor' section must be a non-negative integer"):
+        check_config(config)
+
+    config['processor'] = {}
+    config['profiles'] = [{'name': 'nlp', 'processor': {'max_papers': 'ten'}}]
+    with pytest.raises(ValueError, match="'max_papers' in profile 'nlp' must be a non-negative integer"):
+        check_config(config)
+
+def test_invalid_max_source_bytes():
+    config = {
+        'arxiv': {'categories': ['cs.AI'], 'max_source_bytes': -1},
+        'processor': {},
+        'analyzer': {'type': 'abstract'},
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'}
+    }
+    with pytest.raises(ValueError, match="'max_source_bytes' in 'arxiv' section must be a non-negative number"):
+        check_config(config)
+
+def test_invalid_serve_interval():
+    config = {
+        'arxiv': {'categories': ['cs.AI']},
+        'processor': {},
+        'analyzer': {'type': 'abstract'},
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'},
+        'serve': {'run_interval_minutes': 0}
+    }
+    with pytest.raises(ValueError, match="'run_interval_minutes' in 'serve' section must be a positive number"):
+        check_config(config)
+
+@pytest.mark.parametrize("profiles, message", [
+    ({'name': 'nlp'}, "'profiles' must be a list"),
+    ([{'categories': ['cs.CL']}], "Each profile must have a 'name'"),
+    ([{'name': 'nlp'}, {'name': 'nlp'}], "Duplicate profile name: 'nlp'"),
+    ([{'name': 'nlp', 'categories': ['invalid']}], "Invalid arXiv category in profile 'nlp': invalid"),
+    ([{'name': 'nlp', 'processor': ['keywords']}], "'processor' in profile 'nlp' must be a mapping"),
+    ([{'name': 'nlp', 'processor': {'title_keyword_weight': 'high'}}],
+     "'title_keyword_weight' in profile 'nlp' must be a number"),
+    ([{'name': 'nlp', 'processor': {'keywords': 'transformers'}}], "'keywords' in profile 'nlp' must be a list of strings"),
+    ([{'name': 'nlp', 'notifier': {'email': None}}], "'email' in profile 'nlp' notifier must be a mapping"),
+    ([{'name': 'nlp', 'notifier': {'email': {'to': ''}}}],
+     "Invalid notifier in profile 'nlp': Email field 'to' must not be empty"),
+    ([{'name': 'nlp', 'notifier': {'email': {'smtp_port': 'tls'}}}],
+     "Invalid notifier in profile 'nlp': Invalid SMTP port: 'tls'"),
+])
+def test_invalid_profiles(profiles, message):
+    config = {
+        'arxiv': {'categories': ['cs.AI']},
+        'processor': {},
+        'analyzer': {'type': 'abstract'},
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'},
+        'profiles': profiles
+    }
+    with pytest.raises(ValueError, match=message):
+        check_config(config)
+
+@pytest.mark.parametrize("pipeline, message", [
+    ({'engine': 'threads'}, "Invalid pipeline engine: 'threads'"),
+    ({'engine': 'async', 'queue_size': 0}, "'queue_size' in 'pipeline' section must be a positive integer"),
+    ({'download_workers': 2.5}, "'download_workers' in 'pipeline' section must be a positive integer"),
+])
+def test_invalid_pipeline_section(pipeline, message):
+    config = {
+        'arxiv': {'categories': ['cs.AI']},
+        'processor': {},
+        'analyzer': {'type': 'abstract'},
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'},
+        'pipeline': pipeline
+    }
+    with pytest.raises(ValueError, match=message):
+        check_config(config)
+
+@pytest.mark.parametrize("backfill, message", [
+    ({'worker_processes': 0}, "'worker_processes' in 'backfill' section must be a positive integer"),
+    ({'shard_days': 1.5}, "'shard_days' in 'backfill' section must be a positive integer"),
+    ({'arxiv_requests_per_minute': -1}, "'arxiv_requests_per_minute' in 'backfill' section must be a non-negative number"),
+])
+def test_invalid_backfill_section(backfill, message):
+    config = {
+        'arxiv': {'categories': ['cs.AI']},
+        'processor': {},
+        'analyzer': {'type': 'abstract'},
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'},
+        'backfill': backfill
+    }
+    with pytest.raises(ValueError, match=message):
+        check_config(config)
+
+def test_columnar_export_requires_pyarrow(mocker):
+    config = {
+        'arxiv': {'categories': ['cs.AI']},
+        'processor': {},
+        'analyzer': {'type': 'abstract'},
+        'notifier': {'email': {'to': 'test@example.com', 'from': 'sender@example.com', 'password': 'pass', 'smtp_server': 'smtp.example.com', 'smtp_port': 587}},
+        'logging': {'level': 'INFO'},
+        'analytics': {'columnar_export': True}
+    }
+    mocker.patch('paperweight.utils.importlib.util.find_spec', return_value=None)
+    with pytest.raises(ValueError, match=r"pip install 'paperweight\[analytics\]'"):
+        check_config(config)
@@ -0,0 +1,46 @@
+import os
+
+import yaml
+
+from benchmarks.corpus import generate_corpus, iter_synthetic_papers
+from paperweight.notifier import compose_notification
+from paperweight.processor import count_keywords, process_papers
+
+
+def test_corpus_is_reproducible_from_seed():
+    assert generate_corpus(5, seed=42, body_words=200) == generate_corpus(5, seed=42, body_words=200)
+    assert generate_corpus(5, seed=42, body_words=200) != generate_corpus(5, seed=43, body_words=200)
+
+def test_papers_have_pipeline_fields():
+    paper = next(iter_synthetic_papers(1, body_words=500))
+    assert set(paper) == {'id', 'title', 'abstract', 'content', 'content_type', 'date', 'link'}
+    assert paper['content'].startswith('\\documentclass')
+    assert '\\section{' in paper['content']
+    assert paper['link'].endswith(paper['id'])
+
+def test_body_size_is_configurable():
+    small = generate_corpus(3, body_words=200)
+    large = generate_corpus(3, body_words=2000)
+    assert all(len(big['content']) > 5 * len(little['content']) for big, little in zip(large, small))
+
+def test_keyword_density_controls_matches():
+    keywords = ['deep learning']
+    sparse = generate_corpus(20, keywords=keywords, keyword_density=0.001, body_words=1000)
+    dense = generate_corpus(20, keywords=keywords, keyword_density=0.05, body_words=1000)
+    assert sum(count_keywords(paper['content'], keywords) for paper in dense) > \
+        3 * sum(count_keywords(paper['content'], keywords) for paper in sparse)
+
+def test_corpus_drives_processor_and_notifier():
+    with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config-base.yaml')) as f:
+        config = yaml.safe_load(f)
+    papers = generate_corpus(2000, body_words=600, abstract_words=60)
+
+    processed = process_papers(papers, {**config['processor'], 'min_score': 0})
+    scores = {round(paper['relevance_score'], 2) for paper in processed}
+    assert len(processed) == 2000
+    assert len(scores) > 50
+
+    for paper in processed:
+        paper['summary'] = paper['abstract']
+    _, body = compose_notification(processed, config['notifier'])
+    assert body.count('Title: ') == 2000
@@ -0,0 +1,91 @@
+import pytest
+
+from paperweight.dedup import (
+    PaperIndex,
+    estimate_similarity,
+    filter_duplicate_papers,
+    filter_seen_papers,
+    indexed_paper_ids,
+    minhash_signature,
+    split_arxiv_id,
+)
+
+BASE_TEXT = " ".join(f"word{i} token{i % 7} value{i % 13}" for i in range(400))
+
+
+@pytest.fixture
+def paper_index(tmp_path):
+    index = PaperIndex(path=str(tmp_path / 'index.db'), threshold=0.8)
+    yield index
+    index.close()
+
+def test_split_arxiv_id():
+    assert split_arxiv_id('2401.12345v2') == ('2401.12345', 2)
+    assert split_arxiv_id('2401.12345') == ('2401.12345', None)
+
+def test_minhash_signature_similarity():
+    signature = minhash_signature(BASE_TEXT)
+    near_duplicate = minhash_signature(BASE_TEXT + " an extra closing sentence")
+    unrelated = minhash_signature(" ".join(f"other{i} text{i}" for i in range(400)))
+
+    assert len(signature) == 128
+    assert estimate_similarity(signature, signature) == 1.0
+    assert estimate_similarity(signature, near_duplicate) > 0.9
+    assert estimate_similarity(signature, unrelated) < 0.2
+
+def test_minhash_signature_empty_text():
+    assert minhash_signature('') == []
+
+def test_filter_duplicate_papers_skips_unchanged_version(paper_index):
+    papers = [
+        {'id': '2401.12345v1', 'content': BASE_TEXT},
+        {'id': '2401.12345v2', 'content': BASE_TEXT + " typo fixed"},
+        {'id': '2401.99999v1', 'content': " ".join(f"other{i} text{i}" for i in range(400))},
+    ]
+
+    result = filter_duplicate_papers(papers, paper_index)
+
+    assert [paper['id'] for paper in result] == ['2401.12345v1', '2401.99999v1']
+    assert paper_index.contains('2401.12345v2')
+
+def test_filter_duplicate_papers_flags_revised_version(paper_index):
+    filter_duplicate_papers([{'id': '2401.12345v1', 'content': BASE_TEXT}], paper_index)
+
+    revised = {'id': '2401.12345v2', 'content': " ".join(f"rewritten{i} body{i}" for i in range(400))}
+    result = filter_duplicate_papers([revised], paper_index)
+
+    assert result == [revised]
+    assert revised['previous_versions'] == ['2401.12345v1']
+
+def test_filter_duplicate_papers_keeps_paper_seen_before(paper_index):
+    papers = [{'id': '2401.12345v1', 'content': BASE_TEXT}]
+    filter_duplicate_papers(papers, paper_index)
+
+    assert filter_duplicate_papers(papers, paper_index) == papers
+
+def test_filter_seen_papers(paper_index):
+    paper_index.add('2401.12345v1', minhash_signature(BASE_TEXT))
+    papers = [
+        {'link': 'http://arxiv.org/abs/2401.12345v1'},
+        {'link': 'http://arxiv.org/abs/2401.67890v1'},
+    ]
+
+    assert filter_seen_papers(papers, paper_index) == [papers[1]]
+
+def test_paper_index_persists(tmp_path):
+    path = str(tmp_path / 'index.db')
+    with PaperIndex(path=path) as index:
+        index.add('2401.12345v1', minhash_signature(BASE_TEXT))
+
+    with PaperIndex(path=path) as index:
+        assert index.contains('2401.12345v1')
+        assert index.query(minhash_signature(BASE_TEXT))[0][0] == '2401.12345v1'
+
+def test_indexed_paper_ids(tmp_path, paper_index):
+    path = str(tmp_path / 'index.db')
+    assert indexed_paper_ids(str(tmp_path / 'missing.db'), ['2401.00001v1']) == set()
+
+    paper_index.add('2401.00001v1', minhash_signature(BASE_TEXT))
+    paper_index.conn.commit()
+
+    assert indexed_paper_ids(path, ['2401.00001v1', '2401.00002v1']) == {'2401.00001v1'}
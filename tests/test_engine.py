@@ -0,0 +1,250 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from benchmarks.run import benchmark_config
+from benchmarks.stub_server import ArxivStub
+from paperweight import analytics, batch, engine
+from paperweight.batch import load_pending_batches
+from paperweight.engine import AsyncPipeline, run_async_pipeline
+from paperweight.main import process_stage
+from paperweight.scraper import get_recent_papers
+from paperweight.utils import get_last_processed_date, save_last_processed_date
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    # Downloads are paced at four per second; not what these tests measure
+    monkeypatch.setattr('paperweight.engine.DOWNLOADS_PER_MINUTE', 0)
+    return tmp_path
+
+def engine_config(**pipeline):
+    config = benchmark_config()
+    config['processor']['min_score'] = 0
+    config['pipeline'] = {'engine': 'async', **pipeline}
+    return config
+
+def ranked_ids(selections):
+    return [[(paper['id'], round(paper['relevance_score'], 6)) for paper in papers] for _, papers in selections]
+
+def test_async_pipeline_matches_sequential(mocker):
+    mocker.patch('paperweight.scraper.time.sleep')
+    config = engine_config(queue_size=2)
+    with ArxivStub(listing_size=12):
+        sequential = process_stage(get_recent_papers(force_refresh=True, config=config), config)
+        asynchronous = run_async_pipeline(config, force_refresh=True)
+
+    assert ranked_ids(asynchronous) == ranked_ids(sequential)
+    assert all(paper['summary'] == paper['abstract'] for _, papers in asynchronous for paper in papers)
+    assert get_last_processed_date() == date.today()
+
+def test_max_papers_matches_sequential(mocker):
+    mocker.patch('paperweight.scraper.time.sleep')
+    config = engine_config()
+    config['processor']['max_papers'] = 3
+    with ArxivStub(listing_size=12):
+        sequential = process_stage(get_recent_papers(force_refresh=True, config=config), config)
+        asynchronous = run_async_pipeline(config, force_refresh=True)
+
+    assert len(sequential[0][1]) == 3
+    assert ranked_ids(asynchronous) == ranked_ids(sequential)
+
+def test_force_refresh_reprocesses_indexed_papers(mocker):
+    mocker.patch('paperweight.scraper.time.sleep')
+    config = engine_config()
+    config['arxiv']['dedup'] = True
+    # The stub serves one full text for every paper; the three abstracts differ
+    config['arxiv']['fetch_depth'] = 'metadata'
+    with ArxivStub(listing_size=3):
+        first = process_stage(get_recent_papers(force_refresh=True, config=config), config)
+        # Every paper is in the index now; a forced refresh must still select them
+        sequential = process_stage(get_recent_papers(force_refresh=True, config=config), config)
+        asynchronous = run_async_pipeline(config, force_refresh=True)
+
+    assert len(first[0][1]) == 3
+    assert ranked_ids(sequential) == ranked_ids(first)
+    assert ranked_ids(asynchronous) == ranked_ids(first)
+
+def test_metadata_depth_skips_downloads(mocker):
+    config = engine_config()
+    config['arxiv']['fetch_depth'] = 'metadata'
+    mock_contents = mocker.patch('paperweight.scraper.fetch_paper_contents')
+    mock_content = mocker.patch('paperweight.engine.fetch_paper_content')
+    with ArxivStub(listing_size=8):
+        sequential = process_stage(get_recent_papers(force_refresh=True, config=config), config)
+        asynchronous = run_async_pipeline(config, force_refresh=True)
+
+    mock_contents.assert_not_called()
+    mock_content.assert_not_called()
+    assert ranked_ids(asynchronous) == ranked_ids(sequential)
+    assert len(sequential[0][1]) == 8
+    assert all(paper['content'] is None and paper['content_type'] == 'metadata' for paper in sequential[0][1])
+
+def test_async_pipeline_skips_when_already_processed(mocker):
+    save_last_processed_date(date.today())
+    mock_listing = mocker.patch('paperweight.engine.fetch_recent_papers')
+
+    assert run_async_pipeline(engine_config()) == []
+    mock_listing.assert_not_called()
+
+def test_summaries_overlap_with_downloads(mocker):
+    config = engine_config(download_workers=1, queue_size=1)
+    config['analyzer'] = {'type': 'summary', 'llm_provider': 'openai', 'api_key': 'key', 'max_concurrent_requests': 2}
+    events = []
+    lock = threading.Lock()
+
+    def fetch(paper_id, format_cache, max_source_bytes):
+        time.sleep(0.02)
+        with lock:
+            events.append(('downloaded', paper_id))
+        return b'machine learning ' * 50, 'pdf'
+
+    def summarize(papers, analyzer_config, client_pool):
+        with lock:
+            events.append(('summarized', papers[0]['id']))
+        return [f"Summary of {papers[0]['id']}"]
+
+    listing = [{'title': f'Paper {i}', 'link': f'http://arxiv.org/abs/2410.0000{i}v1', 'date': date.today(),
+                'abstract': 'machine learning', 'categories': ['cs.CL']} for i in range(5)]
+    mocker.patch('paperweight.engine.fetch_recent_papers', return_value=listing)
+    mocker.patch('paperweight.engine.fetch_paper_content', side_effect=fetch)
+    mocker.patch('paperweight.engine.extract_text_from_source', side_effect=lambda content, method: content.decode())
+    mocker.patch('paperweight.engine.summarize_papers', side_effect=summarize)
+
+    [(_, papers)] = run_async_pipeline(config, force_refresh=True)
+
+    assert sorted(paper['summary'] for paper in papers) == [f"Summary of 2410.0000{i}v1" for i in range(5)]
+    kinds = [kind for kind, _ in events]
+    # The first summary is requested while later papers are still downloading
+    assert kinds.index('summarized') < len(kinds) - 1 - kinds[::-1].index('downloaded')
+
+def test_summaries_share_one_client_pool(mocker):
+    config = engine_config()
+    config['analyzer'] = {'type': 'summary', 'llm_provider': 'openai', 'api_key': 'key', 'max_concurrent_requests': 2}
+    pools = []
+    mock_summarize = mocker.patch('paperweight.engine.summarize_papers',
+                                  side_effect=lambda papers, analyzer_config, client_pool: pools.append(client_pool) or ['Summary'])
+    with ArxivStub(listing_size=4):
+        run_async_pipeline(config, force_refresh=True)
+
+    assert mock_summarize.call_count == 4
+    assert pools[0] is not None
+    assert all(pool is pools[0] for pool in pools)
+
+def test_duplicates_are_not_scored(mocker):
+    config = engine_config()
+    config['arxiv']['dedup'] = True
+    mock_score = mocker.spy(engine, 'score_paper')
+    # Every paper gets the same e-print, so all but the first are duplicates
+    with ArxivStub(listing_size=4, pdf_only_every=0):
+        [(_, papers)] = run_async_pipeline(config, force_refresh=True)
+
+    assert len(papers) == 1
+    assert mock_score.call_count == 1
+
+def test_profiles_and_batch_mode(mocker):
+    config = engine_config()
+    config['analyzer'] = {'type': 'summary', 'llm_provider': 'openai', 'summary_mode': 'batch'}
+    config['profiles'] = [{'name': 'nlp', 'notifier': {'email': {'to': 'nlp@example.com'}}},
+                          {'name': 'strict', 'processor': {'min_score': 1000}}]
+    mock_submit = mocker.patch('paperweight.batch.submit_summary_batch', return_value='batch-1')
+    mock_summarize = mocker.patch('paperweight.engine.summarize_papers')
+
+    with ArxivStub(listing_size=4):
+        assert run_async_pipeline(config, force_refresh=True) == []
+
+    mock_summarize.assert_not_called()
+    mock_submit.assert_called_once()
+    submitted = mock_submit.call_args[0][0]
+    assert submitted and all(paper['profile'] == 'nlp' and 'summary' not in paper for paper in submitted)
+
+def test_batch_mode_keeps_text_of_selected_papers(mocker):
+    config = engine_config()
+    config['processor']['max_papers'] = 2
+    config['analyzer'] = {'type': 'summary', 'llm_provider': 'openai', 'api_key': 'key', 'summary_mode': 'batch'}
+    mocker.patch('paperweight.batch.truncate_to_tokens_batch', side_effect=lambda texts, *args: list(texts))
+    build_requests = mocker.spy(batch, 'build_batch_requests')
+    mock_upload = mocker.patch.object(batch.BatchClient, 'upload_file', return_value='file-1')
+    mocker.patch.object(batch.BatchClient, 'create_batch', return_value={'id': 'batch-1'})
+
+    with ArxivStub(listing_size=4):
+        assert run_async_pipeline(config, force_refresh=True) == []
+
+    submitted = build_requests.call_args[0][0]
+    assert len(submitted) == 2
+    assert all(paper['content'] is None for paper in submitted)
+    requests = [json.loads(line) for line in mock_upload.call_args[0][0].decode().splitlines()]
+    assert len(requests) == 2
+    assert all(len(request['body']['messages'][1]['content']) > 100 for request in requests)
+    assert [paper['id'] for paper in load_pending_batches()[0]['papers']] == [paper['id'] for paper in submitted]
+
+def test_profile_copies_release_text_once_summarized(mocker):
+    config = engine_config()
+    config['analyzer'] = {'type': 'summary', 'llm_provider': 'openai', 'api_key': 'key', 'max_concurrent_requests': 1}
+    config['profiles'] = [{'name': 'nlp'}, {'name': 'ml'}]
+    pipeline = AsyncPipeline(config, force_refresh=True)
+    summarized = []
+    held = []
+
+    def summarize(papers, analyzer_config, client_pool):
+        # No profile's copy of an already summarized paper still holds its text
+        held.extend(paper['id'] for top_papers in pipeline.selected for paper in top_papers.papers()
+                    if paper['id'] in summarized and paper['content'] is not None)
+        summarized.append(papers[0]['id'])
+        return [f"Summary of {papers[0]['id']}"]
+
+    mocker.patch('paperweight.engine.summarize_papers', side_effect=summarize)
+    with ArxivStub(listing_size=4):
+        selections = asyncio.run(pipeline.run())
+
+    assert len(summarized) == 4
+    assert held == []
+    assert [len(papers) for _, papers in selections] == [4, 4]
+
+def test_every_scored_paper_is_recorded_for_export(mocker):
+    config = engine_config()
+    config['processor']['max_papers'] = 2
+    config['analytics'] = {'columnar_export': True}
+    analytics.reset_scored_papers(config)
+    try:
+        with ArxivStub(listing_size=6):
+            [(_, selected)] = run_async_pipeline(config, force_refresh=True)
+        scored = analytics._scored_papers.papers
+        assert len(scored) == 6
+        assert sorted(paper['id'] for paper in scored if analytics._scored_papers.is_selected(paper)) == \
+            sorted(paper['id'] for paper in selected)
+        assert all('relevance_score' in paper and paper['content'] is None for paper in scored)
+    finally:
+        analytics.reset_scored_papers()
+
+def test_download_errors_do_not_stop_pipeline(mocker):
+    listing = [{'title': f'Paper {i}', 'link': f'http://arxiv.org/abs/2410.0000{i}v1', 'date': date.today(),
+                'abstract': 'abstract', 'categories': ['cs.CL']} for i in range(3)]
+    mocker.patch('paperweight.engine.fetch_recent_papers', return_value=listing)
+    mocker.patch('paperweight.engine.fetch_paper_content',
+                 side_effect=[RuntimeError('boom'), (b'text', 'pdf'), (None, None)])
+    mocker.patch('paperweight.engine.extract_text_from_source', return_value='machine learning')
+
+    pipeline = AsyncPipeline(engine_config(download_workers=1), force_refresh=True)
+    [(_, papers)] = asyncio.run(pipeline.run())
+    assert pipeline.accepted == 1
+    assert [paper['id'] for paper in papers] == ['2410.00001v1']
+
+def test_run_pipeline_uses_async_engine(mocker):
+    config = engine_config()
+    mock_engine = mocker.patch('paperweight.engine.run_async_pipeline', return_value=[])
+    mock_fetch = mocker.patch('paperweight.main.get_recent_papers')
+    mocker.patch('paperweight.main.start_metrics_server', return_value=None)
+    mocker.patch('paperweight.main.write_run_report')
+    mocker.patch('paperweight.main.export_metrics')
+
+    from paperweight.main import run_pipeline
+    run_pipeline(config=config)
+
+    mock_engine.assert_called_once_with(config, False, None)
+    mock_fetch.assert_not_called()
@@ -0,0 +1,65 @@
+import socket
+
+import requests
+
+from paperweight.exporter import (
+    render_metrics,
+    start_metrics_server,
+    stop_metrics_server,
+    write_textfile,
+)
+from paperweight.instrumentation import RunMetrics, run_metrics
+
+
+def make_report():
+    metrics = RunMetrics()
+    metrics.record('fetch_paper_content', 0.3)
+    metrics.record('fetch_paper_content', 3.0, error=True)
+    metrics.increment('papers_downloaded', 2)
+    metrics.increment('retries', function='fetch_paper_content')
+    metrics.increment('summary_cache_hits', 3)
+    metrics.increment('summary_cache_misses', 1)
+    return metrics.report()
+
+def test_render_metrics_histograms_and_counters():
+    text = render_metrics(make_report())
+
+    assert '# TYPE paperweight_stage_duration_seconds histogram' in text
+    assert 'paperweight_stage_duration_seconds_bucket{stage="fetch_paper_content",le="0.25"} 0' in text
+    assert 'paperweight_stage_duration_seconds_bucket{stage="fetch_paper_content",le="0.5"} 1' in text
+    assert 'paperweight_stage_duration_seconds_bucket{stage="fetch_paper_content",le="+Inf"} 2' in text
+    assert 'paperweight_stage_duration_seconds_count{stage="fetch_paper_content"} 2' in text
+    assert 'paperweight_stage_errors_total{stage="fetch_paper_content"} 1' in text
+    assert 'paperweight_papers_downloaded_total 2' in text
+    assert 'paperweight_retries_total{function="fetch_paper_content"} 1' in text
+    assert 'paperweight_summary_cache_hit_ratio 0.75' in text
+    assert text.endswith('\n')
+
+def test_render_metrics_declares_each_type_once():
+    text = render_metrics(make_report())
+    type_lines = [line for line in text.splitlines() if line.startswith('# TYPE')]
+    assert len(type_lines) == len(set(type_lines))
+
+def test_write_textfile(tmp_path):
+    path = tmp_path / 'paperweight.prom'
+    write_textfile(str(path), make_report())
+    assert 'paperweight_papers_downloaded_total 2' in path.read_text()
+    assert [p.name for p in tmp_path.iterdir()] == ['paperweight.prom']
+
+def test_metrics_endpoint_serves_live_metrics():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    run_metrics.reset()
+    server = start_metrics_server({'prometheus_port': port})
+    try:
+        run_metrics.increment('papers_listed', 5)
+        response = requests.get(f"http://127.0.0.1:{port}/metrics", timeout=5)
+        assert response.status_code == 200
+        assert 'paperweight_papers_listed_total 5' in response.text
+        assert requests.get(f"http://127.0.0.1:{port}/other", timeout=5).status_code == 404
+    finally:
+        stop_metrics_server(server)
+
+def test_metrics_server_disabled_by_default():
+    assert start_metrics_server({}) is None
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from paperweight.instrumentation import (
+    RunMetrics,
+    record_retry,
+    run_metrics,
+    timed,
+    write_run_report,
+)
+
+
+def test_span_records_duration_and_errors():
+    metrics = RunMetrics()
+    with metrics.span('stage'):
+        pass
+    with pytest.raises(ValueError):
+        with metrics.span('stage'):
+            raise ValueError("boom")
+
+    summary = metrics.stage_summary('stage')
+    assert summary['count'] == 2
+    assert summary['errors'] == 1
+    assert summary['histogram']['+Inf'] == 2
+
+def test_stage_summary_percentiles_and_histogram():
+    metrics = RunMetrics()
+    for seconds in [0.002, 0.02, 0.2, 2.0]:
+        metrics.record('download', seconds)
+
+    summary = metrics.stage_summary('download')
+    assert summary['max_seconds'] == 2.0
+    assert summary['p50_seconds'] in (0.02, 0.2)
+    assert summary['histogram']['0.005'] == 1
+    assert summary['histogram']['0.25'] == 3
+    assert summary['histogram']['+Inf'] == 4
+
+def test_counters_and_reset():
+    metrics = RunMetrics()
+    metrics.increment('bytes_downloaded', 100)
+    metrics.increment('bytes_downloaded', 50)
+    assert metrics.report()['counters'] == {'bytes_downloaded': 150}
+
+    metrics.reset()
+    assert metrics.report()['counters'] == {}
+
+def test_labelled_counters_and_retry_hook():
+    run_metrics.reset()
+
+    record_retry('fetch_arxiv_papers', 1, 0.5)
+    record_retry('fetch_arxiv_papers', 2, 1.5)
+    assert run_metrics.report()['counters'] == {'retries{function="fetch_arxiv_papers"}': 2}
+
+def test_timed_decorator_uses_shared_collector():
+    run_metrics.reset()
+
+    @timed('decorated')
+    def work(value):
+        return value * 2
+
+    assert work(21) == 42
+    assert run_metrics.stage_summary('decorated')['count'] == 1
+
+def test_write_run_report(tmp_path):
+    run_metrics.reset()
+    run_metrics.record('summarize_paper', 1.5)
+    run_metrics.increment('llm_input_tokens', 1200)
+    report_file = tmp_path / 'report.json'
+
+    write_run_report({'run_report_file': str(report_file)})
+
+    report = json.loads(report_file.read_text())
+    assert report['stages']['summarize_paper']['count'] == 1
+    assert report['counters']['llm_input_tokens'] == 1200
+
+def test_write_run_report_disabled(tmp_path):
+    report_file = tmp_path / 'report.json'
+    write_run_report({'run_report': False, 'run_report_file': str(report_file)})
+    assert not report_file.exists()
@@ -1,9 +1,25 @@
 import pytest
 import yaml
 
-from paperweight.main import main
+from paperweight.main import (
+    deliver_batch_results,
+    main,
+    process_and_summarize_papers,
+    process_profiles,
+    process_stage,
+    run_pipeline,
+)
 
 
+@pytest.fixture(autouse=True)
+def mock_run_report(mocker):
+    return mocker.patch('paperweight.main.write_run_report')
+
+@pytest.fixture(autouse=True)
+def mock_metrics_export(mocker):
+    mocker.patch('paperweight.main.start_metrics_server', return_value=None)
+    return mocker.patch('paperweight.main.export_metrics')
+
 @pytest.fixture
 def mock_main_dependencies(mocker):
     return (
@@ -37,3 +53,119 @@ def test_main_function_notification_failure(mock_main_dependencies):
     main()
     mock_logger.warning.assert_called_with("Failed to send notifications")
 
+
+def test_process_and_summarize_papers_batch_mode(mocker):
+    mocker.patch('paperweight.main.process_papers', return_value=[{'title': 'Paper'}])
+    mock_submit = mocker.patch('paperweight.main.submit_summary_batch', return_value='batch-0')
+    mock_get_abstracts = mocker.patch('paperweight.main.get_abstracts')
+    config = {'processor': {}, 'analyzer': {'type': 'summary', 'llm_provider': 'openai', 'summary_mode': 'batch'}}
+
+    assert process_and_summarize_papers([{'title': 'Paper'}], config) is None
+    mock_submit.assert_called_once()
+    mock_get_abstracts.assert_not_called()
+
+def test_deliver_batch_results_sends_each_batch(mocker):
+    mocker.patch('paperweight.main.wait_for_batches', return_value=[[{'title': 'A'}], [{'title': 'B'}]])
+    mock_notifications = mocker.patch('paperweight.main.compile_and_send_notifications', return_value=True)
+    config = {'analyzer': {'type': 'summary', 'llm_provider': 'openai', 'summary_mode': 'batch'}, 'notifier': {}}
+
+    deliver_batch_results(config)
+
+    assert mock_notifications.call_count == 2
+
+def test_main_writes_run_report(mock_main_dependencies, mock_run_report, mock_metrics_export):
+    main()
+    mock_run_report.assert_called_once()
+    mock_metrics_export.assert_called_once()
+
+PROFILE_CONFIG = {
+    'arxiv': {'categories': ['cs.CL', 'cs.CV']},
+    'processor': {'keywords': ['learning'], 'title_keyword_weight': 3, 'abstract_keyword_weight': 2,
+                  'content_keyword_weight': 1, 'exclusion_keywords': [], 'exclusion_keyword_penalty': 5,
+                  'important_words': [], 'important_words_weight': 0.5, 'min_score': 0},
+    'analyzer': {'type': 'summary', 'llm_provider': 'openai', 'api_key': 'key'},
+    'notifier': {'email': {'to': 'all@example.com'}},
+    'profiles': [
+        {'name': 'nlp', 'categories': ['cs.CL'], 'notifier': {'email': {'to': 'nlp@example.com'}}},
+        {'name': 'everyone'},
+    ],
+}
+
+def profile_papers():
+    return [
+        {'id': '1', 'title': 'Learning language', 'abstract': 'learning', 'content': 'learning',
+         'categories': ['cs.CL'], 'link': 'l1', 'date': None},
+        {'id': '2', 'title': 'Learning vision', 'abstract': 'learning', 'content': 'learning',
+         'categories': ['cs.CV'], 'link': 'l2', 'date': None},
+    ]
+
+def test_process_profiles_summarizes_shared_papers_once(mocker):
+    mock_get_abstracts = mocker.patch('paperweight.main.get_abstracts',
+                                      side_effect=lambda papers, *args: [f"Summary {p['id']}" for p in papers])
+
+    selections = process_profiles(profile_papers(), PROFILE_CONFIG)
+
+    assert [(config['profile_name'], [p['id'] for p in papers]) for config, papers in selections] == [
+        ('nlp', ['1']), ('everyone', ['1', '2'])]
+    mock_get_abstracts.assert_called_once()
+    assert sorted(p['id'] for p in mock_get_abstracts.call_args[0][0]) == ['1', '2']
+    assert all(p['summary'] == f"Summary {p['id']}" for _, papers in selections for p in papers)
+
+def test_run_pipeline_notifies_each_profile(mocker):
+    mocker.patch('paperweight.main.get_recent_papers', return_value=profile_papers())
+    mocker.patch('paperweight.main.get_abstracts', side_effect=lambda papers, *args: ['Summary'] * len(papers))
+    mock_notifications = mocker.patch('paperweight.main.compile_and_send_notifications', return_value=True)
+
+    run_pipeline(config=PROFILE_CONFIG)
+
+    recipients = [call.args[1]['email']['to'] for call in mock_notifications.call_args_list]
+    assert recipients == ['nlp@example.com', 'all@example.com']
+    assert [len(call.args[0]) for call in mock_notifications.call_args_list] == [1, 2]
+
+def test_run_pipeline_exports_every_scored_paper(mocker):
+    config = dict(PROFILE_CONFIG, analytics={'columnar_export': True})
+    config['processor'] = dict(config['processor'], max_papers=1)
+    mocker.patch('paperweight.main.get_recent_papers', return_value=profile_papers())
+    mocker.patch('paperweight.main.get_abstracts', side_effect=lambda papers, *args: ['Summary'] * len(papers))
+    mocker.patch('paperweight.main.compile_and_send_notifications', return_value=True)
+    exported = []
+    mocker.patch('paperweight.analytics.write_papers', side_effect=lambda writer, papers, is_selected: exported.extend(
+        (paper['profile'], paper['id'], 'relevance_score' in paper, is_selected(paper)) for paper in papers))
+    mocker.patch('paperweight.analytics.open_dataset_writer')
+    mocker.patch('paperweight.analytics.write_stage_timings')
+
+    run_pipeline(config=config)
+
+    # nlp scores paper 1; everyone scores both but keeps only one of them
+    assert exported == [('nlp', '1', True, True), ('everyone', '1', True, True), ('everyone', '2', True, False)]
+
+def test_process_stage_releases_content(mocker):
+    mocker.patch('paperweight.main.get_abstracts', side_effect=lambda papers, *args: ['Summary'] * len(papers))
+    papers = profile_papers()
+
+    selections = process_stage(papers, PROFILE_CONFIG)
+
+    assert all(paper['content'] is None for paper in papers)
+    assert all(paper['content'] is None and paper['summary'] == 'Summary' for _, selected in selections for paper in selected)
+
+def test_deliver_batch_results_routes_to_profile(mocker):
+    config = dict(PROFILE_CONFIG, analyzer={'type': 'summary', 'llm_provider': 'openai', 'summary_mode': 'batch'})
+    mocker.patch('paperweight.main.wait_for_batches',
+                 return_value=[[{'title': 'A', 'profile': 'nlp'}], [{'title': 'B', 'profile': 'removed'}]])
+    mock_notifications = mocker.patch('paperweight.main.compile_and_send_notifications', return_value=True)
+
+    deliver_batch_results(config)
+
+    recipients = [call.args[1]['email']['to'] for call in mock_notifications.call_args_list]
+    assert recipients == ['nlp@example.com', 'all@example.com']
+
+def test_run_pipeline_deliver_only_skips_fetch(mocker):
+    config = dict(PROFILE_CONFIG, analyzer={'type': 'summary', 'llm_provider': 'openai', 'summary_mode': 'batch'})
+    mock_fetch = mocker.patch('paperweight.main.get_recent_papers')
+    mocker.patch('paperweight.main.wait_for_batches', return_value=[[{'title': 'A', 'profile': 'nlp'}]])
+    mock_notifications = mocker.patch('paperweight.main.compile_and_send_notifications', return_value=True)
+
+    run_pipeline(config=config, deliver_only=True)
+
+    mock_fetch.assert_not_called()
+    assert mock_notifications.call_args.args[1]['email']['to'] == 'nlp@example.com'
@@ -1,9 +1,13 @@
 from unittest.mock import MagicMock, patch
 
-from paperweight.notifier import compile_and_send_notifications, send_email_notification
+from paperweight.notifier import (
+    compile_and_send_notifications,
+    compose_notification,
+    send_email_notification,
+)
 
 
-@patch('paperweight.notifier.smtplib.SMTP')
+@patch('smtplib.SMTP')
 def test_send_email_notification(mock_smtp):
     mock_server = MagicMock()
     mock_smtp.return_value = mock_server
@@ -140,3 +144,9 @@ def test_compile_and_send_notifications_publication_time_sort(mock_send_email):
 
     # Check if the order of papers in the email body is by publication time (most recent first)
     assert body.index('Paper C') < body.index('Paper B') < body.index('Paper A')
+
+def test_compose_notification_subject():
+    papers = [{'title': 'Paper A', 'date': '2023-01-01', 'summary': 'Summary A', 'link': 'http://a.com', 'relevance_score': 0.8}]
+
+    assert compose_notification(papers, {'email': {}})[0] == "New Papers from ArXiv"
+    assert compose_notification(papers, {'email': {'subject': 'NLP digest'}})[0] == "NLP digest"
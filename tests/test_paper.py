@@ -0,0 +1,46 @@
+import copy
+import sys
+from datetime import date
+
+import pytest
+
+from paperweight.paper import Paper, release_contents
+
+
+def make_paper(**fields):
+    return Paper(id='2401.12345v1', title='A paper', link='http://arxiv.org/abs/2401.12345v1',
+                 date=date(2024, 1, 15), abstract='An abstract', categories=['cs.CL'],
+                 content='Full text', content_type='source', **fields)
+
+def test_paper_behaves_like_a_dict():
+    paper = make_paper()
+    assert paper['title'] == 'A paper'
+    assert 'summary' not in paper
+    assert paper.get('summary', 'fallback') == 'fallback'
+    with pytest.raises(KeyError):
+        paper['summary']
+
+    paper['summary'] = 'A summary'
+    assert paper['summary'] == 'A summary'
+    assert paper == dict(paper.to_dict())
+    assert {**paper}['summary'] == 'A summary'
+
+    with pytest.raises(KeyError, match='Unknown paper field'):
+        paper['misspelled'] = 1
+
+def test_paper_has_no_instance_dict():
+    paper = make_paper()
+    assert not hasattr(paper, '__dict__')
+    assert sys.getsizeof(paper) < sys.getsizeof(paper.to_dict())
+
+def test_copy_shares_content_and_release_drops_it():
+    paper = make_paper()
+    selected = copy.copy(paper)
+    selected['profile'] = 'nlp'
+
+    assert selected['content'] is paper['content']
+    assert 'profile' not in paper
+
+    release_contents([paper, selected, {'content': 'dict paper'}])
+    assert paper['content'] is None and selected['content'] is None
+    assert paper['abstract'] == 'An abstract'
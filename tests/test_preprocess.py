@@ -0,0 +1,42 @@
+from paperweight.preprocess import (
+    clean_paper_text,
+    strip_bibliography,
+    strip_latex_comments,
+    strip_references_section,
+)
+
+
+def test_strip_latex_comments_keeps_escaped_percent():
+    text = "Accuracy of 95\\% % this is a comment\nNext line"
+    assert strip_latex_comments(text) == "Accuracy of 95\\% \nNext line"
+
+def test_strip_bibliography():
+    text = "Body.\n\\bibliographystyle{plain}\n\\begin{thebibliography}{9}\n\\bibitem{a} A.\n\\end{thebibliography}\nAfter."
+    result = strip_bibliography(text)
+    assert "bibitem" not in result
+    assert "plain" not in result
+    assert "Body." in result and "After." in result
+
+def test_strip_references_section():
+    text = "Introduction\n" + "Body text.\n" * 20 + "References\n[1] A citation.\n"
+    result = strip_references_section(text)
+    assert "A citation" not in result
+    assert "Body text." in result
+
+def test_clean_paper_text_latex():
+    text = (
+        "\\documentclass{article}\n"
+        "\\usepackage{amsmath}\n"
+        "\\newcommand{\\R}{\\mathbb{R}}\n"
+        "\\begin{document}\n"
+        "% TODO remove\n"
+        "\\newcommand{\\x}{y}\n"
+        "Main body.\n"
+        "\\bibliography{refs}\n"
+        "\\end{document}\n"
+    )
+    assert clean_paper_text(text) == "Main body."
+
+def test_clean_paper_text_pdf_keeps_latex_like_text():
+    text = "Intro 50% better\n" + "Body.\n" * 10
+    assert clean_paper_text(text, 'pdf') == text.strip()
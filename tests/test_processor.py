@@ -1,6 +1,7 @@
 import pytest
 
 from paperweight.processor import (
+    TopPapers,
     calculate_paper_score,
     normalize_scores,
     process_papers,
@@ -30,6 +31,30 @@ def test_calculate_paper_score():
     assert 'exclusion_penalty' in breakdown
     assert 'important_words' in breakdown
 
+def test_calculate_paper_score_without_content():
+    paper = {
+        'title': 'Test Paper on AI',
+        'abstract': 'An abstract about AI in biology.',
+        'content': None
+    }
+    config = {
+        'keywords': ['AI'],
+        'exclusion_keywords': ['biology'],
+        'important_words': ['abstract'],
+        'title_keyword_weight': 3,
+        'abstract_keyword_weight': 2,
+        'content_keyword_weight': 1,
+        'exclusion_keyword_penalty': 5,
+        'important_words_weight': 0.5
+    }
+
+    score, breakdown = calculate_paper_score(paper, config)
+    assert score > 0
+    assert breakdown['keyword_matching']['content'] == 0
+    # Exclusions and important words are checked against the abstract instead
+    assert breakdown['exclusion_penalty'] < 0
+    assert breakdown['important_words'] > 0
+
 def test_process_papers():
     papers = [
         {
@@ -60,6 +85,37 @@ def test_process_papers():
     assert processed_papers[0]['relevance_score'] > processed_papers[1]['relevance_score']
     assert 'score_breakdown' in processed_papers[0]
 
+def test_process_papers_keeps_top_max_papers():
+    papers = [{'title': f'Paper {i}', 'abstract': 'ai ' * score, 'content': f'text {i}'}
+              for i, score in enumerate([1, 5, 3, 5, 2, 4])]
+    config = {
+        'keywords': ['ai'],
+        'exclusion_keywords': [],
+        'important_words': [],
+        'title_keyword_weight': 0,
+        'abstract_keyword_weight': 1,
+        'content_keyword_weight': 0,
+        'exclusion_keyword_penalty': 0,
+        'important_words_weight': 0,
+        'min_score': 0,
+        'max_papers': 3
+    }
+
+    result = process_papers(papers, config)
+
+    # Paper 1 ties with paper 3 and stays ahead because it came first
+    assert [paper['title'] for paper in result] == ['Paper 1', 'Paper 3', 'Paper 5']
+    assert [paper['content'] for paper in papers if paper not in result] == [None, None, None]
+    assert process_papers(papers, dict(config, max_papers=0)) != result
+
+def test_top_papers_breaks_ties_by_order():
+    top = TopPapers(2)
+    first, second, third = ({'relevance_score': 1.0, 'id': str(i)} for i in range(3))
+    assert top.push(third, order=2) is None
+    assert top.push(first, order=0) is None
+    assert top.push(second, order=1) is third
+    assert [paper['id'] for paper in top.papers()] == ['0', '1']
+
 def test_process_papers_empty_input():
     processor_config = {
         'keywords': ['AI'],
@@ -0,0 +1,67 @@
+from paperweight.profiles import (
+    build_profile_configs,
+    get_fetch_categories,
+    merge_sections,
+    select_profile_papers,
+)
+
+EMAIL = {'to': 'all@example.com', 'from': 'sender@example.com', 'password': 'pass',
+         'smtp_server': 'smtp.example.com', 'smtp_port': 587}
+
+
+def make_config(profiles=None):
+    config = {
+        'arxiv': {'categories': ['cs.AI', 'cs.CL']},
+        'processor': {'keywords': ['learning'], 'min_score': 10},
+        'analyzer': {'type': 'abstract'},
+        'notifier': {'email': dict(EMAIL)},
+        'logging': {'level': 'INFO'},
+    }
+    if profiles is not None:
+        config['profiles'] = profiles
+    return config
+
+def test_merge_sections_merges_nested_mappings():
+    base = {'email': {'to': 'a@example.com', 'from': 'b@example.com'}, 'min_score': 10}
+    merged = merge_sections(base, {'email': {'to': 'c@example.com'}, 'min_score': 5})
+
+    assert merged == {'email': {'to': 'c@example.com', 'from': 'b@example.com'}, 'min_score': 5}
+    assert base['email']['to'] == 'a@example.com'
+
+def test_get_fetch_categories_is_ordered_union():
+    config = make_config([{'name': 'vision', 'categories': ['cs.CV', 'cs.AI']},
+                          {'name': 'robots', 'categories': ['cs.RO']}])
+    assert get_fetch_categories(config) == ['cs.AI', 'cs.CL', 'cs.CV', 'cs.RO']
+
+def test_build_profile_configs_without_profiles():
+    config = make_config()
+    assert build_profile_configs(config) == [config]
+
+def test_build_profile_configs_applies_overrides():
+    config = make_config([
+        {'name': 'nlp', 'categories': ['cs.CL'], 'processor': {'min_score': 5},
+         'notifier': {'email': {'to': 'nlp@example.com'}}},
+        {'name': 'everyone', 'notifier': {'email': {'subject': 'Daily papers'}}},
+    ])
+    nlp, everyone = build_profile_configs(config)
+
+    assert nlp['processor'] == {'keywords': ['learning'], 'min_score': 5}
+    assert nlp['notifier']['email']['to'] == 'nlp@example.com'
+    assert nlp['notifier']['email']['subject'] == 'New Papers from ArXiv (nlp)'
+    assert nlp['profile_categories'] == ['cs.CL']
+    assert everyone['processor'] == config['processor']
+    assert everyone['notifier']['email']['subject'] == 'Daily papers'
+    assert everyone['profile_categories'] == ['cs.AI', 'cs.CL']
+    assert config['notifier']['email'] == EMAIL
+
+def test_select_profile_papers_filters_by_category_and_copies():
+    papers = [{'id': '1', 'categories': ['cs.CL', 'cs.LG'], 'content': 'text'},
+              {'id': '2', 'categories': ['cs.CV']}]
+    nlp = build_profile_configs(make_config([{'name': 'nlp', 'categories': ['cs.CL']}]))[0]
+
+    selected = select_profile_papers(papers, nlp)
+    assert [paper['id'] for paper in selected] == ['1']
+    assert selected[0]['profile'] == 'nlp'
+    assert selected[0] is not papers[0]
+    assert selected[0]['content'] is papers[0]['content']
+    assert 'profile' not in papers[0]
@@ -0,0 +1,51 @@
+import logging
+
+from paperweight.profiling import PipelineProfiler
+
+
+def busy_work():
+    return sorted(str(i) for i in range(20000))
+
+def test_disabled_profiler_writes_nothing(tmp_path):
+    profiler = PipelineProfiler(None, str(tmp_path / 'profile'))
+    with profiler.stage('fetch'):
+        busy_work()
+    assert not profiler.enabled
+    assert not (tmp_path / 'profile').exists()
+
+def test_cpu_profile_writes_pstats_and_logs_hot_functions(tmp_path, caplog):
+    output_dir = tmp_path / 'profile'
+    profiler = PipelineProfiler('cpu', str(output_dir))
+    with caplog.at_level(logging.INFO, logger='paperweight.profiling'):
+        with profiler.stage('process'):
+            busy_work()
+
+    assert (output_dir / 'process.pstats').exists()
+    assert 'Hottest functions' in caplog.text
+    assert 'busy_work' in caplog.text or 'genexpr' in caplog.text
+
+def test_memory_profile_writes_top_allocations(tmp_path, caplog):
+    output_dir = tmp_path / 'profile'
+    profiler = PipelineProfiler('mem', str(output_dir))
+    with caplog.at_level(logging.INFO, logger='paperweight.profiling'):
+        with profiler.stage('notify'):
+            retained = busy_work()
+    profiler.stop()
+
+    report = (output_dir / 'notify.allocations.txt').read_text()
+    assert report.startswith('Peak traced memory')
+    assert 'test_profiling.py' in report
+    assert (output_dir / 'notify.snapshot').exists()
+    assert 'Top allocations' in caplog.text
+    assert len(retained) == 20000
+
+def test_stage_reraises_and_still_writes_profile(tmp_path):
+    profiler = PipelineProfiler('both', str(tmp_path))
+    try:
+        with profiler.stage('fetch'):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    profiler.stop()
+    assert (tmp_path / 'fetch.pstats').exists()
+    assert (tmp_path / 'fetch.allocations.txt').exists()
@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from paperweight.ratelimit import RateLimiter, SharedRateLimiter
+
+
+def test_rate_limiter_disabled():
+    limiter = RateLimiter(0)
+    assert not limiter.enabled
+    assert limiter.acquire(1000) == 0.0
+
+def test_rate_limiter_allows_burst_up_to_capacity():
+    limiter = RateLimiter(60)
+    for _ in range(60):
+        assert limiter.acquire() == 0.0
+
+def test_rate_limiter_waits_when_exhausted(mocker):
+    mock_sleep = mocker.patch('paperweight.ratelimit.time.sleep')
+    limiter = RateLimiter(60, burst=1)
+    limiter.acquire()
+
+    waited = limiter.acquire()
+
+    assert waited > 0
+    mock_sleep.assert_called()
+
+def test_rate_limiter_charge_creates_debt(mocker):
+    mock_sleep = mocker.patch('paperweight.ratelimit.time.sleep')
+    limiter = RateLimiter(6000, burst=100)
+    limiter.charge(150)
+
+    limiter.acquire(10)
+
+    assert mock_sleep.call_args_list[0][0][0] > 0.5
+
+def test_rate_limiter_clamps_oversized_requests():
+    limiter = RateLimiter(60, burst=10)
+    assert limiter.acquire(500) == 0.0
+
+def test_rate_limiter_thread_safety():
+    limiter = RateLimiter(6000, burst=100)
+
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(100)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert limiter.available < 1
+
+def test_shared_rate_limiter_spaces_requests(mocker):
+    mock_sleep = mocker.patch('paperweight.ratelimit.time.sleep')
+    limiter = SharedRateLimiter(20)
+
+    assert limiter.acquire() == 0.0
+    limiter.acquire()
+    limiter.acquire()
+
+    delays = [call.args[0] for call in mock_sleep.call_args_list]
+    assert delays[0] == pytest.approx(3.0, abs=0.1)
+    assert delays[1] == pytest.approx(6.0, abs=0.1)
+
+def test_shared_rate_limiter_disabled():
+    limiter = SharedRateLimiter(0)
+    assert not limiter.enabled
+    assert limiter.acquire() == 0.0
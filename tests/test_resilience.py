@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+from requests.exceptions import HTTPError
+
+from paperweight.instrumentation import run_metrics
+from paperweight.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    TransientError,
+    backoff_delay,
+    get_circuit_breaker,
+    get_retry_after,
+    is_retryable,
+    resilient,
+)
+
+
+def http_error(status_code, headers=None):
+    return HTTPError(f"{status_code} Error", response=MagicMock(status_code=status_code, headers=headers or {}))
+
+def test_is_retryable_separates_transient_from_permanent():
+    assert is_retryable(http_error(429))
+    assert is_retryable(http_error(503))
+    assert is_retryable(requests.ConnectionError())
+    assert is_retryable(requests.Timeout())
+    assert is_retryable(TransientError())
+    assert not is_retryable(http_error(404))
+    assert not is_retryable(http_error(400))
+    assert not is_retryable(HTTPError("500 without a response"))
+    assert not is_retryable(ValueError())
+    assert not is_retryable(CircuitOpenError())
+
+def test_get_retry_after_parses_seconds_and_dates():
+    assert get_retry_after(http_error(429, {'Retry-After': '12'})) == 12.0
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < get_retry_after(http_error(503, {'Retry-After': retry_at})) <= 30
+    assert get_retry_after(http_error(503, {'Retry-After': 'soon'})) is None
+    assert get_retry_after(http_error(503)) is None
+
+def test_backoff_delay_is_jittered_and_capped():
+    delays = [backoff_delay(attempt, base_delay=1.0, max_delay=4.0) for attempt in range(1, 10) for _ in range(20)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+@patch('paperweight.resilience.time.sleep')
+def test_resilient_retries_transient_errors(mock_sleep):
+    run_metrics.reset()
+    calls = MagicMock(side_effect=[requests.ConnectionError(), http_error(429, {'Retry-After': '3'}), 'ok'])
+
+    @resilient('test', attempts=3)
+    def fetch():
+        return calls()
+
+    assert fetch() == 'ok'
+    assert mock_sleep.call_count == 2
+    assert mock_sleep.call_args_list[1].args == (3.0,)
+    assert run_metrics.report()['counters'] == {'retries{function="fetch"}': 2}
+
+@patch('paperweight.resilience.time.sleep')
+def test_resilient_raises_permanent_errors_and_long_retry_after(mock_sleep):
+    @resilient('test', attempts=3, max_retry_after=60)
+    def fetch(error):
+        raise error
+
+    with pytest.raises(HTTPError, match='404'):
+        fetch(http_error(404))
+    with pytest.raises(HTTPError, match='503'):
+        fetch(http_error(503, {'Retry-After': '3600'}))
+    mock_sleep.assert_not_called()
+
+def test_circuit_breaker_opens_and_recovers(mocker):
+    clock = mocker.patch('paperweight.resilience.time.monotonic', return_value=100.0)
+    breaker = CircuitBreaker('test', failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.return_value = 131.0
+    assert breaker.state == 'half_open'
+    breaker.before_call()
+    # Only one trial request while half-open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+
+    clock.return_value = 162.0
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+@patch('paperweight.resilience.time.sleep')
+def test_open_circuit_fails_fast(mock_sleep):
+    calls = MagicMock(side_effect=requests.ConnectionError())
+
+    @resilient('flaky', attempts=1)
+    def fetch():
+        return calls()
+
+    breaker = get_circuit_breaker('flaky')
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(requests.ConnectionError):
+            fetch()
+    with pytest.raises(CircuitOpenError):
+        fetch()
+    assert calls.call_count == breaker.failure_threshold
+
+@patch('paperweight.resilience.time.sleep')
+def test_permanent_errors_do_not_open_circuit(mock_sleep):
+    @resilient('strict', attempts=1)
+    def fetch():
+        raise http_error(404)
+
+    for _ in range(10):
+        with pytest.raises(HTTPError):
+            fetch()
+    assert get_circuit_breaker('strict').state == 'closed'
@@ -1,11 +1,25 @@
+import io
 import os
+import tarfile
 from datetime import date, datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
 from requests.exceptions import HTTPError
 
-from paperweight.scraper import extract_text_from_source, fetch_arxiv_papers
+from paperweight.cache import ContentFormatCache
+from paperweight.scraper import (
+    extract_latex_document,
+    extract_text_from_source,
+    fetch_arxiv_papers,
+    fetch_arxiv_range,
+    fetch_paper_content,
+    fetch_recent_papers,
+    find_main_tex,
+    get_recent_papers,
+    http_get,
+    use_http_session,
+)
 
 
 @patch('paperweight.scraper.requests.get')
@@ -36,6 +50,7 @@ def test_fetch_arxiv_papers(mock_get):
     assert papers[0]['title'] == 'Test Paper 1'
     assert papers[1]['title'] == 'Test Paper 2'
     assert papers[0]['date'] == datetime(2024, 1, 15).date()
+    assert papers[0]['categories'] == ['cs.AI']
     assert papers[1]['date'] == datetime(2024, 1, 14).date()
 
 def test_extract_text_from_source():
@@ -145,3 +160,173 @@ def test_fetch_arxiv_papers_max_results(mock_get):
 def test_extract_text_from_source_invalid_type():
     with pytest.raises(ValueError, match="Invalid source type: invalid_type"):
         extract_text_from_source(b'content', 'invalid_type')
+
+def _make_tarball(files):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+        for name, text in files.items():
+            data = text.encode('utf-8')
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+def test_extract_text_from_source_follows_main_document():
+    content = _make_tarball({
+        'build.log': 'LaTeX Warning: lots of noise',
+        'sections/intro.tex': 'Intro text. % hidden comment\n\\input{sections/details}',
+        'sections/details.tex': 'Detail text.',
+        'unused_draft.tex': 'Draft text that is never included.',
+        'main.tex': (
+            '\\documentclass{article}\n\\usepackage{amsmath}\n\\begin{document}\n'
+            '\\include{sections/intro}\n% \\input{unused_draft}\nConclusion text.\n\\end{document}\n'
+        ),
+    })
+
+    text = extract_text_from_source(content, 'source')
+
+    assert text.index('Intro text.') < text.index('Detail text.') < text.index('Conclusion text.')
+    assert 'LaTeX Warning' not in text
+    assert 'Draft text' not in text
+    assert 'hidden comment' not in text
+    assert 'usepackage' not in text
+
+def test_find_main_tex_prefers_complete_document():
+    tex_files = {
+        'figure.tex': '\\documentclass{standalone}\n' + 'x' * 500,
+        'paper.tex': '\\documentclass{article}\\begin{document}Body\\end{document}',
+        'macros.tex': '\\newcommand{\\R}{\\mathbb{R}}',
+    }
+    assert find_main_tex(tex_files) == 'paper.tex'
+
+def test_extract_latex_document_without_main_file():
+    tex_files = {'b.tex': 'Second.', 'a.tex': 'First. % note'}
+    assert extract_latex_document(tex_files) == 'First. \nSecond.'
+
+def test_extract_latex_document_ignores_recursive_input():
+    tex_files = {
+        'main.tex': '\\documentclass{article}\\begin{document}\\input{loop}\\end{document}',
+        'loop.tex': 'Loop text. \\input{loop}',
+    }
+    assert extract_latex_document(tex_files).strip() == 'Loop text.'
+
+@patch('paperweight.scraper.requests.get')
+def test_http_get_uses_installed_session(mock_get):
+    session = MagicMock()
+    use_http_session(session)
+    try:
+        http_get('https://export.arxiv.org/api/query', timeout=30)
+    finally:
+        use_http_session(None)
+    session.get.assert_called_once_with('https://export.arxiv.org/api/query', timeout=30)
+    mock_get.assert_not_called()
+
+    http_get('https://export.arxiv.org/api/query')
+    mock_get.assert_called_once_with('https://export.arxiv.org/api/query')
+
+@patch('paperweight.scraper.fetch_arxiv_papers')
+def test_fetch_recent_papers_fetches_profile_categories_once(mock_fetch):
+    shared = {'link': 'http://arxiv.org/abs/2401.12345', 'categories': ['cs.CL', 'cs.LG']}
+    mock_fetch.side_effect = lambda category, start_date, max_results: {
+        'cs.CL': [dict(shared)],
+        'cs.CV': [dict(shared, categories=['cs.CV']), {'link': 'http://arxiv.org/abs/2401.67890', 'categories': ['cs.CV']}],
+    }[category]
+    config = {'arxiv': {'categories': ['cs.CL']},
+              'profiles': [{'name': 'nlp'}, {'name': 'vision', 'categories': ['cs.CV', 'cs.CL']}]}
+
+    papers = fetch_recent_papers(1, config)
+
+    assert [call.args[0] for call in mock_fetch.call_args_list] == ['cs.CL', 'cs.CV']
+    assert len(papers) == 2
+    assert papers[0]['categories'] == ['cs.CL', 'cs.LG', 'cs.CV']
+
+def http_response(status_code, content=b'', headers=None):
+    response = MagicMock(status_code=status_code, content=content, headers=headers or {})
+    if status_code >= 400:
+        response.raise_for_status.side_effect = HTTPError(f"{status_code} Error", response=response)
+    return response
+
+@patch('paperweight.resilience.time.sleep')
+@patch('paperweight.scraper.requests.get')
+def test_fetch_paper_content_missing_source_falls_back_without_retry(mock_get, mock_sleep):
+    mock_get.side_effect = [http_response(404), http_response(200, b'%PDF')]
+
+    assert fetch_paper_content('2401.12345') == (b'%PDF', 'pdf')
+    assert mock_get.call_count == 2
+    mock_sleep.assert_not_called()
+
+@patch('paperweight.resilience.time.sleep')
+@patch('paperweight.scraper.requests.get')
+def test_fetch_paper_content_retries_after_server_asks(mock_get, mock_sleep):
+    mock_get.side_effect = [http_response(503, headers={'Retry-After': '7'}), http_response(200, b'source')]
+
+    assert fetch_paper_content('2401.12345') == (b'source', 'source')
+    mock_sleep.assert_called_once_with(7.0)
+
+@patch('paperweight.scraper.requests.get')
+def test_fetch_paper_content_uses_pdf_served_as_eprint(mock_get, tmp_path):
+    mock_get.return_value = http_response(200, b'%PDF', headers={'Content-Type': 'application/pdf'})
+
+    with ContentFormatCache(path=str(tmp_path / 'formats.db')) as cache:
+        assert fetch_paper_content('2401.12345v1', cache) == (b'%PDF', 'pdf')
+        assert cache.get('2401.12345v1') == ('pdf', 4)
+    mock_get.assert_called_once()
+
+@patch('paperweight.scraper.requests.get')
+def test_fetch_paper_content_skips_eprint_known_to_be_missing(mock_get, tmp_path):
+    mock_get.side_effect = [http_response(404), http_response(200, b'%PDF'), http_response(200, b'%PDF')]
+
+    with ContentFormatCache(path=str(tmp_path / 'formats.db')) as cache:
+        fetch_paper_content('2401.12345v1', cache)
+        assert fetch_paper_content('2401.12345v1', cache) == (b'%PDF', 'pdf')
+    assert [call.args[0].split('/')[-2] for call in mock_get.call_args_list] == ['e-print', 'pdf', 'pdf']
+
+@patch('paperweight.scraper.requests.head')
+@patch('paperweight.scraper.requests.get')
+def test_fetch_paper_content_probes_size_before_large_sources(mock_get, mock_head):
+    mock_head.return_value = http_response(200, headers={'Content-Type': 'application/x-eprint-tar',
+                                                         'Content-Length': '50000000'})
+    mock_get.return_value = http_response(200, b'%PDF')
+
+    assert fetch_paper_content('2401.12345v1', max_source_bytes=10_000_000) == (b'%PDF', 'pdf')
+    assert mock_get.call_args.args[0].endswith('/pdf/2401.12345v1')
+
+    mock_head.return_value = http_response(200, headers={'Content-Length': '5000'})
+    mock_get.return_value = http_response(200, b'source')
+    assert fetch_paper_content('2401.12345v1', max_source_bytes=10_000_000) == (b'source', 'source')
+
+def listing_page(*dates):
+    entries = ''.join(f'''
+        <entry>
+            <id>http://arxiv.org/abs/2401.{i:05d}v1</id>
+            <published>{day}T00:00:00Z</published>
+            <title>Paper {i}</title>
+            <summary>Abstract {i}</summary>
+        </entry>''' for i, day in enumerate(dates))
+    return f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'.encode()
+
+@patch('paperweight.scraper.requests.get')
+def test_fetch_arxiv_range_pages_through_listing(mock_get):
+    mock_get.side_effect = [
+        http_response(200, listing_page('2024-01-01', '2024-01-01')),
+        http_response(200, listing_page('2024-01-02', '2024-01-03')),
+    ]
+
+    papers = fetch_arxiv_range('cs.AI', date(2024, 1, 1), date(2024, 1, 2), page_size=2)
+
+    assert [paper['date'] for paper in papers] == [date(2024, 1, 1), date(2024, 1, 1), date(2024, 1, 2)]
+    params = [call.kwargs['params'] for call in mock_get.call_args_list]
+    assert [p['start'] for p in params] == [0, 2]
+    assert params[0]['search_query'] == 'cat:cs.AI AND submittedDate:[202401010000 TO 202401022359]'
+
+def test_get_recent_papers_closes_index_on_failure(mocker):
+    listing = [{'title': 'Paper', 'link': 'http://arxiv.org/abs/2401.12345v1', 'abstract': 'abstract'}]
+    mocker.patch('paperweight.scraper.get_fetch_days', return_value=1)
+    mocker.patch('paperweight.scraper.fetch_recent_papers', return_value=listing)
+    mock_index = mocker.patch('paperweight.scraper.open_paper_index').return_value
+    mocker.patch('paperweight.scraper.filter_seen_papers', side_effect=lambda papers, index: papers)
+    mocker.patch('paperweight.scraper.fetch_full_texts', side_effect=tarfile.ReadError('corrupt tarball'))
+
+    with pytest.raises(tarfile.ReadError):
+        get_recent_papers(config={'arxiv': {'dedup': True}})
+    mock_index.close.assert_called_once()
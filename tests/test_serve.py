@@ -0,0 +1,198 @@
+import itertools
+import os
+import threading
+
+import pytest
+import yaml
+
+from paperweight import scraper
+from paperweight.cli import main as cli_main
+from paperweight.serve import DEFAULT_RUN_INTERVAL_MINUTES, PipelineDaemon
+
+BASE_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config-base.yaml')
+_writes = itertools.count(1)
+
+
+def write_config(path, **sections):
+    with open(BASE_CONFIG_PATH) as f:
+        config = yaml.safe_load(f)
+    config['logging']['file'] = 'paperweight.log'
+    config.update(sections)
+    with open(path, 'w') as f:
+        yaml.safe_dump(config, f)
+    # Bump the modification time so back-to-back writes are seen as changes
+    mtime = os.stat(path).st_mtime + next(_writes)
+    os.utime(path, (mtime, mtime))
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path)
+    mocker.patch('paperweight.serve.setup_logging')
+    mocker.patch('paperweight.serve.start_metrics_server', return_value=None)
+    return tmp_path
+
+@pytest.fixture
+def config_path(work_dir):
+    path = str(work_dir / 'config.yaml')
+    write_config(path)
+    return path
+
+def test_reload_config_only_when_file_changes(config_path, mocker):
+    mock_pool = mocker.patch('paperweight.serve.create_client_pool')
+    daemon = PipelineDaemon(config_path)
+
+    assert daemon.reload_config()
+    assert not daemon.reload_config()
+    assert mock_pool.call_count == 1
+
+    write_config(config_path, serve={'run_interval_minutes': 5})
+    assert daemon.reload_config()
+    assert daemon.interval_seconds == 300
+    # The analyzer section did not change, so the client pool is kept
+    assert mock_pool.call_count == 1
+
+def test_reload_config_rebuilds_client_pool_on_analyzer_change(config_path, mocker):
+    mock_pool = mocker.patch('paperweight.serve.create_client_pool')
+    daemon = PipelineDaemon(config_path)
+    daemon.reload_config()
+
+    write_config(config_path, analyzer={'type': 'abstract', 'max_concurrent_requests': 2})
+    daemon.reload_config()
+    assert mock_pool.call_count == 2
+
+def test_invalid_edit_keeps_previous_config(config_path):
+    daemon = PipelineDaemon(config_path)
+    daemon.reload_config()
+    previous = daemon.config
+
+    write_config(config_path, logging={'level': 'LOUD'})
+    assert not daemon.reload_config()
+    assert daemon.config is previous
+
+def test_invalid_initial_config_raises(work_dir):
+    path = str(work_dir / 'config.yaml')
+    write_config(path, logging={'level': 'LOUD'})
+    with pytest.raises(ValueError):
+        PipelineDaemon(path).reload_config()
+
+def test_request_reload_forces_reload(config_path):
+    daemon = PipelineDaemon(config_path)
+    daemon.reload_config()
+    daemon.request_reload()
+    assert daemon.reload_config()
+
+def test_interval_override_and_default(config_path):
+    daemon = PipelineDaemon(config_path)
+    daemon.reload_config()
+    assert daemon.interval_seconds == DEFAULT_RUN_INTERVAL_MINUTES * 60
+    assert PipelineDaemon(config_path, interval_minutes=0.5).interval_seconds == 30
+
+def test_run_once_skips_pipeline_without_new_listings(config_path, mocker):
+    mocker.patch('paperweight.serve.check_for_new_papers', return_value=(False, None))
+    mock_run = mocker.patch('paperweight.serve.run_pipeline')
+    daemon = PipelineDaemon(config_path)
+    daemon.reload_config()
+
+    daemon.run_once()
+    mock_run.assert_not_called()
+
+def test_run_once_collects_pending_batches_without_new_listings(config_path, work_dir, mocker):
+    (work_dir / 'pending_batches.json').write_text('{"batches": [{"batch_id": "batch-0", "papers": []}]}')
+    mocker.patch('paperweight.serve.check_for_new_papers', return_value=(False, None))
+    mock_record = mocker.patch('paperweight.serve.record_processed_listing')
+    mock_run = mocker.patch('paperweight.serve.run_pipeline')
+    daemon = PipelineDaemon(config_path)
+    daemon.reload_config()
+
+    daemon.run_once()
+    mock_run.assert_called_once_with(config=daemon.config, client_pool=daemon.client_pool,
+                                     serve_metrics=False, deliver_only=True)
+    mock_record.assert_not_called()
+
+def test_run_once_reuses_warm_state(config_path, mocker):
+    newest = {'id': 'http://arxiv.org/abs/2410.02741v1', 'published': '2024-10-03T17:59:58Z'}
+    mocker.patch('paperweight.serve.check_for_new_papers', return_value=(True, newest))
+    mock_record = mocker.patch('paperweight.serve.record_processed_listing')
+    mock_run = mocker.patch('paperweight.serve.run_pipeline')
+    daemon = PipelineDaemon(config_path)
+    daemon.reload_config()
+
+    daemon.run_once()
+    mock_run.assert_called_once_with(False, config=daemon.config, client_pool=daemon.client_pool,
+                                     serve_metrics=False)
+    mock_record.assert_called_once_with(newest)
+
+def test_runs_reuse_llm_clients(work_dir, mocker):
+    path = str(work_dir / 'config.yaml')
+    write_config(path, analyzer={'type': 'summary', 'llm_provider': 'openai', 'api_key': 'key',
+                                 'max_concurrent_requests': 1})
+    clients = []
+
+    def create_client(**kwargs):
+        client = mocker.Mock()
+        client.generate_response.return_value = 'Summary'
+        clients.append(client)
+        return client
+
+    papers = [{'id': f'2410.0000{i}v1', 'title': f'Paper {i}', 'link': f'http://arxiv.org/abs/2410.0000{i}v1',
+               'date': None, 'abstract': 'machine learning', 'content': 'machine learning',
+               'categories': ['cs.CL']} for i in range(3)]
+    mocker.patch('paperweight.serve.check_for_new_papers', return_value=(True, None))
+    mocker.patch('paperweight.serve.record_processed_listing')
+    mocker.patch('paperweight.main.get_recent_papers', side_effect=lambda *args, **kwargs: [dict(paper) for paper in papers])
+    mocker.patch('paperweight.main.compile_and_send_notifications', return_value=True)
+    mocker.patch('paperweight.analyzer.create_llm_instance', side_effect=lambda *args: create_client())
+    mocker.patch('paperweight.analyzer.count_tokens', return_value=10)
+    mocker.patch('paperweight.analyzer.truncate_to_tokens', side_effect=lambda text, *args: text)
+    daemon = PipelineDaemon(path)
+    daemon.reload_config()
+    daemon.config['processor']['min_score'] = 0
+
+    daemon.run_once()
+    daemon.run_once()
+
+    # One request in flight at a time, so one client serves both runs
+    assert len(clients) == 1
+    assert clients[0].generate_response.call_count == 6
+    assert daemon.client_pool.created == 1
+
+def test_serve_runs_on_schedule_with_shared_session(config_path, mocker):
+    mocker.patch('paperweight.serve.CONFIG_POLL_SECONDS', 0.01)
+    mocker.patch('paperweight.serve.check_for_new_papers', return_value=(True, None))
+    sessions = []
+    mock_run = mocker.patch('paperweight.serve.run_pipeline',
+                            side_effect=lambda *args, **kwargs: sessions.append(scraper._http_session))
+    daemon = PipelineDaemon(config_path, interval_minutes=0.0005)
+
+    daemon.serve(max_runs=3)
+    assert mock_run.call_count == 3
+    assert sessions[0] is not None
+    assert all(session is sessions[0] for session in sessions)
+    assert scraper._http_session is None
+
+def test_failed_run_does_not_stop_daemon(config_path, mocker):
+    mocker.patch('paperweight.serve.CONFIG_POLL_SECONDS', 0.01)
+    mocker.patch('paperweight.serve.check_for_new_papers', side_effect=[RuntimeError('boom'), (False, None)])
+    daemon = PipelineDaemon(config_path, interval_minutes=0.0005)
+
+    daemon.serve(max_runs=2)
+    assert daemon.runs == 2
+
+def test_stop_interrupts_wait(config_path, mocker):
+    mocker.patch('paperweight.serve.check_for_new_papers', return_value=(False, None))
+    daemon = PipelineDaemon(config_path, interval_minutes=60)
+    thread = threading.Thread(target=daemon.serve)
+    thread.start()
+    while daemon.runs == 0:
+        thread.join(0.01)
+    daemon.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+def test_serve_command(mocker):
+    mock_daemon = mocker.patch('paperweight.serve.PipelineDaemon')
+    mocker.patch('signal.signal')
+
+    cli_main(['serve', '--interval', '15', '--config', 'other.yaml'])
+    mock_daemon.assert_called_once_with('other.yaml', 15.0)
+    mock_daemon.return_value.serve.assert_called_once_with(False)
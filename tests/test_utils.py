@@ -5,7 +5,13 @@ from unittest.mock import patch
 import pytest
 import yaml
 
-from paperweight.utils import expand_env_vars, load_config, override_with_env
+from paperweight.utils import (
+    expand_env_vars,
+    get_encoding,
+    load_config,
+    override_with_env,
+    truncate_to_tokens_batch,
+)
 
 
 @pytest.fixture
@@ -134,3 +140,39 @@ def test_load_config_env_expansion_and_override(config_file, sample_config):
         config = load_config(config_path=config_file)
     assert config['arxiv']['max_results'] == 100
     assert config['analyzer']['api_key'] == 'dummy_api_key'
+
+@pytest.fixture
+def mock_encoding(mocker):
+    get_encoding.cache_clear()
+    encoding = mocker.Mock()
+    mock_for_model = mocker.patch('tiktoken.encoding_for_model', return_value=encoding)
+    yield encoding, mock_for_model
+    get_encoding.cache_clear()
+
+def test_get_encoding_is_cached_per_model(mock_encoding):
+    encoding, mock_for_model = mock_encoding
+
+    assert get_encoding('gpt-4o-mini') is encoding
+    assert get_encoding('gpt-4o-mini') is encoding
+    get_encoding('gpt-3.5-turbo')
+
+    assert mock_for_model.call_count == 2
+
+def test_get_encoding_falls_back_for_unknown_model(mocker):
+    get_encoding.cache_clear()
+    mocker.patch('tiktoken.encoding_for_model', side_effect=KeyError('gemini-1.5-flash'))
+    mock_get_encoding = mocker.patch('tiktoken.get_encoding')
+
+    get_encoding('gemini-1.5-flash')
+
+    mock_get_encoding.assert_called_once_with('cl100k_base')
+    get_encoding.cache_clear()
+
+def test_truncate_to_tokens_batch(mock_encoding):
+    encoding, _ = mock_encoding
+    encoding.encode_batch.return_value = [[1, 2, 3], [4], []]
+    encoding.decode.side_effect = lambda tokens: f"decoded {tokens}"
+
+    assert truncate_to_tokens_batch(['a b c', 'd', ''], 2) == ['decoded [1, 2]', 'd', '']
+    assert encoding.encode_batch.call_args[1]['num_threads'] == 8
+    encoding.decode.assert_called_once_with([1, 2])